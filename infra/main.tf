@@ -5,6 +5,47 @@ module "lambda" {
   lambda_package_path = var.lambda_package_path
   log_level           = var.log_level
   enable_xray         = var.enable_xray
+  list_parser         = var.list_parser
+  json_codec          = var.json_codec
+  metrics_sample_rate = var.metrics_sample_rate
+  metrics_namespace   = var.project_name
+  auth_mode           = var.api_key_mode == "handler" ? "handler" : "gateway"
+  api_key_hashes      = var.api_key_mode == "handler" ? var.api_key_hashes : []
+  config_source       = var.limits_config != "" ? "ssm:${aws_ssm_parameter.limits[0].name}" : ""
+  config_ttl          = var.limits_config_ttl
+  admission_rate      = var.admission_rate
+  admission_burst     = var.admission_burst
+
+  list_store           = var.enable_list_store ? "dynamodb:${module.list_store[0].table_name}" : ""
+  list_store_table_arn = var.enable_list_store ? module.list_store[0].table_arn : ""
+}
+
+# Runtime request limits (src/config.py), readable under the role's
+# parameter/${project}/${stage}/* grant. Editing the value takes effect
+# within limits_config_ttl seconds, without a deploy.
+resource "aws_ssm_parameter" "limits" {
+  count = var.limits_config != "" ? 1 : 0
+  name  = "/${var.project_name}/${var.stage}/limits"
+  type  = "String"
+  value = var.limits_config
+}
+
+# Optional server-side list storage for PUT /v1/lists
+module "list_store" {
+  count        = var.enable_list_store ? 1 : 0
+  source       = "./modules/list_store"
+  project_name = var.project_name
+  stage        = var.stage
+}
+
+# API key authorizer Lambda (api_key_mode = "authorizer"). With "handler"
+# the main function checks the key itself and this hop is skipped.
+module "authorizer" {
+  count          = var.api_key_mode == "authorizer" ? 1 : 0
+  source         = "./modules/lambda_authorizer"
+  project_name   = var.project_name
+  stage          = var.stage
+  api_key_hashes = var.api_key_hashes
 }
 
 module "http_api" {
@@ -13,6 +54,11 @@ module "http_api" {
   stage             = var.stage
   lambda_invoke_arn = module.lambda.invoke_arn
   function_name     = module.lambda.function_name
+
+  enable_apikey_authorizer = var.api_key_mode == "authorizer"
+  authorizer_lambda_arn    = var.api_key_mode == "authorizer" ? module.authorizer[0].authorizer_invoke_arn : ""
+  authorizer_function_name = var.api_key_mode == "authorizer" ? module.authorizer[0].authorizer_name : ""
+  authorizer_cache_ttl     = var.authorizer_cache_ttl
 }
 
 
@@ -39,6 +85,7 @@ module "alarms" {
   stage                = var.stage
   api_id               = module.http_api.api_id
   lambda_function_name = module.lambda.function_name
+  metrics_namespace    = var.project_name
   # Optionally set: -var "alarm_email=you@example.com"
   alarm_email = var.alarm_email
 }
@@ -51,6 +98,7 @@ module "dashboard" {
   region               = var.region
   lambda_function_name = module.lambda.function_name
   api_id               = module.http_api.api_id
+  metrics_namespace    = var.project_name
 }
 
 # Secrets Manager for API keys and sensitive data
@@ -58,3 +58,40 @@ resource "aws_cloudwatch_metric_alarm" "lambda_errors" {
   }
   alarm_actions = [aws_sns_topic.alarms.arn]
 }
+
+# Handler p99 time (sampled EMF metrics, see src/metrics.py). Periods
+# without sampled requests are not a breach.
+resource "aws_cloudwatch_metric_alarm" "handler_total_p99" {
+  alarm_name          = "${var.project_name}-${var.stage}-handler-total-p99"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = 3
+  datapoints_to_alarm = 2
+  metric_name         = "TotalTime"
+  namespace           = var.metrics_namespace
+  period              = 300
+  extended_statistic  = "p99"
+  threshold           = var.handler_p99_threshold_ms
+  treat_missing_data  = "notBreaching"
+  dimensions = {
+    Stage = var.stage
+  }
+  alarm_actions = [aws_sns_topic.alarms.arn]
+}
+
+# Validation p99: grows with list length before anything else does
+resource "aws_cloudwatch_metric_alarm" "handler_validate_p99" {
+  alarm_name          = "${var.project_name}-${var.stage}-handler-validate-p99"
+  comparison_operator = "GreaterThanThreshold"
+  evaluation_periods  = 3
+  datapoints_to_alarm = 2
+  metric_name         = "ValidateTime"
+  namespace           = var.metrics_namespace
+  period              = 300
+  extended_statistic  = "p99"
+  threshold           = var.validate_p99_threshold_ms
+  treat_missing_data  = "notBreaching"
+  dimensions = {
+    Stage = var.stage
+  }
+  alarm_actions = [aws_sns_topic.alarms.arn]
+}
@@ -18,3 +18,20 @@ variable "alarm_email" {
   type    = string
   default = ""
 }
+
+variable "metrics_namespace" {
+  type    = string
+  default = "ListService"
+}
+
+variable "handler_p99_threshold_ms" {
+  type        = number
+  default     = 200
+  description = "Alarm when the handler's sampled p99 TotalTime exceeds this"
+}
+
+variable "validate_p99_threshold_ms" {
+  type        = number
+  default     = 50
+  description = "Alarm when the sampled p99 ValidateTime exceeds this"
+}
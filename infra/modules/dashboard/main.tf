@@ -235,6 +235,100 @@ resource "aws_cloudwatch_dashboard" "main" {
             FunctionName = var.lambda_function_name
           }
         }
+      },
+
+      # Handler phases (sampled EMF records, see src/metrics.py)
+      {
+        type   = "metric"
+        x      = 0
+        y      = 27
+        width  = 12
+        height = 6
+        properties = {
+          metrics = [
+            [var.metrics_namespace, "ParseTime", "Stage", var.stage, { stat = "p99", label = "parse" }],
+            [".", "ValidateTime", ".", ".", { stat = "p99", label = "validate" }],
+            [".", "CacheTime", ".", ".", { stat = "p99", label = "cache hit" }],
+            [".", "SliceTime", ".", ".", { stat = "p99", label = "slice" }],
+            [".", "SerializeTime", ".", ".", { stat = "p99", label = "serialize" }],
+            [".", "CompressTime", ".", ".", { stat = "p99", label = "compress" }],
+          ]
+          view   = "timeSeries"
+          region = var.region
+          title  = "Handler Phase p99 (ms)"
+          period = 300
+        }
+      },
+
+      # Handler total time by route
+      {
+        type   = "metric"
+        x      = 12
+        y      = 27
+        width  = 12
+        height = 6
+        properties = {
+          metrics = [
+            [var.metrics_namespace, "TotalTime", "Stage", var.stage, "Route", "head", { stat = "p99", label = "head p99" }],
+            ["...", "tail", { stat = "p99", label = "tail p99" }],
+            ["...", "slice", { stat = "p99", label = "slice p99" }],
+            ["...", "page", { stat = "p99", label = "page p99" }],
+            ["...", "sample", { stat = "p99", label = "sample p99" }],
+            ["...", "batch", { stat = "p99", label = "batch p99" }],
+            ["...", "lists", { stat = "p99", label = "lists p99" }],
+            [var.metrics_namespace, "TotalTime", "Stage", var.stage, { stat = "p50", label = "all p50" }],
+          ]
+          view   = "timeSeries"
+          region = var.region
+          title  = "Handler Time by Route (ms)"
+          period = 300
+          yAxis = {
+            left = {
+              min = 0
+            }
+          }
+        }
+      },
+
+      # Request and response sizes
+      {
+        type   = "metric"
+        x      = 0
+        y      = 33
+        width  = 12
+        height = 6
+        properties = {
+          metrics = [
+            [var.metrics_namespace, "BodyBytes", "Stage", var.stage, { stat = "p99", label = "request p99" }],
+            ["...", { stat = "Average", label = "request avg" }],
+            [".", "ResultBytes", ".", ".", { stat = "p99", label = "response p99" }],
+            ["...", { stat = "Average", label = "response avg" }],
+          ]
+          view   = "timeSeries"
+          region = var.region
+          title  = "Body Sizes (bytes)"
+          period = 300
+        }
+      },
+
+      # List sizes
+      {
+        type   = "metric"
+        x      = 12
+        y      = 33
+        width  = 12
+        height = 6
+        properties = {
+          metrics = [
+            [var.metrics_namespace, "ItemCount", "Stage", var.stage, { stat = "p99", label = "items p99" }],
+            ["...", { stat = "Average", label = "items avg" }],
+            [".", "N", ".", ".", { stat = "Average", label = "n avg" }],
+          ]
+          view   = "timeSeries"
+          region = var.region
+          title  = "List Length and n"
+          period = 300
+        }
       }
     ]
   })
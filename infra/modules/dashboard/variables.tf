@@ -22,3 +22,9 @@ variable "api_id" {
   type        = string
   description = "API Gateway ID to monitor"
 }
+
+variable "metrics_namespace" {
+  type        = string
+  description = "Namespace of the handler's per-request EMF metrics"
+  default     = "ListService"
+}
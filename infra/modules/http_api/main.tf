@@ -20,6 +20,18 @@ resource "aws_apigatewayv2_authorizer" "lambda_request" {
   identity_sources                  = ["$request.header.x-api-key"]
   authorizer_payload_format_version = "2.0"
   enable_simple_responses           = true
+  # Decisions are cached per x-api-key value: a busy key invokes the
+  # authorizer once per TTL instead of on every request
+  authorizer_result_ttl_in_seconds = var.authorizer_cache_ttl
+}
+
+resource "aws_lambda_permission" "authorizer_invoke" {
+  count         = var.enable_apikey_authorizer ? 1 : 0
+  statement_id  = "AllowAPIGatewayInvokeAuthorizer"
+  action        = "lambda:InvokeFunction"
+  function_name = var.authorizer_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.http.execution_arn}/authorizers/${aws_apigatewayv2_authorizer.lambda_request[0].id}"
 }
 
 resource "aws_apigatewayv2_authorizer" "jwt" {
@@ -57,6 +69,61 @@ resource "aws_apigatewayv2_route" "tail" {
 }
 
 
+resource "aws_apigatewayv2_route" "slice" {
+  api_id    = aws_apigatewayv2_api.http.id
+  route_key = "POST /v1/list/slice"
+  target    = "integrations/${aws_apigatewayv2_integration.lambda.id}"
+
+  # If enable_jwt and route not in public_routes => require JWT
+  authorization_type = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/slice")) ? "JWT" : (var.enable_apikey_authorizer ? "CUSTOM" : null)
+  authorizer_id      = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/slice")) ? aws_apigatewayv2_authorizer.jwt[0].id : (var.enable_apikey_authorizer ? aws_apigatewayv2_authorizer.lambda_request[0].id : null)
+}
+
+
+resource "aws_apigatewayv2_route" "page" {
+  api_id    = aws_apigatewayv2_api.http.id
+  route_key = "POST /v1/list/page"
+  target    = "integrations/${aws_apigatewayv2_integration.lambda.id}"
+
+  # If enable_jwt and route not in public_routes => require JWT
+  authorization_type = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/page")) ? "JWT" : (var.enable_apikey_authorizer ? "CUSTOM" : null)
+  authorizer_id      = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/page")) ? aws_apigatewayv2_authorizer.jwt[0].id : (var.enable_apikey_authorizer ? aws_apigatewayv2_authorizer.lambda_request[0].id : null)
+}
+
+
+resource "aws_apigatewayv2_route" "sample" {
+  api_id    = aws_apigatewayv2_api.http.id
+  route_key = "POST /v1/list/sample"
+  target    = "integrations/${aws_apigatewayv2_integration.lambda.id}"
+
+  # If enable_jwt and route not in public_routes => require JWT
+  authorization_type = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/sample")) ? "JWT" : (var.enable_apikey_authorizer ? "CUSTOM" : null)
+  authorizer_id      = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/sample")) ? aws_apigatewayv2_authorizer.jwt[0].id : (var.enable_apikey_authorizer ? aws_apigatewayv2_authorizer.lambda_request[0].id : null)
+}
+
+
+resource "aws_apigatewayv2_route" "batch" {
+  api_id    = aws_apigatewayv2_api.http.id
+  route_key = "POST /v1/list/batch"
+  target    = "integrations/${aws_apigatewayv2_integration.lambda.id}"
+
+  # If enable_jwt and route not in public_routes => require JWT
+  authorization_type = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/batch")) ? "JWT" : (var.enable_apikey_authorizer ? "CUSTOM" : null)
+  authorizer_id      = var.enable_jwt && !(contains(var.public_routes, "POST /v1/list/batch")) ? aws_apigatewayv2_authorizer.jwt[0].id : (var.enable_apikey_authorizer ? aws_apigatewayv2_authorizer.lambda_request[0].id : null)
+}
+
+
+resource "aws_apigatewayv2_route" "lists" {
+  api_id    = aws_apigatewayv2_api.http.id
+  route_key = "PUT /v1/lists"
+  target    = "integrations/${aws_apigatewayv2_integration.lambda.id}"
+
+  # If enable_jwt and route not in public_routes => require JWT
+  authorization_type = var.enable_jwt && !(contains(var.public_routes, "PUT /v1/lists")) ? "JWT" : (var.enable_apikey_authorizer ? "CUSTOM" : null)
+  authorizer_id      = var.enable_jwt && !(contains(var.public_routes, "PUT /v1/lists")) ? aws_apigatewayv2_authorizer.jwt[0].id : (var.enable_apikey_authorizer ? aws_apigatewayv2_authorizer.lambda_request[0].id : null)
+}
+
+
 resource "aws_apigatewayv2_stage" "stage" {
   default_route_settings {
     throttling_burst_limit = var.throttling_burst_limit
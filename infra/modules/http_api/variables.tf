@@ -45,6 +45,19 @@ variable "enable_apikey_authorizer" {
 }
 
 variable "authorizer_lambda_arn" {
-  type    = string
-  default = ""
+  type        = string
+  default     = ""
+  description = "Invoke ARN of the API key authorizer function"
+}
+
+variable "authorizer_function_name" {
+  type        = string
+  default     = ""
+  description = "Name of the API key authorizer function, for its invoke permission"
+}
+
+variable "authorizer_cache_ttl" {
+  type        = number
+  default     = 300
+  description = "Seconds API Gateway caches an authorizer decision per x-api-key (0 disables, max 3600)"
 }
@@ -15,7 +15,7 @@ resource "aws_iam_role_policy" "lambda_logs" {
   role = aws_iam_role.lambda_exec.id
   policy = jsonencode({
     Version = "2012-10-17",
-    Statement = [
+    Statement = concat([
       {
         Effect = "Allow",
         Action = [
@@ -46,7 +46,18 @@ resource "aws_iam_role_policy" "lambda_logs" {
         # Allow Lambda to read secrets for this project/stage
         Resource = "arn:aws:secretsmanager:*:*:secret:${var.project_name}-${var.stage}-*"
       }
-    ]
+    ], var.list_store_table_arn == "" ? [] : [
+      {
+        Effect = "Allow",
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:Query",
+          "dynamodb:BatchWriteItem"
+        ],
+        # Stored lists table for PUT /v1/lists
+        Resource = var.list_store_table_arn
+      }
+    ])
   })
 }
 
@@ -65,8 +76,22 @@ resource "aws_lambda_function" "this" {
 
   environment {
     variables = {
-      LOG_LEVEL = var.log_level
-      STAGE     = var.stage
+      LOG_LEVEL           = var.log_level
+      STAGE               = var.stage
+      LIST_PARSER         = var.list_parser
+      JSON_CODEC          = var.json_codec
+      LIST_CACHE_ENTRIES  = var.list_cache_entries
+      LIST_CACHE_TTL      = var.list_cache_ttl
+      LIST_STORE          = var.list_store
+      COMPRESS_ENCODINGS  = var.compress_encodings
+      METRICS_SAMPLE_RATE = var.metrics_sample_rate
+      METRICS_NAMESPACE   = var.metrics_namespace
+      AUTH_MODE           = var.auth_mode
+      API_KEY_HASHES      = join(",", var.api_key_hashes)
+      CONFIG_SOURCE       = var.config_source
+      CONFIG_TTL          = var.config_ttl
+      ADMISSION_RATE      = var.admission_rate
+      ADMISSION_BURST     = var.admission_burst
     }
   }
 
@@ -3,3 +3,93 @@ variable "stage" { type = string }
 variable "lambda_package_path" { type = string }
 variable "log_level" { type = string }
 variable "enable_xray" { type = bool }
+
+variable "list_parser" {
+  type        = string
+  default     = "json"
+  description = "Request parser for /head and /tail: json (json.loads) or stream (incremental)"
+}
+
+variable "json_codec" {
+  type        = string
+  default     = "json"
+  description = "JSON backend: json, auto, orjson or ujson. Build with the same JSON_CODEC to bundle the library."
+}
+
+variable "list_cache_entries" {
+  type        = number
+  default     = 128
+  description = "Validated lists cached per warm container (0 disables the cache)"
+}
+
+variable "compress_encodings" {
+  type        = string
+  default     = "br,gzip"
+  description = "Response Content-Encodings in preference order; empty disables response compression"
+}
+
+variable "metrics_sample_rate" {
+  type        = number
+  default     = 0.1
+  description = "Fraction of requests recorded as per-phase EMF metrics (0 disables)"
+}
+
+variable "metrics_namespace" {
+  type        = string
+  default     = "ListService"
+  description = "CloudWatch namespace of the per-request EMF metrics"
+}
+
+variable "list_cache_ttl" {
+  type        = number
+  default     = 300
+  description = "Seconds a cached list stays valid"
+}
+
+variable "list_store" {
+  type        = string
+  default     = ""
+  description = "LIST_STORE backend for PUT /v1/lists, e.g. dynamodb:<table>. Empty disables stored lists."
+}
+
+variable "list_store_table_arn" {
+  type        = string
+  default     = ""
+  description = "DynamoDB table ARN the function may read and write for stored lists"
+}
+
+variable "auth_mode" {
+  type        = string
+  default     = "gateway"
+  description = "AUTH_MODE: gateway (keys checked in front of the function, if at all) or handler (checked by the function)"
+}
+
+variable "api_key_hashes" {
+  type        = list(string)
+  default     = []
+  description = "Hex SHA-256 of every accepted x-api-key, used when auth_mode is handler"
+}
+
+variable "config_source" {
+  type        = string
+  default     = ""
+  description = "CONFIG_SOURCE for runtime request limits: ssm:<name>, secretsmanager:<id> or empty for the built-in defaults"
+}
+
+variable "config_ttl" {
+  type        = number
+  default     = 300
+  description = "CONFIG_TTL: seconds before the limits document is refreshed in the background"
+}
+
+variable "admission_rate" {
+  type        = number
+  default     = 0
+  description = "ADMISSION_RATE: cost units per second each API key may spend in a warm container (0 disables)"
+}
+
+variable "admission_burst" {
+  type        = number
+  default     = 500
+  description = "ADMISSION_BURST: cost units an API key may spend at once"
+}
@@ -4,6 +4,7 @@ resource "aws_iam_role" "auth_exec" {
     Version = "2012-10-17",
     Statement = [{
       Action    = "sts:AssumeRole",
+      Principal = { Service = "lambda.amazonaws.com" },
       Effect    = "Allow"
     }]
   })
@@ -35,53 +36,36 @@ resource "aws_cloudwatch_log_group" "auth" {
   retention_in_days = 14
 }
 
+# src/auth.py on its own: stdlib only, so the authorizer's package and cold
+# start stay small
 data "archive_file" "auth_zip" {
-  type = "zip"
-  source {
-    content  = <<PY
-import os, json, logging
-
-EXPECTED = os.environ.get("EXPECTED_API_KEY", "")
-
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-def lambda_handler(event, context):
-    # HTTP API v2 request -> Lambda authorizer (REQUEST type)
-    headers = (event.get("headers") or {})
-    api_key = headers.get("x-api-key") or headers.get("X-API-Key")
-
-    if api_key and EXPECTED and api_key == EXPECTED:
-        return {
-            "isAuthorized": True,
-            "context": {"auth": "apikey"}
-        }
-    return {
-        "isAuthorized": False,
-        "context": {"reason": "invalid or missing x-api-key"}
-    }
-PY
-    filename = "authorizer.py"
-  }
+  type        = "zip"
+  source_file = "${path.module}/../../../src/auth.py"
   output_path = "${path.module}/auth.zip"
 }
 
+locals {
+  # Only SHA-256 digests reach the function's environment, never the keys
+  api_key_hashes = concat(
+    var.api_key_hashes,
+    var.expected_api_key == "" ? [] : [sha256(var.expected_api_key)],
+  )
+}
+
 resource "aws_lambda_function" "auth" {
-  function_name    = "${var.project_name}-${var.stage}-auth"
+  function_name    = "${var.project_name}-${var.stage}-authorizer"
   role             = aws_iam_role.auth_exec.arn
-  handler          = "authorizer.lambda_handler"
+  handler          = "auth.lambda_handler"
   runtime          = "python3.12"
+  memory_size      = var.memory_size
   filename         = data.archive_file.auth_zip.output_path
   source_code_hash = data.archive_file.auth_zip.output_base64sha256
 
   environment {
     variables = {
-      EXPECTED_API_KEY = var.expected_api_key
+      API_KEY_HASHES = join(",", local.api_key_hashes)
     }
   }
 
   depends_on = [aws_cloudwatch_log_group.auth]
 }
-
-output "authorizer_arn" { value = aws_lambda_function.auth.arn }
-output "authorizer_name" { value = aws_lambda_function.auth.function_name }
@@ -1,2 +1,3 @@
 output "authorizer_arn" { value = aws_lambda_function.auth.arn }
 output "authorizer_name" { value = aws_lambda_function.auth.function_name }
+output "authorizer_invoke_arn" { value = aws_lambda_function.auth.invoke_arn }
@@ -1,3 +1,21 @@
 variable "project_name" { type = string }
 variable "stage" { type = string }
-variable "expected_api_key" { type = string } # Provide via TF var or SSM in real prod
+
+variable "api_key_hashes" {
+  type        = list(string)
+  default     = []
+  description = "Hex SHA-256 of every accepted x-api-key (python -m src.auth <key>)"
+}
+
+variable "expected_api_key" {
+  type        = string
+  default     = ""
+  sensitive   = true
+  description = "A plain key to accept as well; only its SHA-256 is deployed. Provide via TF var or SSM in real prod"
+}
+
+variable "memory_size" {
+  type        = number
+  default     = 128
+  description = "The authorizer only hashes a header; more memory buys little"
+}
@@ -0,0 +1,24 @@
+# Stored lists for PUT /v1/lists: one item per chunk of 50 strings plus a
+# length item (chunk = -1), so head/tail/slice read only the chunks they need.
+resource "aws_dynamodb_table" "lists" {
+  name         = "${var.project_name}-${var.stage}-lists"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "list_id"
+  range_key    = "chunk"
+
+  attribute {
+    name = "list_id"
+    type = "S"
+  }
+
+  attribute {
+    name = "chunk"
+    type = "N"
+  }
+
+  tags = {
+    Project     = var.project_name
+    Environment = var.stage
+    ManagedBy   = "Terraform"
+  }
+}
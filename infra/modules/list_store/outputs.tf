@@ -0,0 +1,9 @@
+output "table_name" {
+  value       = aws_dynamodb_table.lists.name
+  description = "Name of the stored lists table"
+}
+
+output "table_arn" {
+  value       = aws_dynamodb_table.lists.arn
+  description = "ARN of the stored lists table"
+}
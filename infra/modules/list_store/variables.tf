@@ -0,0 +1,9 @@
+variable "project_name" {
+  type        = string
+  description = "Project name"
+}
+
+variable "stage" {
+  type        = string
+  description = "Environment stage (dev/stage/prod)"
+}
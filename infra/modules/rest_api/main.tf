@@ -2,6 +2,10 @@ data "aws_region" "current" {}
 
 resource "aws_api_gateway_rest_api" "this" {
   name = "${var.project_name}-${var.stage}-rest"
+
+  # Pass compressed request bodies through base64-encoded and return
+  # compressed (isBase64Encoded) responses as binary
+  binary_media_types = ["*/*"]
 }
 
 resource "aws_api_gateway_resource" "v1" {
@@ -28,10 +32,44 @@ resource "aws_api_gateway_resource" "tail" {
   path_part   = "tail"
 }
 
+resource "aws_api_gateway_resource" "slice" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.list.id
+  path_part   = "slice"
+}
+
+resource "aws_api_gateway_resource" "page" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.list.id
+  path_part   = "page"
+}
+
+resource "aws_api_gateway_resource" "sample" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.list.id
+  path_part   = "sample"
+}
+
+resource "aws_api_gateway_resource" "batch" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.list.id
+  path_part   = "batch"
+}
+
+resource "aws_api_gateway_resource" "lists" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.v1.id
+  path_part   = "lists"
+}
+
 locals {
   methods = {
-    head = aws_api_gateway_resource.head.id
-    tail = aws_api_gateway_resource.tail.id
+    head   = aws_api_gateway_resource.head.id
+    tail   = aws_api_gateway_resource.tail.id
+    slice  = aws_api_gateway_resource.slice.id
+    page   = aws_api_gateway_resource.page.id
+    sample = aws_api_gateway_resource.sample.id
+    batch  = aws_api_gateway_resource.batch.id
   }
 }
 
@@ -55,12 +93,30 @@ resource "aws_api_gateway_integration" "lambda" {
   uri                     = var.lambda_arn
 }
 
+# PUT /v1/lists stores a list and returns its list_id
+resource "aws_api_gateway_method" "put_lists" {
+  rest_api_id      = aws_api_gateway_rest_api.this.id
+  resource_id      = aws_api_gateway_resource.lists.id
+  http_method      = "PUT"
+  authorization    = "NONE"
+  api_key_required = true
+}
+
+resource "aws_api_gateway_integration" "put_lists" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_method.put_lists.resource_id
+  http_method             = aws_api_gateway_method.put_lists.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = var.lambda_arn
+}
+
 resource "aws_api_gateway_deployment" "this" {
   rest_api_id = aws_api_gateway_rest_api.this.id
   triggers = {
     redeploy = timestamp()
   }
-  depends_on = [aws_api_gateway_integration.lambda]
+  depends_on = [aws_api_gateway_integration.lambda, aws_api_gateway_integration.put_lists]
 }
 
 resource "aws_api_gateway_stage" "this" {
@@ -68,6 +124,10 @@ resource "aws_api_gateway_stage" "this" {
   deployment_id = aws_api_gateway_deployment.this.id
   stage_name    = var.stage
 
+  # Stage-wide throttles count requests, whatever their size. The function's
+  # per-key cost buckets (ADMISSION_RATE, src/admission.py) count work, so
+  # a few 10,000-item lists use up as much of a key's allowance as hundreds
+  # of small requests.
   method_settings {
     metrics_enabled        = true
     logging_level          = "INFO"
@@ -98,6 +158,16 @@ resource "aws_api_gateway_stage" "this" {
     throttling_burst_limit = var.tail_burst_limit
     throttling_rate_limit  = var.tail_rate_limit
   }
+
+  method_settings {
+    metrics_enabled        = true
+    logging_level          = "INFO"
+    data_trace_enabled     = false
+    resource_path          = "/v1/list/batch"
+    http_method            = "POST"
+    throttling_burst_limit = var.batch_burst_limit
+    throttling_rate_limit  = var.batch_rate_limit
+  }
 }
 
 
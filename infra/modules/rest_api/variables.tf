@@ -40,6 +40,16 @@ variable "tail_rate_limit" {
   default = 25
 }
 
+variable "batch_burst_limit" {
+  type    = number
+  default = 20
+}
+
+variable "batch_rate_limit" {
+  type    = number
+  default = 10
+}
+
 variable "enable_waf" {
   type        = bool
   default     = false
@@ -35,3 +35,74 @@ variable "alarm_email" {
   description = "Email for CloudWatch alarm notifications (optional)"
   default     = ""
 }
+
+variable "list_parser" {
+  type        = string
+  description = "Request parser for /head and /tail: json or stream"
+  default     = "json"
+}
+
+variable "json_codec" {
+  type        = string
+  description = "JSON backend for the Lambda (json, auto, orjson, ujson)"
+  default     = "json"
+}
+
+variable "metrics_sample_rate" {
+  type        = number
+  description = "Fraction of requests recorded as per-phase CloudWatch EMF metrics (0 disables)"
+  default     = 0.1
+}
+
+variable "enable_list_store" {
+  type        = bool
+  description = "Create the DynamoDB table for PUT /v1/lists and list_id requests"
+  default     = false
+}
+
+variable "api_key_mode" {
+  type        = string
+  description = "Where x-api-key is checked: none, authorizer (a Lambda authorizer on the HTTP API) or handler (in the main function, no extra invocation)"
+  default     = "none"
+
+  validation {
+    condition     = contains(["none", "authorizer", "handler"], var.api_key_mode)
+    error_message = "api_key_mode must be none, authorizer or handler."
+  }
+}
+
+variable "api_key_hashes" {
+  type        = list(string)
+  description = "Hex SHA-256 of every accepted x-api-key (python -m src.auth <key>)"
+  default     = []
+}
+
+variable "authorizer_cache_ttl" {
+  type        = number
+  description = "Seconds API Gateway caches an authorizer decision per x-api-key (api_key_mode = authorizer)"
+  default     = 300
+}
+
+variable "limits_config" {
+  type        = string
+  description = "JSON limits document stored in SSM and read at runtime, e.g. {\"max_n\": 20000, \"tenants\": {\"<key id>\": {\"max_list_length\": 100000}}}; empty keeps the built-in limits"
+  default     = ""
+}
+
+variable "limits_config_ttl" {
+  type        = number
+  description = "Seconds the function keeps the limits document before refreshing it in the background"
+  default     = 300
+}
+
+variable "admission_rate" {
+  type        = number
+  description = "Cost units per second (about one per small request, ~160 per 10,000-item list) each API key may spend per warm container; over it the function answers 429 before parsing. 0 disables"
+  default     = 0
+}
+
+variable "admission_burst" {
+  type        = number
+  description = "Cost units an API key may spend at once before admission_rate applies"
+  default     = 500
+}
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Benchmark lambda_handler over a fixed matrix and gate on regressions.
+
+Usage:
+  python scripts/bench.py [--baseline src/tests/benchmarks/baseline.json]
+                          [--threshold 0.25] [--update] [--json bench.json]
+                          [-k substring]
+
+Runs fully offline: every case is a synthetic HTTP API v2 event shaped like
+_event() in src/tests/test_handler.py. The matrix covers list sizes, string
+lengths, n (1 and the whole list), head vs tail and the error paths (invalid
+JSON, wrong types, limits, 404/405).
+
+Reproducibility:
+  - the handler runs with the stdlib JSON codec (--codec), the list cache,
+    metrics, compression and logging below ERROR off, so every request
+    parses and validates its body and nothing else
+  - each case is timed as the best of --repeat runs of about 20 ms
+  - timings are divided by a calibration loop (stdlib json.loads plus a
+    type-check pass, no repo code) timed alternately with each case, so the
+    ratio holds across machines and through changes in machine load
+  - a case that looks slower than the baseline is measured again
+    (--retries) before it counts as a regression
+
+Exits non-zero when the status code of a case is wrong or when a case's
+calibrated throughput is more than --threshold below the baseline. --update
+writes the current results as the new baseline instead.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = ROOT / "src" / "tests" / "benchmarks" / "baseline.json"
+
+SIZES = [10, 1000, 10000]
+WIDTHS = [10, 100, 1000]
+MAX_BODY_SIZE = 1024 * 1024  # handler.MAX_BODY_SIZE, without importing it
+
+
+class Case(NamedTuple):
+    name: str
+    status: int
+    event: Dict[str, Any]
+
+
+def _event(path: str, body: Any, method: str = "POST") -> Dict[str, Any]:
+    return {
+        "requestContext": {"http": {"path": path, "method": method}},
+        "body": body if isinstance(body, str) else json.dumps(body),
+    }
+
+
+def _items(size: int, width: int) -> List[str]:
+    return [f"item-{i}".ljust(width, "x") for i in range(size)]
+
+
+def cases() -> List[Case]:
+    out = []
+    for size in SIZES:
+        for width in WIDTHS:
+            items = _items(size, width)
+            if len(json.dumps({"list": items, "n": size})) > MAX_BODY_SIZE:
+                continue
+            for n in (1, size):
+                for op in ("head", "tail"):
+                    out.append(Case(f"{op} size={size} width={width} n={n}", 200,
+                                    _event(f"/v1/list/{op}", {"list": items, "n": n})))
+
+    items = _items(1000, 10)
+    out += [
+        Case("error invalid-json", 400, _event("/v1/list/head", '{"list": [')),
+        Case("error list-not-array", 400, _event("/v1/list/head", {"list": "abc", "n": 1})),
+        Case("error non-string-last size=1000", 400, _event("/v1/list/head", {"list": items[:-1] + [1], "n": 1})),
+        Case("error string-too-long size=1000", 400,
+             _event("/v1/list/head", {"list": items[:-1] + ["x" * 1001], "n": 1})),
+        Case("error n-too-large size=1000", 400, _event("/v1/list/tail", {"list": items, "n": 10001})),
+        Case("error body-too-large", 400, _event("/v1/list/head", "x" * (MAX_BODY_SIZE + 1))),
+        Case("error 404 path", 404, _event("/v1/list/middle", {"list": items, "n": 1})),
+        Case("error 405 method", 405, _event("/v1/list/head", {"list": items, "n": 1}, method="GET")),
+    ]
+    return out
+
+
+def _number(fn: Callable[[], Any], min_time: float) -> int:
+    """Calls of ``fn`` that take at least ``min_time`` seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            return number
+        number *= 2
+
+
+def best_us(fns: List[Callable[[], Any]], repeat: int, min_time: float = 0.02) -> List[float]:
+    """Best mean time of each of ``fns`` in microseconds.
+
+    The functions are timed in turn within every repeat, so they see the
+    same machine load.
+    """
+    numbers = [_number(fn, min_time) for fn in fns]
+    best = [float("inf")] * len(fns)
+    for _ in range(repeat):
+        for i, (fn, number) in enumerate(zip(fns, numbers)):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best[i] = min(best[i], (time.perf_counter() - start) / number)
+    return [t * 1e6 for t in best]
+
+
+_CALIBRATION_BODY = json.dumps({"list": _items(1000, 40), "n": 10})
+
+
+def calibration() -> None:
+    """A fixed stdlib workload resembling one request."""
+    payload = json.loads(_CALIBRATION_BODY)
+    for item in payload["list"]:
+        if not isinstance(item, str) or len(item) > 1000:
+            raise AssertionError
+    json.dumps({"result": payload["list"][-10:]})
+
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    import src.handler as handler
+
+    us, calibration_us = best_us([lambda: handler.lambda_handler(case.event, None), calibration], repeat)
+    return {"us": round(us, 2), "rps": round(1e6 / us), "calibrated": round(us / calibration_us, 4)}
+
+
+def run(repeat: int, only: Optional[str] = None, samples: int = 1) -> Dict[str, Any]:
+    """Measure every case; with samples > 1 keep each case's median measurement."""
+    import src.handler as handler
+
+    results = {}
+    failures = []
+    for case in cases():
+        if only and only not in case.name:
+            continue
+        status = handler.lambda_handler(case.event, None)["statusCode"]
+        if status != case.status:
+            failures.append(f"{case.name}: status {status}, expected {case.status}")
+            continue
+        measured = sorted((measure(case, repeat) for _ in range(samples)), key=lambda r: r["calibrated"])
+        results[case.name] = measured[len(measured) // 2]
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "codec": os.environ["JSON_CODEC"],
+        "calibration_us": round(best_us([calibration], repeat)[0], 2),
+        "cases": results,
+        "failures": failures,
+    }
+
+
+def regressed(result: Dict[str, Any], base: Dict[str, Any], threshold: float) -> bool:
+    # Throughput down by more than threshold <=> time up by more than 1/(1-threshold)
+    return result["calibrated"] / base["calibrated"] > 1 / (1 - threshold)
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            retries: int = 0, repeat: int = 5) -> List[str]:
+    """Cases whose calibrated throughput is more than ``threshold`` below the baseline.
+
+    A case that looks slower is measured again up to ``retries`` times and
+    only counts if it stays slower: a burst of load elsewhere on the machine
+    is not a regression.
+    """
+    by_name = {case.name: case for case in cases()}
+    regressions = []
+    for name, result in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        for _ in range(retries):
+            if not regressed(result, base, threshold):
+                break
+            again = measure(by_name[name], repeat)
+            if again["calibrated"] < result["calibrated"]:
+                result = current["cases"][name] = again
+        if regressed(result, base, threshold):
+            regressions.append(f"{name}: {base['calibrated'] / result['calibrated']:.0%} of baseline throughput")
+    return regressions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed calibrated throughput loss per case (0.25 = 25%%)")
+    ap.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--retries", type=int, default=2, help="re-measure a slower case this many times")
+    ap.add_argument("--codec", default="json", help="JSON_CODEC for the run (json is always installed)")
+    ap.add_argument("-k", dest="only", help="only cases whose name contains this")
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args()
+
+    # Before the handler is imported: these are read at import time
+    os.environ.update(JSON_CODEC=args.codec, LIST_CACHE_ENTRIES="0", METRICS_SAMPLE_RATE="0",
+                      LIST_PARSER="json", LOG_LEVEL="ERROR", COMPRESS_ENCODINGS="")
+    sys.path.insert(0, str(ROOT))
+    # A baseline is the median of three measurements, so one lucky run does not set the bar
+    current = run(args.repeat, args.only, samples=3 if args.update else 1)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() and not args.update else None
+    # Before the table, so it shows the re-measured cases
+    regressions = compare(current, baseline, args.threshold, args.retries, args.repeat) if baseline else []
+
+    print(f"lambda_handler ({current['codec']} codec, Python {current['python']}, "
+          f"calibration {current['calibration_us']:.1f} us)")
+    print(f"  {'case':<40} {'us':>10} {'req/s':>10} {'vs base':>8}")
+    for name, result in current["cases"].items():
+        change = ""
+        if baseline and name in baseline["cases"]:
+            change = f"{baseline['cases'][name]['calibrated'] / result['calibrated']:.0%}"
+        print(f"  {name:<40} {result['us']:>10.1f} {result['rps']:>10} {change:>8}")
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(current, indent=2))
+
+    failed = bool(current["failures"])
+    for failure in current["failures"]:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if args.update:
+        if not failed:
+            baseline_path.write_text(json.dumps({k: v for k, v in current.items() if k != "failures"}, indent=2) + "\n")
+            print(f"baseline written to {baseline_path}")
+    elif baseline is None:
+        print(f"no baseline at {baseline_path}; run with --update to create one", file=sys.stderr)
+    else:
+        for key in ("python", "codec"):
+            if baseline.get(key) != current[key]:
+                print(f"note: baseline {key} is {baseline.get(key)}, this run {current[key]}", file=sys.stderr)
+        for regression in regressions:
+            print(f"FAIL: {regression}", file=sys.stderr)
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
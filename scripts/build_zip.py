@@ -1,24 +1,122 @@
+import compileall
+import importlib.util
 import os
+import py_compile
 import shutil
+import subprocess
+import sys
 import zipfile
 from pathlib import Path
+from typing import List
 
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 BUILD = ROOT / "build"
 ZIP_PATH = BUILD / "listservice.zip"
+DEPS = BUILD / "deps"
+PYC = BUILD / "pyc"
+
+# Not shipped to Lambda: tests and the container-only server (src/server.py)
+EXCLUDE_DIRS = {"tests", "__pycache__"}
+EXCLUDE_FILES = {"server.py", "pool.py"}
+
+# Optional JSON backend to bundle (see src/codec.py). "auto" and "json" bundle nothing.
+JSON_CODEC = os.getenv("JSON_CODEC", "json").lower()
+CODEC_PACKAGES = {"orjson": "orjson", "ujson": "ujson"}
+
+# Optional Content-Encodings to bundle (see src/compress.py), e.g. "br,zstd".
+# gzip and deflate need nothing.
+BUNDLE_ENCODINGS = [e for e in os.getenv("BUNDLE_ENCODINGS", "").lower().split(",") if e]
+ENCODING_PACKAGES = {"br": "brotli>=1.2", "zstd": "zstandard"}
+
+# Optional binary body formats to bundle (see src/formats.py), e.g. "msgpack"
+BUNDLE_FORMATS = [f for f in os.getenv("BUNDLE_FORMATS", "").lower().split(",") if f]
+FORMAT_PACKAGES = {"msgpack": "msgpack"}
+
+# Target Lambda runtime for binary wheels
+LAMBDA_PYTHON_VERSION = os.getenv("LAMBDA_PYTHON_VERSION", "3.12")
+LAMBDA_PLATFORM = os.getenv("LAMBDA_PLATFORM", "manylinux2014_x86_64")
+
+
+def install_packages() -> None:
+    packages = [CODEC_PACKAGES[JSON_CODEC]] if JSON_CODEC in CODEC_PACKAGES else []
+    packages += [ENCODING_PACKAGES[e] for e in BUNDLE_ENCODINGS if e in ENCODING_PACKAGES]
+    packages += [FORMAT_PACKAGES[f] for f in BUNDLE_FORMATS if f in FORMAT_PACKAGES]
+    if not packages:
+        return
+    subprocess.run(
+        [
+            sys.executable, "-m", "pip", "install", "--quiet",
+            "--target", str(DEPS),
+            "--platform", LAMBDA_PLATFORM,
+            "--python-version", LAMBDA_PYTHON_VERSION,
+            "--implementation", "cp",
+            "--only-binary=:all:",
+            "--no-compile",
+            *packages,
+        ],
+        check=True,
+    )
+    print(f"Bundled {', '.join(packages)} for python{LAMBDA_PYTHON_VERSION} ({LAMBDA_PLATFORM})")
+
+
+def lambda_sources() -> List[Path]:
+    return sorted(
+        p for p in SRC.rglob("*.py")
+        if not EXCLUDE_DIRS.intersection(p.relative_to(SRC).parts) and p.name not in EXCLUDE_FILES
+    )
+
+
+def can_precompile() -> bool:
+    """.pyc files are only valid for the Python version that wrote them."""
+    if f"{sys.version_info[0]}.{sys.version_info[1]}" == LAMBDA_PYTHON_VERSION:
+        return True
+    print(f"Not precompiling: building with python{sys.version_info[0]}.{sys.version_info[1]}, "
+          f"Lambda runs python{LAMBDA_PYTHON_VERSION}")
+    return False
+
+
+def precompile(sources: List[Path]) -> None:
+    """Write unchecked-hash .pyc files for the sources and bundled dependencies.
+
+    /var/task is read-only, so without them every cold start compiles every
+    module from source. Unchecked-hash pycs are used as-is: zip timestamps
+    cannot invalidate them.
+    """
+    mode = py_compile.PycInvalidationMode.UNCHECKED_HASH
+    for p in sources:
+        arcname = p.relative_to(ROOT)
+        cfile = PYC / importlib.util.cache_from_source(str(arcname))
+        py_compile.compile(str(p), cfile=str(cfile), dfile=str(arcname), doraise=True, invalidation_mode=mode)
+    if DEPS.exists():
+        compileall.compile_dir(str(DEPS), quiet=1, invalidation_mode=mode)
+
 
 def main():
     if BUILD.exists():
         shutil.rmtree(BUILD)
     BUILD.mkdir(parents=True, exist_ok=True)
+    install_packages()
+
+    sources = lambda_sources()
+    compiled = can_precompile()
+    if compiled:
+        precompile(sources)
+
+    with zipfile.ZipFile(ZIP_PATH, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        for p in sources:
+            zf.write(p, p.relative_to(ROOT))  # keep src/ prefix
+        if compiled:
+            for p in PYC.rglob("*.pyc"):
+                zf.write(p, p.relative_to(PYC))
+        if DEPS.exists():
+            for p in DEPS.rglob("*"):
+                if p.is_file() and (compiled or "__pycache__" not in p.parts):
+                    zf.write(p, p.relative_to(DEPS))  # site-packages at zip root
 
-    with zipfile.ZipFile(ZIP_PATH, "w", zipfile.ZIP_DEFLATED) as zf:
-        for p in SRC.rglob("*.py"):
-            arcname = p.relative_to(ROOT)  # keep src/ prefix
-            zf.write(p, arcname)
+    print(f"Built {ZIP_PATH} ({len(sources)} modules, {ZIP_PATH.stat().st_size // 1024} KiB"
+          f"{', precompiled' if compiled else ''})")
 
-    print(f"Built {ZIP_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Measure the handler's cold start in fresh interpreters.
+
+Usage:
+  python scripts/coldstart.py [--package build/listservice.zip] [--runs 10]
+                              [--max-import-ms 150] [--json coldstart.json]
+
+Reports:
+  - python -X importtime: total time to import src.handler and the modules
+    with the largest self time
+  - a fresh-interpreter timer: import time and first lambda_handler call,
+    median and worst over --runs interpreters
+
+With --package the zip is extracted to a temporary directory and measured
+from there, .pyc files included, like /var/task. Bytecode writing is
+disabled in every run, as on Lambda's read-only filesystem.
+
+Exits non-zero when the median import exceeds --max-import-ms or when a
+module that should be imported lazily (see LAZY_MODULES) is loaded at
+import time.
+
+Notes:
+  - Timings depend on the machine; CI runs this for the trend and uses a
+    generous ceiling. The lazy-module check is exact.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Must not be imported until a request needs them
+LAZY_MODULES = ["sqlite3", "hashlib", "mmap", "random", "http", "msgpack", "brotli", "zstandard", "boto3", "src.listfile"]
+
+TIMER = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import src.handler as handler
+t1 = time.perf_counter()
+event = {"requestContext": {"http": {"path": "/v1/list/head", "method": "POST"}},
+         "body": json.dumps({"list": ["a", "b", "c"], "n": 2})}
+assert handler.lambda_handler(event, None)["statusCode"] == 200
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "first_call_ms": (t2 - t1) * 1e3,
+                  "lazy_loaded": [m for m in sys.argv[1:] if m in sys.modules]}))
+"""
+
+
+def _env():
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", LOG_LEVEL="WARNING")
+    env.pop("PYTHONPATH", None)
+    return env
+
+
+def importtime(cwd: Path, top: int):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.handler"],
+                          cwd=cwd, env=_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    total = next(c for _, c, name in rows if name == "src.handler")
+    return total / 1e3, sorted(rows, reverse=True)[:top]
+
+
+def fresh_runs(cwd: Path, runs: int):
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", TIMER, *LAZY_MODULES],
+                              cwd=cwd, env=_env(), capture_output=True, text=True, check=True)
+        results.append(json.loads(proc.stdout.splitlines()[-1]))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--package", help="Lambda zip to measure instead of the source tree")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    ap.add_argument("--max-import-ms", type=float, help="fail if the median import is slower")
+    ap.add_argument("--json", help="also write the results to this file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = ROOT
+        if args.package:
+            zipfile.ZipFile(args.package).extractall(tmp)
+            cwd = Path(tmp)
+        total_ms, slowest = importtime(cwd, args.top)
+        runs = fresh_runs(cwd, args.runs)
+
+    imports = [r["import_ms"] for r in runs]
+    calls = [r["first_call_ms"] for r in runs]
+    lazy_loaded = sorted({m for r in runs for m in r["lazy_loaded"]})
+    summary = {
+        "source": args.package or "source tree",
+        "importtime_ms": round(total_ms, 2),
+        "import_ms_median": round(statistics.median(imports), 2),
+        "import_ms_max": round(max(imports), 2),
+        "first_call_ms_median": round(statistics.median(calls), 2),
+        "lazy_loaded": lazy_loaded,
+        "slowest_modules": [{"module": name, "self_ms": s / 1e3, "cumulative_ms": c / 1e3} for s, c, name in slowest],
+    }
+
+    print(f"Cold start ({summary['source']}, {args.runs} fresh interpreters)")
+    print(f"  -X importtime src.handler   {summary['importtime_ms']:8.2f} ms")
+    print(f"  import (median / max)       {summary['import_ms_median']:8.2f} / {summary['import_ms_max']:.2f} ms")
+    print(f"  first lambda_handler call   {summary['first_call_ms_median']:8.2f} ms")
+    print("  slowest modules (self ms):")
+    for row in summary["slowest_modules"]:
+        print(f"    {row['self_ms']:7.2f}  {row['module']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+    failed = False
+    if lazy_loaded:
+        print(f"FAIL: imported at cold start, should be lazy: {', '.join(lazy_loaded)}", file=sys.stderr)
+        failed = True
+    if args.max_import_ms is not None and summary["import_ms_median"] > args.max_import_ms:
+        print(f"FAIL: median import {summary['import_ms_median']} ms > {args.max_import_ms} ms", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
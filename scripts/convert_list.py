@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Convert a JSON ListRequest file into a memory-mapped list file.
+
+Usage:
+  python scripts/convert_list.py <request.json> <output.lst>
+  python scripts/convert_list.py <request.json> --store <dir>
+
+With --store the file is written as <dir>/<list_id>.lst, where the handler
+finds it when LIST_STORE=dir:<dir>, and the list_id is printed. Clients then
+send {"list_id": "<list_id>", "n": 5} to /v1/list/head, /tail or /batch.
+
+Notes:
+  - The input is an object with a "list" array of strings; other keys are
+    ignored. MAX_LIST_LENGTH does not apply, so lists of any size convert.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import codec, listfile, storage  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input", help="JSON file shaped like a ListRequest")
+    ap.add_argument("output", nargs="?", help="List file to write")
+    ap.add_argument("--store", help="Write <list_id>.lst into this directory instead")
+    args = ap.parse_args()
+    if bool(args.output) == bool(args.store):
+        ap.error("give either an output file or --store")
+
+    try:
+        items = listfile.items_from_request(codec.CODEC.loads(Path(args.input).read_bytes()))
+    except ValueError as e:
+        print(f"{args.input}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.store:
+        list_id = storage.ListFileStore(args.store).put(items)
+        print(list_id)
+    else:
+        count = listfile.write(args.output, items)
+        print(f"Wrote {count} items to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Load generator for the list API: a live URL or a local stand-in.
+
+Usage:
+  python scripts/loadgen.py TARGET [--concurrency 32] [--duration 10]
+                            [--rate 200] [--mix head=1,tail=1]
+                            [--sizes 10:8,1000:2,10000:1] [--width 40] [--n 10]
+                            [-H "x-api-key: ..."] [--json load.json]
+
+TARGET is one of:
+  https://...   a deployed stage, e.g. the Terraform output api_endpoint
+  local         python -m src.server on a free port (--workers processes)
+  inprocess     lambda_handler called directly: the per-core ceiling of the
+                handler itself, with no HTTP at all (concurrency is moot)
+
+Load model:
+  --concurrency keep-alive connections each send one request at a time.
+  Without --rate they send as fast as the target answers (closed loop);
+  with --rate requests are released on a fixed schedule of R per second
+  (open loop) and latency counts from the scheduled time, so a target
+  that falls behind shows it in the percentiles instead of hiding it.
+
+Payloads: every request picks an operation (head, tail, slice, page or
+sample) from --mix and a list size from --sizes (value:weight pairs), both
+weighted; bodies are generated up front from --seed so the client spends
+its time on I/O.
+
+Reports req/s, p50/p95/p99/max latency, p99 of the 2xx answers alone and
+the status counts, overall and per operation; 429s are the API Gateway
+throttles (head_rate_limit etc.) or the API key buckets (ADMISSION_RATE),
+503s the server's in-flight budget (SERVER_MAX_COST), and connection
+failures count as errors. Exits non-zero when the error
+rate is above --max-error-rate.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import ssl
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+OPERATIONS = ("head", "tail", "slice", "page", "sample")
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class Request(NamedTuple):
+    op: str
+    path: str
+    body: bytes
+
+
+class Sample(NamedTuple):
+    op: str
+    status: int  # 0: connection error or timeout
+    latency: float
+
+
+def weighted(spec: str, cast=str) -> List[Tuple[Any, float]]:
+    """Parse "a:1,b:3" (or "a=1,b=3"; weight defaults to 1) into pairs."""
+    pairs = []
+    for part in spec.split(","):
+        value, _, weight = part.replace("=", ":").partition(":")
+        if not value.strip():
+            continue
+        pairs.append((cast(value.strip()), float(weight) if weight else 1.0))
+    if not pairs or any(w < 0 for _, w in pairs) or not sum(w for _, w in pairs):
+        raise ValueError(f"bad distribution '{spec}'")
+    return pairs
+
+
+def make_requests(mix: List[Tuple[str, float]], sizes: List[Tuple[int, float]], width: int,
+                  n: int, count: int, prefix: str, seed: int) -> List[Request]:
+    """``count`` requests drawn from the distributions; one body per list size."""
+    for op, _ in mix:
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown operation '{op}'")
+    rng = random.Random(seed)
+    items = [f"item-{i}".ljust(width, "x") for i in range(max(size for size, _ in sizes))]
+    bodies = {size: json.dumps({"list": items[:size], "n": n}).encode() for size, _ in sizes}
+    ops = rng.choices([op for op, _ in mix], [w for _, w in mix], k=count)
+    picked = rng.choices([size for size, _ in sizes], [w for _, w in sizes], k=count)
+    return [Request(op, f"{prefix}/v1/list/{op}", bodies[size]) for op, size in zip(ops, picked)]
+
+
+def _ms(latencies: List[float], p: float) -> Optional[float]:
+    """The p-quantile of sorted latencies in milliseconds (nearest rank)."""
+    if not latencies:
+        return None
+    return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1e3, 3)
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    def stats(group: List[Sample]) -> Dict[str, Any]:
+        latencies = sorted(s.latency for s in group)
+        statuses = Counter(s.status for s in group)
+        errors = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+        out: Dict[str, Any] = {
+            "requests": len(group),
+            "rps": round(len(group) / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "status": {str(status): count for status, count in sorted(statuses.items())},
+        }
+        for p in PERCENTILES:
+            out[f"p{int(p * 100)}_ms"] = _ms(latencies, p)
+        out["max_ms"] = _ms(latencies, 1.0)
+        # Shed requests (429/503) answer fast and pull the percentiles down
+        out["ok_p99_ms"] = _ms(sorted(s.latency for s in group if 200 <= s.status < 300), 0.99)
+        return out
+
+    summary = {"elapsed_s": round(elapsed, 3), "all": stats(samples)}
+    for op in sorted({s.op for s in samples}):
+        summary[op] = stats([s for s in samples if s.op == op])
+    return summary
+
+
+# --- HTTP/1.1 keep-alive client ----------------------------------------------
+
+class Connection:
+    def __init__(self, host: str, port: int, tls: Optional[ssl.SSLContext], headers: Dict[str, str]):
+        self.host, self.port, self.tls = host, port, tls
+        self.head = "".join(f"{k}: {v}\r\n" for k, v in {"Host": host, **headers}.items())
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, req: Request) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.tls, server_hostname=self.host if self.tls else None,
+            )
+        assert self.reader is not None
+        self.writer.write(
+            (f"POST {req.path} HTTP/1.1\r\n{self.head}Content-Type: application/json\r\n"
+             f"Content-Length: {len(req.body)}\r\n\r\n").encode("latin-1") + req.body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _worker(target: Connection, requests: List[Request], next_index, started: float,
+                  rate: Optional[float], deadline: float, timeout: float, samples: List[Sample]) -> None:
+    try:
+        while True:
+            i = next_index()
+            req = requests[i % len(requests)]
+            if rate:
+                start = started + i / rate
+                if start >= deadline:
+                    return
+                delay = start - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                start = time.perf_counter()
+                if start >= deadline:
+                    return
+            try:
+                status = await asyncio.wait_for(target.request(req), timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+                target.close()
+                status = 0
+            samples.append(Sample(req.op, status, time.perf_counter() - start))
+    finally:
+        target.close()
+
+
+async def run_http(url: str, requests: List[Request], concurrency: int, duration: float,
+                   rate: Optional[float], timeout: float, headers: Dict[str, str]) -> Tuple[List[Sample], float]:
+    parts = urlsplit(url)
+    tls = ssl.create_default_context() if parts.scheme == "https" else None
+    port = parts.port or (443 if tls else 80)
+    counter = iter(range(1 << 62))
+    samples: List[Sample] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(Connection(parts.hostname or "", port, tls, headers), requests, counter.__next__,
+                start, rate, start + duration, timeout, samples)
+        for _ in range(concurrency)
+    ))
+    return samples, time.perf_counter() - start
+
+
+def run_inprocess(requests: List[Request], duration: float) -> Tuple[List[Sample], float]:
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, str(ROOT))
+    import src.handler as handler
+
+    events = [{"requestContext": {"http": {"path": r.path, "method": "POST"}}, "body": r.body.decode()}
+              for r in requests]
+    samples = []
+    start = time.perf_counter()
+    deadline = start + duration
+    i = 0
+    while True:
+        t0 = time.perf_counter()
+        if t0 >= deadline:
+            break
+        status = handler.lambda_handler(events[i % len(events)], None)["statusCode"]
+        samples.append(Sample(requests[i % len(requests)].op, status, time.perf_counter() - t0))
+        i += 1
+    return samples, time.perf_counter() - start
+
+
+def start_local(workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start src.server on a free port; returns the process and its URL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, env=env,
+    )
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("local server did not start")
+
+
+def _header(value: str) -> Tuple[str, str]:
+    name, sep, v = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError("headers look like 'Name: value'")
+    return name.strip(), v.strip()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Generate load against the list API")
+    ap.add_argument("target", help="base URL, 'local' or 'inprocess'")
+    ap.add_argument("--concurrency", "-c", type=int, default=32, help="keep-alive connections")
+    ap.add_argument("--duration", "-d", type=float, default=10.0, help="seconds")
+    ap.add_argument("--rate", type=float, help="open loop: total requests per second")
+    ap.add_argument("--mix", default="head=1,tail=1", help="operation weights")
+    ap.add_argument("--sizes", default="100", help="list sizes with weights, e.g. 10:8,1000:2")
+    ap.add_argument("--width", type=int, default=40, help="characters per item")
+    ap.add_argument("--n", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=30.0, help="per request, seconds")
+    ap.add_argument("--workers", type=int, default=1, help="server processes for the local target")
+    ap.add_argument("-H", "--header", type=_header, action="append", default=[])
+    ap.add_argument("--max-error-rate", type=float, help="fail if more requests than this fraction fail")
+    ap.add_argument("--json", help="also write the summary to this file")
+    args = ap.parse_args()
+
+    try:
+        mix = weighted(args.mix)
+        sizes = weighted(args.sizes, int)
+        prefix = urlsplit(args.target).path.rstrip("/") if "://" in args.target else ""
+        requests = make_requests(mix, sizes, args.width, args.n, 4096, prefix, args.seed)
+    except ValueError as e:
+        ap.error(str(e))
+
+    proc = None
+    try:
+        if args.target == "inprocess":
+            samples, elapsed = run_inprocess(requests, args.duration)
+        else:
+            url = args.target
+            if url == "local":
+                proc, url = start_local(args.workers)
+            samples, elapsed = asyncio.run(run_http(
+                url, requests, args.concurrency, args.duration, args.rate, args.timeout, dict(args.header),
+            ))
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=10)
+
+    summary = {
+        "target": args.target,
+        "concurrency": 1 if args.target == "inprocess" else args.concurrency,
+        "rate": args.rate,
+        "mix": args.mix,
+        "sizes": args.sizes,
+        **summarize(samples, elapsed),
+    }
+    if args.target == "inprocess":
+        load = "sequential calls"
+    elif args.rate:
+        load = f"{args.rate:g} req/s offered over {args.concurrency} connections"
+    else:
+        load = f"{args.concurrency} connections"
+    print(f"{args.target}: {load}, {summary['elapsed_s']:.1f} s, mix {args.mix}, sizes {args.sizes}")
+    print(f"  {'':<6} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+          f" {'2xx p99':>8} {'errors':>7}  status")
+    for key in ["all", *[op for op in OPERATIONS if op in summary]]:
+        row = summary[key]
+        cols = [f"{row[k]:>8.2f}" if row[k] is not None else f"{'-':>8}"
+                for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms", "ok_p99_ms")]
+        status = " ".join(f"{code}:{count}" for code, count in row["status"].items())
+        print(f"  {key:<6} {row['requests']:>9} {row['rps']:>9.1f} {' '.join(cols)} {row['error_rate']:>7.1%}  {status}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+    if args.max_error_rate is not None and summary["all"]["error_rate"] > args.max_error_rate:
+        print(f"FAIL: error rate {summary['all']['error_rate']:.2%} > {args.max_error_rate:.2%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
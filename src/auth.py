@@ -0,0 +1,96 @@
+"""
+API key verification, for the HTTP API's Lambda authorizer and for the
+handler's own check (AUTH_MODE=handler in src/handler.py).
+
+Keys are never stored: API_KEY_HASHES holds the hex SHA-256 of every accepted
+key, comma-separated, and is parsed once at cold start. A presented key is
+hashed and compared with every stored digest using hmac.compare_digest,
+without stopping at a match, so the time taken says nothing about which key
+matched or how much of it was right.
+
+As the authorizer Lambda this module is deployed on its own (handler
+auth.lambda_handler) and answers HTTP API REQUEST authorizer events with
+simple responses. API Gateway caches each decision per x-api-key value for
+the authorizer's result TTL, so a busy key costs one authorizer call per TTL
+rather than one per request.
+
+  python -m src.auth <key>    prints the API_KEY_HASHES entry for a key
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+HEADER = "x-api-key"
+# Key ids in the authorizer context and logs: a prefix of the key's hash
+KEY_ID_LENGTH = 12
+
+
+def hash_key(key: str) -> str:
+    """The API_KEY_HASHES entry for ``key``."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class KeyVerifier:
+    """Checks presented keys against a fixed set of SHA-256 digests."""
+
+    def __init__(self, hashes: Iterable[str]):
+        digests = []
+        for entry in hashes:
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            try:
+                digest = bytes.fromhex(entry)
+            except ValueError:
+                digest = b""
+            if len(digest) != hashlib.sha256().digest_size:
+                raise ValueError("API_KEY_HASHES entries must be hex SHA-256 digests")
+            digests.append(digest)
+        self._digests = tuple(digests)
+
+    @classmethod
+    def from_env(cls) -> "KeyVerifier":
+        verifier = cls(os.getenv("API_KEY_HASHES", "").split(","))
+        if not verifier:
+            logger.error("API_KEY_HASHES is empty: every API key will be rejected")
+        return verifier
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __call__(self, key: str) -> Optional[str]:
+        """The key id of ``key`` if it is accepted, else None."""
+        presented = hashlib.sha256(key.encode("utf-8", "surrogatepass")).digest()
+        matched = None
+        for digest in self._digests:
+            if hmac.compare_digest(presented, digest):
+                matched = digest
+        return matched.hex()[:KEY_ID_LENGTH] if matched is not None else None
+
+
+# Parsed once per container, at cold start: a bad entry fails the init
+VERIFIER = KeyVerifier.from_env()
+
+_DENY = {"isAuthorized": False}
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """HTTP API REQUEST authorizer (payload 2.0, simple responses)."""
+    # HTTP API lowercases header names
+    key = (event.get("headers") or {}).get(HEADER)
+    key_id = VERIFIER(key) if key else None
+    if key_id is None:
+        return _DENY
+    return {"isAuthorized": True, "context": {"auth": "apikey", "key_id": key_id}}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m src.auth <api key>")
+    print(hash_key(sys.argv[1]))
@@ -0,0 +1,93 @@
+"""
+In-process cache of validation outcomes keyed by the raw request body.
+
+A warm Lambda container keeps the cache between invocations, so a body that
+was already parsed and validated is answered without json.loads/_validate.
+Entries are looked up by the body's built-in str hash and confirmed with a
+full string comparison, so a hash collision can never return another
+request's list.
+
+Memory is bounded by max_entries and max_bytes (least recently used entries
+are evicted first) and every entry expires ttl seconds after it was stored.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Approximate cost of an entry: the retained body, the characters of the
+# decoded strings (never more than the body's), and per decoded item a str
+# object header plus its slot in the list.
+_ENTRY_OVERHEAD = 64
+_ITEM_OVERHEAD = sys.getsizeof("") + 8
+
+
+class ListCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # hash(body) -> (body, value, expires_at, cost)
+        self._entries: "OrderedDict[int, Tuple[str, Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, body: str) -> Optional[Any]:
+        """Return the cached value for ``body``, or None on a miss."""
+        key = hash(body)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[2] <= self._clock():
+                self._remove(key)
+                self.evictions += 1
+            elif entry[0] == body:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, body: str, value: Any, items: int = 0) -> None:
+        """Store ``value`` for ``body``; ``items`` is the number of strings it holds."""
+        cost = 2 * sys.getsizeof(body) + items * _ITEM_OVERHEAD + _ENTRY_OVERHEAD
+        if not self.enabled or cost > self.max_bytes:
+            return
+        key = hash(body)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (body, value, self._clock() + self.ttl, cost)
+        self._bytes += cost
+
+        now = self._clock()
+        while self._entries:
+            oldest = next(iter(self._entries))
+            if (len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes
+                    and self._entries[oldest][2] > now):
+                break
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _remove(self, key: int) -> None:
+        self._bytes -= self._entries.pop(key)[3]
@@ -0,0 +1,61 @@
+"""
+Result bodies encoded a slice of items at a time, for responses that are
+sent while they are being produced instead of built as one string.
+
+  application/json      {"result": [...]} (or the /page envelope), the array
+                        split across chunks and joined with the codec's
+                        separator: byte for byte the buffered response
+  application/x-ndjson  one JSON string per line, so a client can use the
+                        first items before the last ones are encoded
+
+Each chunk is one codec call over a slice of the result, so a streamed body
+costs about what one json.dumps of the whole list does, while at most one
+chunk of encoded output exists at a time.
+
+An encoded string never contains a raw newline, and when a slice has no
+escape at all every quote in it delimits an item, so NDJSON lines are cut
+out of the encoded slice with one bytes.replace of the item separator. A
+slice with a backslash (an item like 'a",' would fool the replace) is
+encoded item by item.
+"""
+
+from typing import Iterator, List, Optional
+
+from src import codec
+
+NDJSON = "application/x-ndjson"
+
+# ',' for compact codecs, ', ' for stdlib json
+_COMMA = codec.CODEC.dumpb(["", ""])[3:-3]
+_SEPARATOR = b'"' + _COMMA + b'"'
+_NEWLINE = b'"\n"'
+
+
+def _slices(result: List[str], chunk_items: int) -> Iterator[bytes]:
+    """The encoded items of each slice, without the array brackets."""
+    dumpb = codec.CODEC.dumpb
+    for start in range(0, len(result), chunk_items):
+        yield dumpb(result[start:start + chunk_items])[1:-1]
+
+
+def json_result(result: List[str], chunk_items: int, next_cursor: Optional[str] = None,
+                paged: bool = False) -> Iterator[bytes]:
+    """{"result": [...]} in chunks; with ``paged`` the /page envelope and its cursor."""
+    head = b'{"result": ['
+    for part in _slices(result, chunk_items):
+        yield head + part
+        head = _COMMA
+    tail = b'], "next_cursor": ' + codec.CODEC.dumpb(next_cursor) + b"}" if paged else b"]}"
+    yield tail if result else head + tail
+
+
+def ndjson(result: List[str], chunk_items: int) -> Iterator[bytes]:
+    """One JSON string per line, chunk_items lines per chunk."""
+    dumpb = codec.CODEC.dumpb
+    for start in range(0, len(result), chunk_items):
+        items = result[start:start + chunk_items]
+        part = dumpb(items)[1:-1]
+        if b"\\" in part:
+            yield b"\n".join(map(dumpb, items)) + b"\n"
+        else:
+            yield part.replace(_SEPARATOR, _NEWLINE) + b"\n"
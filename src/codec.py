@@ -0,0 +1,91 @@
+"""
+JSON codec used for request decoding and response encoding.
+
+The backend is chosen once at import time from the JSON_CODEC environment
+variable:
+
+  json    stdlib json (default)
+  auto    fastest installed library: orjson, then ujson, then stdlib
+  orjson  orjson, falling back to stdlib if it is not installed
+  ujson   ujson, falling back to stdlib if it is not installed
+
+The libraries are stricter than stdlib json: they reject NaN and Infinity,
+integers beyond 64 bits and lone surrogates ("\ud800"), and orjson omits the
+spaces after separators. stdlib stays the default so responses and errors are
+the same as without a library; src/stream.py follows the codec in use.
+
+Every backend raises a ValueError subclass on malformed input, and
+EncodeError (a ValueError) on a value it cannot encode.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Callable, NamedTuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class EncodeError(ValueError):
+    """A decoded value the codec cannot encode back, e.g. a lone surrogate."""
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    dumps: Callable[[Any], str]
+    dumpb: Callable[[Any], bytes]
+    # Whether loads accepts NaN, big integers and lone surrogates (stdlib only)
+    lenient: bool = False
+
+
+def _stdlib() -> Codec:
+    return Codec("json", json.loads, json.dumps, lambda obj: json.dumps(obj).encode(), True)
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    def dumpb(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError as e:
+            raise EncodeError(f"Result cannot be encoded as JSON: {e}") from None
+
+    return Codec("orjson", orjson.loads, lambda obj: dumpb(obj).decode(), dumpb)
+
+
+def _ujson() -> Codec:
+    import ujson
+
+    def dumps(obj: Any) -> str:
+        try:
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        except (OverflowError, UnicodeError) as e:
+            raise EncodeError(f"Result cannot be encoded as JSON: {e}") from None
+
+    return Codec("ujson", ujson.loads, dumps, lambda obj: dumps(obj).encode())
+
+
+_BACKENDS = {"orjson": _orjson, "ujson": _ujson, "json": _stdlib}
+
+
+def load(name: str) -> Codec:
+    """Return the codec for ``name``, falling back to stdlib json."""
+    name = (name or "json").lower()
+    candidates = ["orjson", "ujson"] if name == "auto" else [name]
+
+    for candidate in candidates:
+        factory = _BACKENDS.get(candidate)
+        if factory is None:
+            logger.warning("unknown JSON_CODEC %r, using stdlib json", candidate)
+            continue
+        try:
+            return factory()
+        except ImportError:
+            if name != "auto":
+                logger.warning("JSON_CODEC %r is not installed, using stdlib json", candidate)
+    return _stdlib()
+
+
+CODEC = load(os.getenv("JSON_CODEC", "json"))
@@ -0,0 +1,206 @@
+"""
+Content-Encoding support: bounded request decompression and response
+compression.
+
+gzip and deflate use the stdlib zlib module and are always available. br
+and zstd are offered when the optional brotli / zstandard packages are
+installed (bundle them like the JSON codecs, see scripts/build_zip.py);
+br needs brotli 1.2 or later, whose decoder can bound its output.
+
+Decompression is bounded: output is produced incrementally and stops as soon
+as it exceeds the caller's limit, so a small compressed body cannot expand
+into an unbounded allocation.
+"""
+
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class UnsupportedEncoding(ValueError):
+    """The Content-Encoding is unknown or its library is not installed."""
+
+
+class TooLarge(ValueError):
+    """Decompressed output exceeds the limit."""
+
+
+class Encoding(NamedTuple):
+    name: str
+    decompress: Callable[[bytes, int], bytes]
+    compress: Callable[[bytes], bytes]
+
+
+def _zlib_decompress(wbits: int) -> Callable[[bytes, int], bytes]:
+    def decompress(data: bytes, limit: int) -> bytes:
+        out: List[bytes] = []
+        size = 0
+        # Concatenated gzip members are one stream (RFC 1952)
+        while data:
+            d = zlib.decompressobj(wbits)
+            chunk = d.decompress(data, limit + 1 - size)
+            size += len(chunk)
+            if size > limit or d.unconsumed_tail:
+                raise TooLarge()
+            if not d.eof:
+                raise ValueError("truncated stream")
+            out.append(chunk)
+            data = d.unused_data
+        return b"".join(out)
+
+    return decompress
+
+
+# Level 1: on list responses it is ~2.5x faster than the default level 6 for
+# about 4% more output (see benchmarks/test_compression_bench.py).
+def _zlib_compress(wbits: int, level: int = 1) -> Callable[[bytes], bytes]:
+    def compress(data: bytes) -> bytes:
+        c = zlib.compressobj(level, zlib.DEFLATED, wbits)
+        return c.compress(data) + c.flush()
+
+    return compress
+
+
+def _brotli() -> Encoding:
+    import brotli
+
+    # Before 1.2 process() has no output limit: one small input can inflate
+    # to many megabytes in a single call
+    if not hasattr(brotli.Decompressor, "can_accept_more_data"):
+        raise ImportError("brotli >= 1.2 is required")
+
+    def decompress(data: bytes, limit: int) -> bytes:
+        d = brotli.Decompressor()
+        out: List[bytes] = []
+        size = 0
+        chunk = d.process(data, output_buffer_limit=limit + 1)
+        while True:
+            size += len(chunk)
+            if size > limit:
+                raise TooLarge()
+            out.append(chunk)
+            if d.can_accept_more_data():
+                break
+            chunk = d.process(b"", output_buffer_limit=limit + 1 - size)
+        if not d.is_finished():
+            raise ValueError("truncated stream")
+        return b"".join(out)
+
+    return Encoding("br", decompress, lambda data: brotli.compress(data, quality=4))
+
+
+def _zstd() -> Encoding:
+    import zstandard
+
+    def decompress(data: bytes, limit: int) -> bytes:
+        with zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True) as reader:
+            out = reader.read(limit + 1)
+        if len(out) > limit:
+            raise TooLarge()
+        return out
+
+    compressor = zstandard.ZstdCompressor(level=3)
+    return Encoding("zstd", decompress, compressor.compress)
+
+
+def _available() -> Dict[str, Encoding]:
+    encodings = {
+        "gzip": Encoding("gzip", _zlib_decompress(16 + zlib.MAX_WBITS), _zlib_compress(16 + zlib.MAX_WBITS)),
+        "deflate": Encoding("deflate", _zlib_decompress(zlib.MAX_WBITS), _zlib_compress(zlib.MAX_WBITS)),
+    }
+    for factory in (_brotli, _zstd):
+        try:
+            encoding = factory()
+        except ImportError:
+            continue
+        encodings[encoding.name] = encoding
+    return encodings
+
+
+# Built on first use, so brotli/zstandard are not imported at cold start
+ENCODINGS: Optional[Dict[str, Encoding]] = None
+
+
+def available() -> Dict[str, Encoding]:
+    """Installed encodings by Content-Encoding name."""
+    global ENCODINGS
+    if ENCODINGS is None:
+        ENCODINGS = _available()
+    return ENCODINGS
+
+
+def require(name: str) -> Encoding:
+    """The installed encoding called ``name``, or UnsupportedEncoding."""
+    encoding = available().get(name)
+    if encoding is None:
+        raise UnsupportedEncoding(f"Unsupported Content-Encoding '{name}'")
+    return encoding
+
+
+def decompress(name: str, data: bytes, limit: int) -> bytes:
+    """Decode ``data`` sent with Content-Encoding ``name``.
+
+    Raises TooLarge past ``limit`` bytes of output, UnsupportedEncoding for
+    an unknown or unavailable encoding and ValueError for corrupt input.
+    """
+    name = name.strip().lower()
+    if name in ("", "identity"):
+        if len(data) > limit:
+            raise TooLarge()
+        return data
+    encoding = require(name)
+    try:
+        return encoding.decompress(data, limit)
+    except (TooLarge, UnsupportedEncoding):
+        raise
+    except Exception as e:  # zlib.error, brotli.error, zstandard.ZstdError
+        raise ValueError(f"Body is not valid {name} data") from e
+
+
+def compress(name: str, data: bytes) -> bytes:
+    return available()[name].compress(data)
+
+
+# Encodings compress_chunks can produce, with their zlib wbits
+STREAMING = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def compress_chunks(name: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """``chunks`` as one compressed stream, each chunk flushed as it is produced."""
+    c = zlib.compressobj(1, zlib.DEFLATED, STREAMING[name])
+    for chunk in chunks:
+        # A sync flush ends on a byte boundary, so the client can decode
+        # everything sent so far
+        yield c.compress(chunk) + c.flush(zlib.Z_SYNC_FLUSH)
+    yield c.flush()
+
+
+def _accepted(header: str) -> Tuple[Dict[str, float], float]:
+    """Parse Accept-Encoding into {coding: q} and the q of "*"."""
+    weights: Dict[str, float] = {}
+    star = 0.0
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            star = q
+        elif coding:
+            weights[coding] = q
+    return weights, star
+
+
+def negotiate(accept_encoding: str, offered: Sequence[str]) -> Optional[str]:
+    """Pick the first of ``offered`` (server preference order) the client accepts."""
+    weights, star = _accepted(accept_encoding)
+    encodings = available()
+    for name in offered:
+        if name in encodings and weights.get(name, star) > 0:
+            return name
+    return None
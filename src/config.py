@@ -0,0 +1,199 @@
+"""
+Request limits that can change without a redeploy, globally or per tenant.
+
+The limits are read from one JSON document:
+
+  {"max_list_length": 20000, "max_n": 20000,
+   "tenants": {"<key id>": {"max_list_length": 100000}}}
+
+Top-level fields override the built-in defaults (the MAX_* constants in
+src/handler.py); a tenant's fields override the top level for requests
+authenticated as that tenant. Missing fields keep their defaults.
+
+The document comes from the source named by CONFIG_SOURCE:
+
+  ssm:<parameter name>        one SSM GetParameter (SecureString is decrypted)
+  secretsmanager:<secret id>  one Secrets Manager GetSecretValue
+  file:<path>                 a local JSON file (containers, tests)
+  (unset)                     built-in defaults, nothing is fetched
+
+It is fetched once at cold start, in a single call. After CONFIG_TTL seconds
+the next request starts a refresh on a background thread and keeps using the
+current limits, so no request ever waits for a fetch. A Lambda container is
+frozen between invocations, so a refresh can finish during a later one. A
+failed fetch keeps the last good limits and is retried after RETRY_AFTER
+seconds.
+
+boto3 is imported when an AWS source is opened, not at cold start.
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a failed fetch is tried again (at most the TTL)
+RETRY_AFTER = 30.0
+
+
+class Limits(NamedTuple):
+    max_list_length: int
+    max_string_length: int
+    max_body_size: int
+    max_n: int
+
+
+class ConfigSource(ABC):
+    @abstractmethod
+    def fetch(self) -> Dict[str, Any]:
+        """The current limits document."""
+
+
+class StaticSource(ConfigSource):
+    """A document held in memory: the local stand-in for tests."""
+
+    def __init__(self, document: Optional[Dict[str, Any]] = None):
+        self.document = document or {}
+        self.fetches = 0
+
+    def fetch(self) -> Dict[str, Any]:
+        self.fetches += 1
+        return self.document
+
+
+class FileSource(ConfigSource):
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> Dict[str, Any]:
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+class SsmSource(ConfigSource):
+    def __init__(self, name: str, client: Any = None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("ssm")
+        self.name = name
+        self._client = client
+
+    def fetch(self) -> Dict[str, Any]:
+        response = self._client.get_parameter(Name=self.name, WithDecryption=True)
+        return json.loads(response["Parameter"]["Value"])
+
+
+class SecretsManagerSource(ConfigSource):
+    def __init__(self, secret_id: str, client: Any = None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("secretsmanager")
+        self.secret_id = secret_id
+        self._client = client
+
+    def fetch(self) -> Dict[str, Any]:
+        response = self._client.get_secret_value(SecretId=self.secret_id)
+        return json.loads(response["SecretString"])
+
+
+def open_source(url: str) -> Optional[ConfigSource]:
+    """Build the source described by a CONFIG_SOURCE url, or None if unset."""
+    if not url:
+        return None
+    kind, _, target = url.partition(":")
+    if kind == "ssm" and target:
+        return SsmSource(target)
+    if kind == "secretsmanager" and target:
+        return SecretsManagerSource(target)
+    if kind == "file" and target:
+        return FileSource(target)
+    raise ValueError(f"unsupported CONFIG_SOURCE {url!r}")
+
+
+def _merged(base: Limits, fields: Any, where: str) -> Limits:
+    if not isinstance(fields, dict):
+        raise ValueError(f"{where} must be an object")
+    values = base._asdict()
+    for name in Limits._fields:
+        if name in fields:
+            value = fields[name]
+            if type(value) is not int or value <= 0:
+                raise ValueError(f"{where}.{name} must be a positive integer")
+            values[name] = value
+    return Limits(**values)
+
+
+def parse(document: Any, defaults: Limits) -> Dict[Optional[str], Limits]:
+    """Limits by tenant from a limits document; the None entry applies to everyone else."""
+    limits = _merged(defaults, document, "config")
+    tenants = document.get("tenants", {})
+    if not isinstance(tenants, dict):
+        raise ValueError("config.tenants must be an object")
+    table: Dict[Optional[str], Limits] = {None: limits}
+    for tenant, fields in tenants.items():
+        table[tenant] = _merged(limits, fields, f"config.tenants.{tenant}")
+    return table
+
+
+class RuntimeConfig:
+    def __init__(self, defaults: Limits, source: Optional[ConfigSource] = None, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.defaults = defaults
+        self.source = source
+        self.ttl = ttl
+        self._clock = clock
+        # Replaced as a whole by a refresh, so a request never sees half of one
+        self._table: Dict[Optional[str], Limits] = {None: defaults}
+        self._expires = float("inf") if source is None else 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.refreshes = 0
+        self.failures = 0
+
+    def limits(self, tenant: Optional[str] = None) -> Limits:
+        """Current limits for ``tenant``; never waits for a fetch."""
+        if self._clock() >= self._expires:
+            self._refresh_in_background()
+        table = self._table
+        return table.get(tenant) or table[None]
+
+    def max_body_size(self) -> int:
+        """The largest max_body_size of any tenant: the bound before a request's tenant is known."""
+        return max(limits.max_body_size for limits in self._table.values())
+
+    def load(self) -> bool:
+        """Fetch and apply the document now; False (and the old limits kept) on failure."""
+        if self.source is None:
+            return True
+        try:
+            table = parse(self.source.fetch(), self.defaults)
+        except Exception:  # boto3's errors are not all one type
+            self.failures += 1
+            self._expires = self._clock() + min(RETRY_AFTER, self.ttl)
+            logger.exception("config fetch failed; keeping the current limits")
+            return False
+        self._table = table
+        self._expires = self._clock() + self.ttl
+        self.refreshes += 1
+        return True
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            # Until the refresh sets a new expiry, later requests skip the lock
+            self._expires = float("inf")
+        threading.Thread(target=self._refresh, name="config-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        try:
+            self.load()
+        finally:
+            self._refreshing = False
@@ -0,0 +1,106 @@
+"""
+Normalizes the Lambda proxy events the function can be invoked with into one
+Request, so the handler reads method, path, headers and body the same way
+whichever integration sits in front of it:
+
+  HTTP API (payload 2.0)  requestContext.http.method/path
+  REST API (payload 1.0)  httpMethod/path, headers plus multiValueHeaders
+  ALB                     httpMethod/path with requestContext.elb; headers or,
+                          when the target group enables them, only
+                          multiValueHeaders
+
+The shape is detected once per invocation. HTTP API already lowercases
+header names; REST API and ALB keep the client's, so theirs are lowercased
+once here. Every later lookup is a plain dict get. to_response() adds what an
+ALB needs on the way out (statusDescription, multiValueHeaders); API
+Gateway responses pass through unchanged.
+"""
+
+from typing import Any, Dict, Optional
+
+HTTP_API = "http"
+REST_API = "rest"
+ALB = "alb"
+
+
+class Request:
+    __slots__ = ("kind", "method", "path", "headers", "body", "is_base64", "multi_value", "tenant", "streaming")
+
+    def __init__(self, kind: str, method: str, path: str, headers: Dict[str, str],
+                 body: Optional[str], is_base64: bool, multi_value: bool = False,
+                 tenant: Optional[str] = None):
+        self.kind = kind
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.is_base64 = is_base64
+        self.multi_value = multi_value
+        # Who the caller authenticated as, for per-tenant limits: the key id
+        # from the API key authorizer (HTTP API) or the API key id (REST API)
+        self.tenant = tenant
+        # Set by entry points that can send a body in chunks (src/server.py);
+        # a Lambda response is always one string
+        self.streaming = False
+
+    def header(self, name: str) -> str:
+        """Request header ``name`` (lowercase); "" if absent."""
+        return self.headers.get(name, "")
+
+
+def _lowered(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    if not headers:
+        return {}
+    return {name.lower(): value for name, value in headers.items()}
+
+
+def _joined(headers: Dict[str, Any]) -> Dict[str, str]:
+    return {name.lower(): ",".join(values) for name, values in headers.items() if values}
+
+
+def from_event(event: Dict[str, Any]) -> Request:
+    context = event.get("requestContext") or {}
+    http = context.get("http")
+    if http is not None:
+        authorizer = context.get("authorizer")
+        return Request(
+            HTTP_API,
+            (http.get("method") or "GET").upper(),
+            (http.get("path") or "").lower(),
+            event.get("headers") or {},
+            event.get("body"),
+            bool(event.get("isBase64Encoded")),
+            tenant=(authorizer.get("lambda") or {}).get("key_id") if authorizer else None,
+        )
+
+    kind = ALB if "elb" in context else REST_API
+    headers = event.get("headers")
+    multi_value = headers is None and event.get("multiValueHeaders") is not None
+    identity = context.get("identity")
+    return Request(
+        kind,
+        (event.get("httpMethod") or "GET").upper(),
+        (event.get("path") or "").lower(),
+        _joined(event["multiValueHeaders"]) if multi_value else _lowered(headers),
+        event.get("body"),
+        bool(event.get("isBase64Encoded")),
+        multi_value,
+        identity.get("apiKeyId") if identity else None,
+    )
+
+
+def to_response(request: Request, response: Dict[str, Any]) -> Dict[str, Any]:
+    """The handler's response in the shape ``request``'s integration expects."""
+    if request.kind != ALB:
+        return response
+    from http import HTTPStatus  # ~3 ms of enum setup, only ALB needs it
+
+    status = response["statusCode"]
+    try:
+        response["statusDescription"] = f"{status} {HTTPStatus(status).phrase}"
+    except ValueError:
+        response["statusDescription"] = str(status)
+    response.setdefault("isBase64Encoded", False)
+    if request.multi_value:
+        response["multiValueHeaders"] = {name: [value] for name, value in response.pop("headers").items()}
+    return response
@@ -0,0 +1,235 @@
+"""
+Alternatives to JSON for the list routes, chosen by Content-Type (request)
+and Accept (response).
+
+  application/msgpack             MessagePack, same shape as the JSON bodies:
+                                  {"list": [...], "n": 3} -> {"result": [...]}
+                                  (needs the optional msgpack package)
+  application/vnd.listservice.list
+                                  length-prefixed UTF-8, little-endian u32s:
+                                  request  n, count, count byte lengths, items
+                                  response count, count byte lengths, items
+  application/x-ndjson            text, one JSON string per line; a request
+                                  may start with a line of the other fields:
+                                  {"n": 3}\n"a"\n"b"\n  ->  "a"\n"b"\n
+
+The lengths come first as one table, so item boundaries are computed with
+array/accumulate instead of unpacking one prefix per item.
+
+/head and /tail read NDJSON requests a line at a time (src/stream.py); this
+module decodes the whole body, for the other routes and for error reports.
+NDJSON responses are sent in chunks where the entry point can stream (see
+src/chunked.py).
+
+Decoding only produces the request payload; the handler validates it with
+the same _validate limits as a JSON body. JSON stays the default, and
+errors are always JSON.
+"""
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src import chunked, codec
+
+MSGPACK = "application/msgpack"
+LENGTH_PREFIXED = "application/vnd.listservice.list"
+NDJSON = chunked.NDJSON
+
+_HEADER = struct.Struct("<II")  # n, count
+_COUNT = struct.Struct("<I")
+
+
+class UnsupportedMediaType(ValueError):
+    """A known binary Content-Type whose library is not installed."""
+
+
+class Format(NamedTuple):
+    media_type: str
+    loads: Callable[[bytes], Dict[str, Any]]
+    dumps: Callable[[List[str]], bytes]
+
+
+def _lengths(data: bytes, start: int, count: int) -> "array[int]":
+    lengths = array("I")
+    lengths.frombytes(data[start:start + 4 * count])
+    if sys.byteorder != "little":
+        lengths.byteswap()
+    return lengths
+
+
+def _loads_length_prefixed(data: bytes) -> Dict[str, Any]:
+    try:
+        n, count = _HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise ValueError("Body must be a length-prefixed list") from e
+    blob_start = _HEADER.size + 4 * count
+    # Reject impossible counts before allocating anything
+    if blob_start > len(data):
+        raise ValueError("Body must be a length-prefixed list")
+
+    ends = list(accumulate(_lengths(data, _HEADER.size, count)))
+    if (ends[-1] if ends else 0) != len(data) - blob_start:
+        raise ValueError("Body must be a length-prefixed list")
+    starts = [0, *ends[:-1]]
+
+    blob = data[blob_start:]
+    if blob.isascii():
+        # Byte offsets are character offsets: decode once, slice the str
+        text = blob.decode("ascii")
+        items = [text[a:b] for a, b in zip(starts, ends)]
+    else:
+        try:
+            items = [blob[a:b].decode("utf-8") for a, b in zip(starts, ends)]
+        except UnicodeDecodeError as e:
+            raise ValueError("Body must be a length-prefixed list") from e
+    return {"list": items, "n": n}
+
+
+def _dumps_length_prefixed(result: List[str]) -> bytes:
+    encoded = [item.encode("utf-8", "surrogatepass") for item in result]
+    lengths = array("I", map(len, encoded))
+    if sys.byteorder != "little":
+        lengths.byteswap()
+    return _COUNT.pack(len(encoded)) + lengths.tobytes() + b"".join(encoded)
+
+
+def _msgpack() -> Format:
+    import msgpack
+
+    def loads(data: bytes) -> Dict[str, Any]:
+        try:
+            payload = msgpack.unpackb(data, raw=False)
+        except Exception as e:  # msgpack's errors are not all ValueErrors
+            raise ValueError("Body must be valid MessagePack") from e
+        if not isinstance(payload, dict):
+            raise ValueError("Body must be a MessagePack map")
+        return payload
+
+    def dumps(result: List[str]) -> bytes:
+        return msgpack.packb({"result": result})
+
+    return Format(MSGPACK, loads, dumps)
+
+
+def loads_ndjson(text: str) -> Dict[str, Any]:
+    """The payload of an NDJSON body: the header line's fields plus "list".
+
+    Items are kept whatever their JSON type, so _validate reports non-strings
+    and over-long strings with the same messages and indexes as for JSON.
+    """
+    lines = text.split("\n")
+    payload: Dict[str, Any] = {}
+    if lines[0].lstrip().startswith("{"):
+        try:
+            payload = codec.CODEC.loads(lines[0])
+        except ValueError as e:
+            raise ValueError("Body must be valid NDJSON (line 1)") from e
+        del lines[0]
+        first = 2
+    else:
+        first = 1
+    if lines and not lines[-1].strip():
+        # The newline that ends the last line
+        del lines[-1]
+    items = []
+    for number, line in enumerate(lines, first):
+        try:
+            items.append(codec.CODEC.loads(line))
+        except ValueError as e:
+            raise ValueError(f"Body must be valid NDJSON (line {number})") from e
+    payload["list"] = items
+    return payload
+
+
+def _loads_ndjson(data: bytes) -> Dict[str, Any]:
+    try:
+        return loads_ndjson(data.decode())
+    except UnicodeDecodeError as e:
+        raise ValueError("Body must be valid UTF-8") from e
+
+
+def _dumps_ndjson(result: List[str]) -> bytes:
+    return b"".join(chunked.ndjson(result, max(len(result), 1)))
+
+
+def _available() -> Dict[str, Format]:
+    formats = {
+        LENGTH_PREFIXED: Format(LENGTH_PREFIXED, _loads_length_prefixed, _dumps_length_prefixed),
+        NDJSON: Format(NDJSON, _loads_ndjson, _dumps_ndjson),
+    }
+    try:
+        formats[MSGPACK] = _msgpack()
+    except ImportError:
+        pass
+    return formats
+
+
+# Built on first use, so msgpack is not imported at cold start
+FORMATS: Optional[Dict[str, Format]] = None
+_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK,
+            "application/jsonl": NDJSON, "application/jsonlines": NDJSON}
+# Accept values that always mean JSON, answered without parsing
+_JSON_ACCEPT = frozenset(("*/*", "application/json", "application/*"))
+
+
+def available() -> Dict[str, Format]:
+    """Installed binary formats by media type."""
+    global FORMATS
+    if FORMATS is None:
+        FORMATS = _available()
+    return FORMATS
+
+
+def _media_type(value: str) -> str:
+    media_type = value.partition(";")[0].strip().lower()
+    return _ALIASES.get(media_type, media_type)
+
+
+def from_content_type(content_type: str) -> Optional[Format]:
+    """The format of a request body, or None for JSON (and anything else)."""
+    if not content_type:
+        return None
+    media_type = _media_type(content_type)
+    if media_type not in (MSGPACK, LENGTH_PREFIXED, NDJSON):
+        return None
+    fmt = available().get(media_type)
+    if fmt is None and media_type == MSGPACK:
+        raise UnsupportedMediaType(f"Unsupported Content-Type '{media_type}'")
+    return fmt
+
+
+def from_accept(accept: str) -> Optional[Format]:
+    """The format (binary or NDJSON) the client prefers over JSON, or None for JSON.
+
+    Ties go to JSON, so "*/*" and unknown types keep the JSON default.
+    """
+    if not accept or accept in _JSON_ACCEPT:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept.split(","):
+        media_range, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[_media_type(media_range)] = q
+
+    def weight(media_type: str) -> float:
+        for key in (media_type, media_type.split("/")[0] + "/*", "*/*"):
+            if key in weights:
+                return weights[key]
+        return 0.0
+
+    best, best_q = None, weight("application/json")
+    for media_type, fmt in available().items():
+        q = weight(media_type)
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
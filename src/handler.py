@@ -1,7 +1,12 @@
-import json
+import base64
 import logging
 import os
-from typing import List, Tuple, Any, Dict
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Any, Callable, Dict, Iterator, Mapping
+
+from src import admission, chunked, codec, compress, config, events, formats, metrics, storage, stream
+from src.cache import ListCache
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO))
@@ -11,88 +16,746 @@ logger = logging.getLogger(__name__)
 MAX_LIST_LENGTH = 10000  # Maximum number of items in the list
 MAX_STRING_LENGTH = 1000  # Maximum length of each string in the list
 MAX_BODY_SIZE = 1024 * 1024  # 1 MB max request body size
+MAX_N = 10000  # Maximum value of 'n'
+MAX_BATCH_JOBS = 1000  # Maximum number of jobs or queries in one batch request
 
+# The limits above are defaults. CONFIG_SOURCE (e.g. "ssm:/listservice/dev/limits")
+# can raise or lower them, globally or per tenant, without a redeploy: fetched
+# once here at cold start and refreshed in the background every CONFIG_TTL s.
+DEFAULT_LIMITS = config.Limits(MAX_LIST_LENGTH, MAX_STRING_LENGTH, MAX_BODY_SIZE, MAX_N)
+CONFIG = config.RuntimeConfig(
+    DEFAULT_LIMITS,
+    config.open_source(os.getenv("CONFIG_SOURCE", "")),
+    ttl=float(os.getenv("CONFIG_TTL", "300")),
+)
+CONFIG.load()
 
-def _parse_body(event: Dict[str, Any]) -> Dict[str, Any]:
-    body_raw = event.get("body") or "{}"
-    
-    # Check body size to prevent DoS attacks
-    if len(body_raw) > MAX_BODY_SIZE:
-        raise ValueError(f"Request body too large (max {MAX_BODY_SIZE} bytes)")
-    
+# Request parser for /head and /tail: "json" decodes the whole body with
+# the JSON codec, "stream" reads the list incrementally and only keeps n items.
+LIST_PARSER = os.getenv("LIST_PARSER", "json").lower()
+
+# Validated lists (or validation errors) of recently seen bodies, kept for the
+# life of the warm container. LIST_CACHE_ENTRIES=0 disables the cache.
+LIST_CACHE = ListCache(
+    max_entries=int(os.getenv("LIST_CACHE_ENTRIES", "128")),
+    max_bytes=int(os.getenv("LIST_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("LIST_CACHE_TTL", "300")),
+)
+
+# Server-side list storage for PUT /v1/lists, e.g. "dynamodb:<table>" or
+# "sqlite:/tmp/lists.db". Unset disables the route and list_id requests.
+LIST_STORE = os.getenv("LIST_STORE", "")
+_store: Optional[storage.ListStore] = None
+
+# Response compression: Content-Encodings to offer in preference order (""
+# disables) and the smallest body worth compressing.
+COMPRESS_ENCODINGS = tuple(e for e in os.getenv("COMPRESS_ENCODINGS", "br,gzip").lower().split(",") if e)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# Streamed bodies can only be compressed with zlib (one flush per chunk)
+_STREAM_ENCODINGS = tuple(e for e in COMPRESS_ENCODINGS if e in compress.STREAMING)
+
+# Where the entry point can stream (src/server.py; a Python Lambda returns one
+# string), JSON results of STREAM_MIN_ITEMS or more and all NDJSON results are
+# sent STREAM_CHUNK_ITEMS items at a time instead of encoded as one string.
+STREAM_MIN_ITEMS = int(os.getenv("STREAM_MIN_ITEMS", "1000"))
+STREAM_CHUNK_ITEMS = int(os.getenv("STREAM_CHUNK_ITEMS", "1000"))
+
+# Where x-api-key is checked: "gateway" (an authorizer in front of the
+# function, or none) or "handler" (here, against API_KEY_HASHES, saving the
+# authorizer invocation). src.auth and hashlib are only imported for "handler".
+AUTH_MODE = os.getenv("AUTH_MODE", "gateway").lower()
+_api_keys: Optional[Callable[[str], Optional[str]]] = None
+if AUTH_MODE == "handler":
+    from src import auth
+    _api_keys = auth.VERIFIER
+
+# Cost-aware admission (src/admission.py): each API key may spend ADMISSION_RATE
+# cost units a second, up to ADMISSION_BURST at once. A request over it gets
+# 429 with Retry-After, priced from its body before the body is parsed. Unset
+# or 0 admits everything. The container server charges ADMISSION itself, from
+# Content-Length before it reads a body, so stream_handler does not.
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "0"))
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "500"))
+ADMISSION: Optional[admission.TokenBuckets] = None
+if ADMISSION_RATE > 0:
+    ADMISSION = admission.TokenBuckets(ADMISSION_RATE, ADMISSION_BURST)
+
+
+def _list_store() -> storage.ListStore:
+    """The configured store, opened on first use."""
+    global _store
+    if _store is None:
+        _store = storage.open_store(LIST_STORE)
+        if _store is None:
+            raise ValueError("list storage is not enabled")
+    return _store
+
+
+def _body_text(request: events.Request, limits: config.Limits) -> str:
+    body_raw = request.body or "{}"
+
+    if not request.is_base64 and not request.header("content-encoding"):
+        # Check body size to prevent DoS attacks
+        if len(body_raw) > limits.max_body_size:
+            raise ValueError(f"Request body too large (max {limits.max_body_size} bytes)")
+        return body_raw
     try:
-        return json.loads(body_raw)
-    except json.JSONDecodeError as e:
+        return _body_bytes(request, limits).decode()
+    except UnicodeDecodeError as e:
+        raise ValueError("Body must be valid UTF-8") from e
+
+
+def _body_bytes(request: events.Request, limits: config.Limits) -> bytes:
+    """Base64-decode and decompress a body, bounding the output by max_body_size."""
+    body_raw = request.body or "{}"
+    encoding = request.header("content-encoding")
+    if request.is_base64:
+        try:
+            data = base64.b64decode(body_raw, validate=True)
+        except ValueError as e:
+            raise ValueError("Body is not valid base64") from e
+    elif encoding.strip().lower() not in ("", "identity"):
+        # An unknown encoding is 415 however the body is sent
+        compress.require(encoding.strip().lower())
+        raise ValueError("Compressed body must be base64-encoded")
+    else:
+        data = body_raw.encode()
+
+    try:
+        return compress.decompress(encoding, data, limits.max_body_size)
+    except compress.TooLarge:
+        raise ValueError(f"Request body too large (max {limits.max_body_size} bytes)") from None
+
+
+def _parse_json(body_raw: str) -> Dict[str, Any]:
+    try:
+        return codec.CODEC.loads(body_raw)
+    except ValueError as e:
         raise ValueError("Body must be valid JSON") from e
 
 
-def _validate(payload: Dict[str, Any]) -> Tuple[List[str], int]:
+def _parse_body(request: events.Request, limits: config.Limits) -> Dict[str, Any]:
+    return _parse_json(_body_text(request, limits))
+
+
+def _validate(payload: Dict[str, Any], limits: config.Limits) -> Tuple[Sequence[str], int]:
     arr = payload.get("list")
     n = payload.get("n", 1)
 
+    # A stored list was validated on upload: only its window is ever read
+    if arr is None and payload.get("list_id") is not None:
+        list_id = payload["list_id"]
+        if not isinstance(list_id, str):
+            raise ValueError("'list_id' must be a string")
+        _check_n(n, limits)
+        return _list_store().open(list_id), n
+
     if not isinstance(arr, list):
         raise ValueError("'list' must be an array")
     
     # Check list length to prevent memory exhaustion
-    if len(arr) > MAX_LIST_LENGTH:
-        raise ValueError(f"'list' length must be <= {MAX_LIST_LENGTH}")
+    if len(arr) > limits.max_list_length:
+        raise ValueError(f"'list' length must be <= {limits.max_list_length}")
     
-    if not all(isinstance(x, str) for x in arr):
-        raise ValueError("'list' must contain only strings")
-    
-    # Check individual string lengths to prevent excessive memory usage
-    for idx, item in enumerate(arr):
-        if len(item) > MAX_STRING_LENGTH:
-            raise ValueError(f"String at index {idx} exceeds max length of {MAX_STRING_LENGTH} characters")
+    # Single pass over the list: type and length are checked together.
+    # A non-string anywhere still wins over an over-long string, so the
+    # reported error is the same as with separate passes.
+    max_string_length = limits.max_string_length
+    too_long = None
+    for item in arr:
+        if type(item) is not str and not isinstance(item, str):
+            raise ValueError("'list' must contain only strings")
+        if too_long is None and len(item) > max_string_length:
+            too_long = item
+    if too_long is not None:
+        idx = arr.index(too_long)
+        raise ValueError(f"String at index {idx} exceeds max length of {max_string_length} characters")
+
+    _check_n(n, limits)
+    return arr, n
+
 
+def _check_n(n: Any, limits: config.Limits) -> None:
     if not isinstance(n, int) or n <= 0:
         raise ValueError("'n' must be a positive integer")
-    if n > 10000:
-        raise ValueError("'n' must be <= 10000")
+    if n > limits.max_n:
+        raise ValueError(f"'n' must be <= {limits.max_n}")
+
+
+def _check_offset(offset: Any) -> None:
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("'offset' must be a non-negative integer")
+
+
+Span = Tuple[int, int]
+
+
+def _head_span(size: int, n: int, offset: int) -> Span:
+    return 0, min(n, size)
+
+
+def _tail_span(size: int, n: int, offset: int) -> Span:
+    return max(size - n, 0), size
+
+
+def _slice_span(size: int, n: int, offset: int) -> Span:
+    start = min(offset, size)
+    return start, min(start + n, size)
+
+
+# Batch operations map a list size, n and offset to a [start, end) span
+OPERATIONS: Mapping[str, Callable[[int, int, int], Span]] = MappingProxyType({
+    "head": _head_span,
+    "tail": _tail_span,
+    "slice": _slice_span,
+})
+
+
+class Window(NamedTuple):
+    """The items arr[start:end:step] a list route returns."""
+    start: int
+    end: int
+    step: int = 1
+
+
+def _offset(payload: Dict[str, Any]) -> int:
+    offset = payload.get("offset", 0)
+    _check_offset(offset)
+    return offset
+
+
+def _step(payload: Dict[str, Any]) -> int:
+    step = payload.get("step", 1)
+    if not isinstance(step, int) or step <= 0:
+        raise ValueError("'step' must be a positive integer")
+    return step
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).rstrip(b"=").decode("ascii")
+
+
+def _decode_cursor(payload: Dict[str, Any]) -> int:
+    """Offset of an opaque /page cursor; 0 without one."""
+    cursor = payload.get("cursor")
+    if cursor is None:
+        return 0
+    try:
+        if not isinstance(cursor, str):
+            raise ValueError
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        if not text.isdigit():
+            raise ValueError
+        return int(text)
+    except ValueError:
+        raise ValueError("'cursor' is not valid") from None
+
+
+def _head_window(size: int, n: int, payload: Dict[str, Any]) -> Window:
+    return Window(*_head_span(size, n, 0))
+
+
+def _tail_window(size: int, n: int, payload: Dict[str, Any]) -> Window:
+    return Window(*_tail_span(size, n, 0))
+
+
+def _slice_window(size: int, n: int, payload: Dict[str, Any]) -> Window:
+    return Window(*_slice_span(size, n, _offset(payload)))
+
+
+def _page_window(size: int, n: int, payload: Dict[str, Any]) -> Window:
+    return Window(*_slice_span(size, n, _decode_cursor(payload)))
+
+
+def _sample_window(size: int, n: int, payload: Dict[str, Any]) -> Window:
+    step = _step(payload)
+    start = min(_offset(payload), size)
+    return Window(start, min(start + step * n, size), step)
+
+
+class ListOp(NamedTuple):
+    window: Callable[[int, int, Dict[str, Any]], Window]
+    # Single-pass selection from the raw body for LIST_PARSER=stream
+    stream: Optional[Callable[[str, int, int, int], List[str]]] = None
+    # The same for NDJSON bodies, reading only the lines it needs
+    lines: Optional[Callable[[str, int, int, int], List[str]]] = None
+    # Responses carry a cursor for the items after the window
+    paged: bool = False
+
+
+# List routes: each maps the validated list's size, n and the payload to a window
+LIST_OPS: Mapping[str, ListOp] = MappingProxyType({
+    "head": ListOp(_head_window, stream.head, stream.head_lines),
+    "tail": ListOp(_tail_window, stream.tail, stream.tail_lines),
+    "slice": ListOp(_slice_window),
+    "page": ListOp(_page_window, paged=True),
+    "sample": ListOp(_sample_window),
+})
+
+
+def _take(arr: Sequence[str], window: Window) -> List[str]:
+    # A stored list only reads the window back; a step=1 slice of a list
+    # copies references to its strings, never the strings
+    if window.step == 1:
+        return arr[window.start:window.end]
+    return arr[window.start:window.end:window.step]
+
+
+def _batch_op(item: Dict[str, Any], where: str,
+              limits: config.Limits) -> Tuple[Callable[[int, int, int], Span], int, int]:
+    name = item.get("op")
+    op = OPERATIONS.get(name) if isinstance(name, str) else None
+    if op is None:
+        raise ValueError(f"{where}: 'op' must be one of {', '.join(OPERATIONS)}")
+
+    n = item.get("n", 1)
+    offset = item.get("offset", 0) if name == "slice" else 0
+    try:
+        _check_n(n, limits)
+        _check_offset(offset)
+    except ValueError as ve:
+        raise ValueError(f"{where}: {ve}") from None
+    return op, n, offset
 
-    return arr, n
+
+def _batch_items(payload: Dict[str, Any], key: str) -> List[Any]:
+    items = payload.get(key)
+    if not isinstance(items, list):
+        raise ValueError(f"'{key}' must be an array")
+    if len(items) > MAX_BATCH_JOBS:
+        raise ValueError(f"'{key}' length must be <= {MAX_BATCH_JOBS}")
+    for idx, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"{key}[{idx}] must be an object")
+    return items
+
+
+def _run_queries(payload: Dict[str, Any], limits: config.Limits) -> Dict[str, Any]:
+    """Answer many windows over one list that is validated only once.
+
+    With "spans": true every covered item is returned once as "items" and
+    each query as a [start, end) span into it, so overlapping windows
+    (head 10 inside head 100) are not repeated in the response.
+    """
+    arr, _ = _validate({"list": payload.get("list"), "list_id": payload.get("list_id")}, limits)
+    queries = _batch_items(payload, "queries")
+    size = len(arr)
+    spans = []
+    for idx, query in enumerate(queries):
+        op, n, offset = _batch_op(query, f"queries[{idx}]", limits)
+        spans.append(op(size, n, offset))
+
+    as_spans = payload.get("spans", False)
+    if not isinstance(as_spans, bool):
+        raise ValueError("'spans' must be a boolean")
+    if not as_spans:
+        return {"results": [arr[start:end] for start, end in spans]}
+
+    # Merge overlapping spans into segments; each span lies inside one segment
+    segments: List[List[int]] = []
+    for start, end in sorted(span for span in spans if span[0] < span[1]):
+        if segments and start <= segments[-1][1]:
+            segments[-1][1] = max(segments[-1][1], end)
+        else:
+            segments.append([start, end])
+
+    items: List[str] = []
+    starts = []
+    bases = []
+    for start, end in segments:
+        starts.append(start)
+        bases.append(len(items) - start)
+        items.extend(arr[start:end])
+
+    shifted = []
+    for start, end in spans:
+        if start < end:
+            base = bases[bisect_right(starts, start) - 1]
+            shifted.append([start + base, end + base])
+        else:
+            shifted.append([0, 0])
+    return {"items": items, "spans": shifted}
+
+
+def _run_batch(payload: Dict[str, Any], limits: config.Limits) -> Dict[str, Any]:
+    """Answer many head/tail/slice operations from one request.
+
+    Two shapes are accepted:
+      {"jobs": [{"op": "head", "list": [...], "n": 2}, ...]}
+      {"list": [...], "queries": [{"op": "tail", "n": 5}, ...]}
+
+    The whole batch is validated before any result is computed, and the
+    total number of items across all jobs is capped at max_list_length.
+    """
+    if "jobs" not in payload:
+        return _run_queries(payload, limits)
+
+    jobs = _batch_items(payload, "jobs")
+    total = 0
+    validated = []
+    for idx, job in enumerate(jobs):
+        where = f"jobs[{idx}]"
+        op, n, offset = _batch_op(job, where, limits)
+        arr = job.get("list")
+        if isinstance(arr, list):
+            total += len(arr)
+            if total > limits.max_list_length:
+                raise ValueError(f"total 'list' length across jobs must be <= {limits.max_list_length}")
+        try:
+            arr, _ = _validate({"list": arr}, limits)
+        except ValueError as ve:
+            raise ValueError(f"{where}: {ve}") from None
+        validated.append((arr, op(len(arr), n, offset)))
+    return {"results": [arr[start:end] for arr, (start, end) in validated]}
+
+
+def _store_list(payload: Dict[str, Any], limits: config.Limits) -> Dict[str, Any]:
+    """PUT /v1/lists: validate and store a list, returning its handle."""
+    arr, _ = _validate({"list": payload.get("list")}, limits)
+    return {"list_id": _list_store().put(arr), "length": len(arr)}
+
+
+def _validated(request: events.Request, limits: config.Limits,
+               timing: Optional[metrics.Timing] = None) -> Tuple[Dict[str, Any], Sequence[str], int]:
+    """_parse_body + _validate, skipped when LIST_CACHE has seen the body.
+
+    Returns the payload too, for the parameters of the route's operation.
+    """
+    if not LIST_CACHE.enabled:
+        payload = _parse_body(request, limits)
+        if timing is not None:
+            timing.mark("parse")
+        arr, n = _validate(payload, limits)
+        if timing is not None:
+            timing.mark("validate")
+        return payload, arr, n
+
+    body_raw = _body_text(request, limits)
+    cached = LIST_CACHE.get(body_raw)
+    # An outcome holds for the limits it was validated against: another
+    # tenant's (or a refreshed config's) limits validate the body again
+    if cached is None or cached[0] != limits:
+        items = 0
+        try:
+            payload = _parse_json(body_raw)
+            if timing is not None:
+                timing.mark("parse")
+            outcome = (payload, *_validate(payload, limits))
+            if isinstance(outcome[1], list):
+                items = len(outcome[1])
+        except ValueError as ve:
+            outcome = str(ve)
+        if timing is not None:
+            timing.mark("validate")
+        LIST_CACHE.put(body_raw, (limits, outcome), items)
+    else:
+        outcome = cached[1]
+        if timing is not None:
+            timing.mark("cache")
+
+    if isinstance(outcome, str):
+        raise ValueError(outcome)
+    return outcome
+
+
+def _select_streaming(request: events.Request, op: ListOp, limits: config.Limits) -> List[str]:
+    """Answer /head or /tail from the raw body, holding at most n items."""
+    body_raw = _body_text(request, limits)
+    try:
+        return op.stream(body_raw, limits.max_list_length, limits.max_string_length, limits.max_n)
+    except stream.Fallback:
+        # Invalid or unusual input: the regular path reports the exact error
+        payload = _parse_json(body_raw)
+        arr, n = _validate(payload, limits)
+        return _take(arr, op.window(len(arr), n, payload))
+
+
+def _select_lines(request: events.Request, op: ListOp, limits: config.Limits) -> List[str]:
+    """Answer /head or /tail from an NDJSON body, checking each line as it is read."""
+    body_raw = _body_text(request, limits)
+    try:
+        return op.lines(body_raw, limits.max_list_length, limits.max_string_length, limits.max_n)
+    except stream.Fallback:
+        # Decode every line so the error names the same index a JSON body would
+        payload = formats.loads_ndjson(body_raw)
+        arr, n = _validate(payload, limits)
+        return _take(arr, op.window(len(arr), n, payload))
+
+
+# Response headers, built once per container and copied into each response
+HEADERS: Mapping[str, str] = MappingProxyType({
+    "Content-Type": "application/json",
+    # Security headers
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    "Content-Security-Policy": "default-src 'none'",
+    "X-XSS-Protection": "1; mode=block",
+})
+
+
+def _resp_raw(status: int, body: str) -> Dict[str, Any]:
+    return {"statusCode": status, "headers": dict(HEADERS), "body": body}
 
 
 def _resp(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "statusCode": status,
-        "headers": {
-            "Content-Type": "application/json",
-            # Security headers
-            "X-Content-Type-Options": "nosniff",
-            "X-Frame-Options": "DENY",
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
-            "Content-Security-Policy": "default-src 'none'",
-            "X-XSS-Protection": "1; mode=block",
-        },
-        "body": json.dumps(body),
-    }
+    return _resp_raw(status, codec.CODEC.dumps(body))
+
+
+def _compressed(response: Dict[str, Any], accept_encoding: str) -> Dict[str, Any]:
+    """Compress a response body the client accepts, if it gets smaller."""
+    encoding = compress.negotiate(accept_encoding, COMPRESS_ENCODINGS)
+    if encoding is None:
+        return response
+    if response.get("isBase64Encoded"):
+        body = base64.b64decode(response["body"])
+    else:
+        body = response["body"].encode()
+    packed = compress.compress(encoding, body)
+    if len(packed) >= len(body):
+        return response
+    response["headers"]["Content-Encoding"] = encoding
+    response["headers"]["Vary"] = "Accept-Encoding"
+    response["body"] = base64.b64encode(packed).decode("ascii")
+    response["isBase64Encoded"] = True
+    return response
+
+
+def _resp_result(result: List[str]) -> Dict[str, Any]:
+    """200 response: splice the encoded result into the prebuilt envelope."""
+    return _resp_raw(200, '{"result": ' + codec.CODEC.dumps(result) + "}")
+
+
+def _resp_page(result: List[str], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """200 /page response: the result plus the cursor of the next page (null on the last)."""
+    return _resp_raw(200, '{"result": ' + codec.CODEC.dumps(result)
+                     + ', "next_cursor": ' + codec.CODEC.dumps(next_cursor) + "}")
+
+
+def _resp_binary(fmt: formats.Format, result: List[str]) -> Dict[str, Any]:
+    """200 response in a binary format negotiated with Accept."""
+    response = _resp_raw(200, base64.b64encode(fmt.dumps(result)).decode("ascii"))
+    response["headers"]["Content-Type"] = fmt.media_type
+    response["isBase64Encoded"] = True
+    return response
+
+
+def _resp_chunks(request: events.Request, media_type: str, chunks: Iterator[bytes]) -> Dict[str, Any]:
+    """200 response encoded in chunks: left as "chunks" for a streaming entry point, joined for Lambda."""
+    headers = dict(HEADERS)
+    headers["Content-Type"] = media_type
+    if request.streaming:
+        return {"statusCode": 200, "headers": headers, "chunks": chunks}
+    return {"statusCode": 200, "headers": headers, "body": b"".join(chunks).decode()}
+
+
+# Error bodies that never change, serialized once at cold start
+_BODY_405 = codec.CODEC.dumps({"error": "Method Not Allowed"})
+_BODY_404 = codec.CODEC.dumps({"error": "Not Found"})
+_BODY_LIST_NOT_FOUND = codec.CODEC.dumps({"code": "LIST_NOT_FOUND", "error": "Unknown 'list_id'"})
+_BODY_500 = codec.CODEC.dumps({"code": "INTERNAL_ERROR", "error": "Internal Server Error"})
+# As API Gateway answers for a missing or rejected key, so clients see the same in either AUTH_MODE
+_BODY_401 = codec.CODEC.dumps({"message": "Unauthorized"})
+_BODY_403 = codec.CODEC.dumps({"message": "Forbidden"})
+_BODY_429 = codec.CODEC.dumps({"message": "Too Many Requests"})
+
+
+def _resp_throttled(wait: float) -> Dict[str, Any]:
+    """429 telling the client how long until the request would be admitted."""
+    response = _resp_raw(429, _BODY_429)
+    response["headers"]["Retry-After"] = admission.retry_after(wait)
+    return response
+
+
+def _log_request(path: str, status: int, timing: Optional[metrics.Timing] = None) -> None:
+    """One structured log line per request; an EMF record when it is sampled."""
+    if timing is not None:
+        route = path.rpartition("/")[2]
+        # Unknown paths share one series, so a scan cannot create new metrics
+        record = metrics.record(timing, route if route in ROUTES else "other", status,
+                                path=path, cache=LIST_CACHE.stats())
+        metrics.emit(codec.CODEC.dumps(record))
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(codec.CODEC.dumps({"path": path, "status": status, "cache": LIST_CACHE.stats()}))
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    http = (event.get("requestContext") or {}).get("http") or {}
-    path = (http.get("path") or "").lower()
-    method = (http.get("method") or "GET").upper()
+    return _handle(event, False, ADMISSION)
 
-    if method != "POST":
-        return _resp(405, {"error": "Method Not Allowed"})
 
-    try:
-        payload = _parse_body(event)
-        arr, n = _validate(payload)
+def stream_handler(event: Dict[str, Any], streaming: bool = True) -> Dict[str, Any]:
+    """lambda_handler for the container server (src/server.py).
+
+    With ``streaming`` a large result comes back with "chunks", an iterator
+    of body bytes to send as they are produced, instead of "body". ADMISSION
+    is not charged: the server does that before it reads the body.
+    """
+    return _handle(event, streaming, None)
+
+
+def _handle(event: Dict[str, Any], streaming: bool,
+            buckets: Optional[admission.TokenBuckets]) -> Dict[str, Any]:
+    timing = metrics.sample()
+    request = events.from_event(event)
+    request.streaming = streaming
+
+    response = _dispatch(request, timing, buckets)
+    chunks = response.get("chunks")
+    if chunks is not None:
+        accept_encoding = request.header("accept-encoding")
+        encoding = compress.negotiate(accept_encoding, _STREAM_ENCODINGS) if accept_encoding else None
+        if encoding is not None:
+            response["headers"]["Content-Encoding"] = encoding
+            response["headers"]["Vary"] = "Accept-Encoding"
+            response["chunks"] = compress.compress_chunks(encoding, chunks)
+    elif COMPRESS_ENCODINGS and len(response["body"]) >= COMPRESS_MIN_BYTES:
+        accept_encoding = request.header("accept-encoding")
+        if accept_encoding:
+            response = _compressed(response, accept_encoding)
+            if timing is not None:
+                timing.mark("compress")
+    if timing is not None:
+        # As sent to API Gateway: base64 and compressed bodies count encoded.
+        # A streamed body is encoded while it is sent, after this record.
+        timing.sizes["BodyBytes"] = len(request.body or "")
+        if chunks is None:
+            timing.sizes["ResultBytes"] = len(response["body"])
+    _log_request(request.path, response["statusCode"], timing)
+    return events.to_response(request, response)
+
+
+def _select(request: events.Request, timing: Optional[metrics.Timing], limits: config.Limits,
+            op: ListOp) -> Dict[str, Any]:
+    """/head, /tail, /slice, /page and /sample: one validation pass, then the op's window."""
+    request_format = formats.from_content_type(request.header("content-type"))
+    next_cursor = None
+    if request_format is not None and request_format.media_type == formats.NDJSON and op.lines is not None:
+        result = _select_lines(request, op, limits)
+        arr = None
+        if timing is not None:
+            timing.mark("parse")
+    elif request_format is not None:
+        payload = request_format.loads(_body_bytes(request, limits))
+        if timing is not None:
+            timing.mark("parse")
+        arr, n = _validate(payload, limits)
+        if timing is not None:
+            timing.mark("validate")
+    elif LIST_PARSER == "stream" and op.stream is not None:
+        # One pass parses, validates and selects: timed as parse, and the
+        # list length is never known
+        result = _select_streaming(request, op, limits)
+        arr = None
+        if timing is not None:
+            timing.mark("parse")
+    else:
+        payload, arr, n = _validated(request, limits, timing)
+    if arr is not None:
+        window = op.window(len(arr), n, payload)
+        result = _take(arr, window)
+        if op.paged and window.end < len(arr):
+            next_cursor = _encode_cursor(window.end)
+    if timing is not None:
+        timing.mark("slice")
+        if arr is not None:
+            timing.sizes["ItemCount"] = len(arr)
+            timing.sizes["N"] = n
 
-        if path.endswith("/head"):
-            result = arr[:n]
-        elif path.endswith("/tail"):
-            result = arr[-n:] if n <= len(arr) else arr
+    response_format = formats.from_accept(request.header("accept"))
+    if response_format is not None:
+        if response_format.media_type == formats.NDJSON:
+            response = _resp_chunks(request, formats.NDJSON, chunked.ndjson(result, STREAM_CHUNK_ITEMS))
         else:
-            return _resp(404, {"error": "Not Found"})
+            response = _resp_binary(response_format, result)
+        if next_cursor is not None:
+            response["headers"]["X-Next-Cursor"] = next_cursor
+    elif request.streaming and len(result) >= STREAM_MIN_ITEMS:
+        response = _resp_chunks(request, "application/json",
+                                chunked.json_result(result, STREAM_CHUNK_ITEMS, next_cursor, op.paged))
+    elif op.paged:
+        response = _resp_page(result, next_cursor)
+    else:
+        response = _resp_result(result)
+    if timing is not None:
+        timing.mark("serialize")
+    return response
 
-        return _resp(200, {"result": result})
 
+RouteFn = Callable[[events.Request, Optional[metrics.Timing], config.Limits], Dict[str, Any]]
+
+
+def _list_route(op: ListOp) -> RouteFn:
+    def run(request: events.Request, timing: Optional[metrics.Timing], limits: config.Limits) -> Dict[str, Any]:
+        return _select(request, timing, limits, op)
+    return run
+
+
+def _batch_route(request: events.Request, timing: Optional[metrics.Timing],
+                 limits: config.Limits) -> Dict[str, Any]:
+    return _resp(200, _run_batch(_parse_body(request, limits), limits))
+
+
+def _lists_route(request: events.Request, timing: Optional[metrics.Timing],
+                 limits: config.Limits) -> Dict[str, Any]:
+    if not LIST_STORE:
+        return _resp_raw(404, _BODY_404)
+    return _resp(201, _store_list(_parse_body(request, limits), limits))
+
+
+def _unknown_route(request: events.Request, timing: Optional[metrics.Timing],
+                   limits: config.Limits) -> Dict[str, Any]:
+    # A bad body is reported before the unknown path
+    _validated(request, limits)
+    return _resp_raw(404, _BODY_404)
+
+
+class Route(NamedTuple):
+    method: str
+    run: RouteFn
+
+
+# Routes by the last path segment, so any stage or version prefix matches.
+# One dict lookup per request however many routes there are.
+ROUTES: Mapping[str, Route] = MappingProxyType({
+    **{name: Route("POST", _list_route(op)) for name, op in LIST_OPS.items()},
+    "batch": Route("POST", _batch_route),
+    "lists": Route("PUT", _lists_route),
+})
+_UNKNOWN = Route("POST", _unknown_route)
+
+
+def _dispatch(request: events.Request, timing: Optional[metrics.Timing] = None,
+              buckets: Optional[admission.TokenBuckets] = None) -> Dict[str, Any]:
+    if _api_keys is not None:
+        # Before routing, so an unauthenticated caller cannot probe for routes
+        key = request.header("x-api-key")
+        if not key:
+            return _resp_raw(401, _BODY_401)
+        request.tenant = _api_keys(key)
+        if request.tenant is None:
+            return _resp_raw(403, _BODY_403)
+
+    method, run = ROUTES.get(request.path.rpartition("/")[2], _UNKNOWN)
+    if request.method != method:
+        return _resp_raw(405, _BODY_405)
+
+    limits = CONFIG.limits(request.tenant)
+    if buckets is not None:
+        wait = buckets.take(request.tenant, admission.request_cost(request, limits.max_body_size))
+        if wait:
+            return _resp_throttled(wait)
+
+    try:
+        return run(request, timing, limits)
+    except storage.ListNotFound:
+        return _resp_raw(404, _BODY_LIST_NOT_FOUND)
+    except compress.UnsupportedEncoding as ue:
+        return _resp(415, {"code": "UNSUPPORTED_ENCODING", "error": str(ue)})
+    except formats.UnsupportedMediaType as um:
+        return _resp(415, {"code": "UNSUPPORTED_MEDIA_TYPE", "error": str(um)})
     except ValueError as ve:
         logger.warning("validation error: %s", ve)
         return _resp(400, {"code": "VALIDATION_ERROR", "error": str(ve)})
     except Exception as e:
         logger.exception("unhandled error")
-        return _resp(500, {"code": "INTERNAL_ERROR", "error": "Internal Server Error"})
+        return _resp_raw(500, _BODY_500)
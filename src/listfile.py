@@ -0,0 +1,155 @@
+"""
+Offset-indexed binary list files that are read through mmap.
+
+Layout (all integers little-endian):
+
+  header   magic b"LSTF", version (u8), 3 pad bytes, item count (u64)
+  offsets  count + 1 u64 byte offsets into the blob; item i is
+           blob[offsets[i]:offsets[i + 1]]
+  blob     the items' UTF-8 bytes, back to back
+
+Opening a file maps it without reading it. head, tail and slice queries read
+the offsets of the requested range and decode only those items, so a query's
+cost depends on the size of its result, not of the list. This is how lists
+longer than the request size limits are served: they are converted once
+(see scripts/convert_list.py) and staged in a directory given to the list
+store as LIST_STORE=dir:<path>.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Sequence, overload
+
+MAGIC = b"LSTF"
+VERSION = 1
+_HEADER = struct.Struct("<4sB3xQ")
+_OFFSET = 8
+# Items decoded per step when iterating over a whole file
+_ITER_CHUNK = 1024
+
+
+class FormatError(ValueError):
+    """The file is not a valid list file."""
+
+
+def _encode(item: str) -> bytes:
+    # surrogatepass keeps lone surrogates from JSON ("\ud800") round-tripping
+    return item.encode("utf-8", "surrogatepass")
+
+
+def write(path: str, items: Iterable[str]) -> int:
+    """Write ``items`` to ``path`` atomically and return the item count."""
+    blobs = [_encode(item) for item in items]
+    offsets = array("Q", accumulate((len(b) for b in blobs), initial=0))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(blobs)))
+            f.write(offsets.tobytes())
+            f.write(b"".join(blobs))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return len(blobs)
+
+
+class ListFile(Sequence[str]):
+    """Read-only, memory-mapped view of a list file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise FormatError(f"{path}: {e}") from e
+        try:
+            self._length, self._blob = self._check(path)
+        except FormatError:
+            self._map.close()
+            raise
+
+    def _check(self, path: str):
+        size = len(self._map)
+        if size < _HEADER.size + _OFFSET:
+            raise FormatError(f"{path}: file too short")
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise FormatError(f"{path}: not a version {VERSION} list file")
+        blob = _HEADER.size + _OFFSET * (count + 1)
+        if blob > size or blob + self._offsets(count, count + 1)[0] != size:
+            raise FormatError(f"{path}: truncated list file")
+        return count, blob
+
+    def _offsets(self, start: int, end: int):
+        return struct.unpack_from(f"<{end - start}Q", self._map, _HEADER.size + _OFFSET * start)
+
+    def _read(self, start: int, end: int) -> List[str]:
+        """Decode items [start, end), touching only their offsets and bytes."""
+        if start >= end:
+            return []
+        offsets = self._offsets(start, end + 1)
+        first = offsets[0]
+        chunk = self._map[self._blob + first:self._blob + offsets[-1]]
+        if chunk.isascii():
+            # Byte offsets are character offsets: decode once, slice the str
+            text = chunk.decode("ascii")
+            return [text[a - first:b - first] for a, b in zip(offsets, offsets[1:])]
+        return [chunk[a - first:b - first].decode("utf-8", "surrogatepass")
+                for a, b in zip(offsets, offsets[1:])]
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, end, step = index.indices(self._length)
+            if step != 1:
+                return self[start:end][::step] if start < end else []
+            return self._read(start, end)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("list index out of range")
+        return self._read(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for start in range(0, self._length, _ITER_CHUNK):
+            yield from self._read(start, min(start + _ITER_CHUNK, self._length))
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "ListFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def items_from_request(payload: object) -> Sequence[str]:
+    """Return the "list" of a ListRequest-shaped JSON object for conversion.
+
+    Only the item types are checked: list files exist for lists beyond the
+    request limits, so MAX_LIST_LENGTH does not apply.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("list"), list):
+        raise ValueError("'list' must be an array")
+    arr = payload["list"]
+    for idx, item in enumerate(arr):
+        if not isinstance(item, str):
+            raise ValueError(f"Item at index {idx} is not a string")
+    return arr
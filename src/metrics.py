@@ -0,0 +1,108 @@
+"""
+Per-request timings and sizes, emitted as CloudWatch Embedded Metric Format.
+
+A sampled request gets a Timing: the handler calls mark(phase) as each
+phase ends (parse, validate, slice, serialize, ...) and sets the sizes it
+knows (body bytes, item count, n, result bytes). At the end of the request
+emit() writes one JSON line to stdout. CloudWatch Logs turns its "_aws"
+block into metrics in METRICS_NAMESPACE, with Stage and Stage+Route
+dimensions; the other keys (path, status, cache counters) stay searchable
+in Logs Insights.
+
+METRICS_SAMPLE_RATE is the fraction of requests measured: 0 (the default)
+disables instrumentation and sample() returns None, so the handler's only
+cost is one comparison per phase.
+
+EMF lines go to stdout rather than through logging: the Lambda runtime's
+log format prefixes each record, and a prefixed line is not extracted.
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "0"))
+METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "ListService")
+STAGE = os.getenv("STAGE", "dev")
+
+# Size metrics and their CloudWatch units; phases are all Milliseconds
+SIZE_UNITS = {
+    "BodyBytes": "Bytes",
+    "ResultBytes": "Bytes",
+    "ItemCount": "Count",
+    "N": "Count",
+}
+
+
+class Timing:
+    """Monotonic phase timings and sizes of one request."""
+
+    __slots__ = ("started", "_last", "phases", "sizes")
+
+    def __init__(self) -> None:
+        self.started = self._last = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def mark(self, phase: str) -> None:
+        """End ``phase``: the time since the previous mark is added to it."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1e3
+
+
+def _random() -> float:
+    # random is only needed for fractional rates, keep it out of cold start
+    import random
+
+    return random.random()
+
+
+def sample(rate: Optional[float] = None) -> Optional[Timing]:
+    """A Timing for this request if it is sampled, else None."""
+    if rate is None:
+        rate = METRICS_SAMPLE_RATE
+    if rate <= 0:
+        return None
+    if rate < 1 and _random() >= rate:
+        return None
+    return Timing()
+
+
+def _metric_name(phase: str) -> str:
+    return phase.capitalize() + "Time"
+
+
+def record(timing: Timing, route: str, status: int, **properties: Any) -> Dict[str, Any]:
+    """The EMF record for a finished request; ``properties`` are logged as-is."""
+    values: Dict[str, Any] = {_metric_name(phase): round(seconds * 1e3, 4) for phase, seconds in timing.phases.items()}
+    values["TotalTime"] = round(timing.total_ms(), 4)
+    definitions = [{"Name": name, "Unit": "Milliseconds"} for name in values]
+    for name, value in timing.sizes.items():
+        values[name] = value
+        definitions.append({"Name": name, "Unit": SIZE_UNITS.get(name, "None")})
+
+    return {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [["Stage"], ["Stage", "Route"]],
+                "Metrics": definitions,
+            }],
+        },
+        "Stage": STAGE,
+        "Route": route,
+        "status": status,
+        **properties,
+        **values,
+    }
+
+
+def emit(line: str) -> None:
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
@@ -0,0 +1,87 @@
+"""
+Process pool for CPU-bound requests in the persistent server.
+
+One Python process validates one large list at a time (the GIL), so the
+server hands bodies of POOL_MIN_BYTES or more to a pool of forked worker
+processes that run the whole request (parse, validate, select, encode)
+through server.respond. Smaller requests stay inline, where the hand-off
+would cost more than it saves.
+
+Bodies travel through shared memory: the pool creates a fixed set of slots
+up front, each the largest max_body_size in the limits config when it
+starts. The server copies a body into a free slot and the worker reads it
+from there; a body larger than a slot (the limit was raised later) is
+answered inline. Only the slot number, the request line and headers are
+pickled; the response comes back as already encoded bytes.
+
+Workers are forked from the server process before its event loop starts, so
+they inherit the warm imports. Platforms without fork run without a pool.
+"""
+
+import asyncio
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from src import handler
+
+# Attached slots in a worker process
+_slots: List[shared_memory.SharedMemory] = []
+
+
+def _attach(names: List[str]) -> None:
+    # Ctrl-C reaches the whole process group; the server shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _slots.extend(shared_memory.SharedMemory(name=name) for name in names)
+
+
+def _ready() -> None:
+    pass
+
+
+def _respond(slot: int, size: int, method: str, path: str,
+             headers: Dict[str, str]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    from src import server
+
+    return server.respond(method, path, headers, bytes(_slots[slot].buf[:size]))
+
+
+class OffloadPool:
+    def __init__(self, processes: int, slots: Optional[int] = None):
+        context = multiprocessing.get_context("fork")
+        self.slot_size = handler.CONFIG.max_body_size()
+        self._shm = [
+            shared_memory.SharedMemory(create=True, size=self.slot_size)
+            for _ in range(slots or 2 * processes)
+        ]
+        self._executor = ProcessPoolExecutor(
+            processes, mp_context=context, initializer=_attach, initargs=([s.name for s in self._shm],),
+        )
+        # With fork, the first submit starts every worker; do it before an
+        # event loop (and its threads) exists in this process
+        self._executor.submit(_ready).result()
+        self._free: Optional["asyncio.Queue[int]"] = None
+
+    async def respond(self, method: str, path: str, headers: Dict[str, str],
+                      body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """server.respond in a worker process; waits for a free slot."""
+        if self._free is None:
+            self._free = asyncio.Queue()
+            for slot in range(len(self._shm)):
+                self._free.put_nowait(slot)
+        slot = await self._free.get()
+        try:
+            self._shm[slot].buf[:len(body)] = body
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, _respond, slot, len(body), method, path, headers,
+            )
+        finally:
+            self._free.put_nowait(slot)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
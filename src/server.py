@@ -0,0 +1,552 @@
+"""
+Long-lived HTTP server for container deployments.
+
+Serves the same API as the Lambda function without cold starts or
+per-invocation overhead. Each request is turned into an HTTP API v2 event and
+answered by handler.stream_handler, so routing, validation, caching,
+compression and error bodies are exactly the Lambda's.
+
+  python -m src.server --port 8080 --workers 4
+
+Workers are separate processes that each bind the port with SO_REUSEPORT, so
+the kernel spreads connections across them; --workers 1 (or a platform
+without SO_REUSEPORT/fork) runs a single process. Connections are HTTP/1.1
+keep-alive. Content-Length above the largest max_body_size in the limits
+config (any tenant's, see src/config.py) is refused before the body is read,
+and chunked bodies are cut off as soon as they pass it; the handler then
+applies the request's own tenant limit. uvloop is used
+when installed.
+
+Large results are streamed: handler.stream_handler returns their body as
+chunks, written with chunked transfer coding (HTTP/1.1) or as several ASGI
+body messages as each is encoded, so a client gets the first items before the
+last are encoded and the whole encoded body never exists at once. Responses
+computed in the pool, and answers to HTTP/1.0 clients, are sent whole.
+
+Work is admitted before its body is read (see src/admission.py): each
+request is priced from its Content-Length and held against SERVER_MAX_COST,
+the cost a worker has in flight at once. A request that does not fit waits
+up to SERVER_QUEUE_TIMEOUT s for room, then gets 503, so a flood of
+expensive requests waits or is shed while cheap ones keep going. Only a
+request the budget admits is charged to its tenant's bucket (API keys
+verified under AUTH_MODE=handler, else one shared bucket) when
+ADMISSION_RATE is set, and gets 429 over it. Both
+answers carry Retry-After; the body is never parsed, and is read and
+dropped a piece at a time to keep the connection (or the connection is
+closed, for chunked and 100-continue bodies).
+
+--pool N adds N processes per worker for bodies of POOL_MIN_BYTES or more,
+so large lists are validated on several cores (see src/pool.py).
+
+``app`` is the same adapter as an ASGI application, for running under an
+ASGI server (e.g. uvicorn src.server:app) instead. It charges the tenant
+buckets but leaves concurrency to the ASGI server (uvicorn
+--limit-concurrency).
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import signal
+import socket
+from collections import deque
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from src import admission, codec, handler
+from src.pool import OffloadPool
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 16 * 1024
+KEEPALIVE_TIMEOUT = float(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "5"))
+# Bodies at least this large go to the process pool when there is one
+POOL_MIN_BYTES = int(os.getenv("POOL_MIN_BYTES", str(64 * 1024)))
+# Cost units (src/admission.py) one worker has in flight at once (0: no limit),
+# and how long a request waits for room before it gets 503
+SERVER_MAX_COST = float(os.getenv("SERVER_MAX_COST", "0"))
+SERVER_QUEUE_TIMEOUT = float(os.getenv("SERVER_QUEUE_TIMEOUT", "0.1"))
+
+Headers = List[Tuple[str, str]]
+# A whole body, or the chunks of one that is streamed
+Body = Union[bytes, Iterator[bytes]]
+
+_BODY_429 = codec.CODEC.dumps({"message": "Too Many Requests"}).encode()
+_BODY_503 = codec.CODEC.dumps({"code": "OVERLOADED", "error": "Server is at capacity, retry later"}).encode()
+
+
+class BodyTooLarge(Exception):
+    """The request body passed the body size limit while it was being read."""
+
+
+def _body_413(limit: int) -> bytes:
+    return codec.CODEC.dumps({
+        "code": "VALIDATION_ERROR",
+        "error": f"Request body too large (max {limit} bytes)",
+    }).encode()
+
+
+class CostBudget:
+    """Cost units in flight in one worker; requests that do not fit queue for room.
+
+    A request holds its cost from when its head is read until its response
+    is written: while its body arrives, while it waits for the pool and
+    while a streamed response is sent. A request that fits goes ahead even
+    when others are queued, so cheap requests use the room an expensive one
+    leaves and expensive ones are the ones that wait, and are shed. One is
+    always let in when nothing else is in flight, so a request costing more
+    than the whole limit still runs, alone.
+    """
+
+    def __init__(self, limit: float, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self.in_flight = 0.0
+        self.shed = 0
+        self._queue: Deque[Tuple[float, "asyncio.Future[None]"]] = deque()
+
+    def _fits(self, cost: float) -> bool:
+        return not self.in_flight or self.in_flight + cost <= self.limit
+
+    async def acquire(self, cost: float) -> bool:
+        """Take ``cost`` units; False if there was no room within the timeout."""
+        if self._fits(cost):
+            self.in_flight += cost
+            return True
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        entry = (cost, waiter)
+        self._queue.append(entry)
+        try:
+            # release() adds the cost when it lets the request in
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._forget(entry)
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._forget(entry)
+            else:
+                self.release(cost)
+            raise
+        return True
+
+    def _forget(self, entry: Tuple[float, "asyncio.Future[None]"]) -> None:
+        if entry in self._queue:
+            self._queue.remove(entry)
+
+    def release(self, cost: float) -> None:
+        self.in_flight -= cost
+        for entry in list(self._queue):
+            queued, waiter = entry
+            if self._fits(queued):
+                self._queue.remove(entry)
+                if not waiter.done():
+                    self.in_flight += queued
+                    waiter.set_result(None)
+
+
+def to_event(method: str, path: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+    """Build the HTTP API v2 event API Gateway would send for this request."""
+    event: Dict[str, Any] = {
+        "requestContext": {"http": {"method": method, "path": path}},
+        "headers": headers,
+    }
+    if body:
+        text = None
+        if not headers.get("content-encoding"):
+            try:
+                text = body.decode()
+            except UnicodeDecodeError:
+                pass
+        if text is None:
+            event["body"] = base64.b64encode(body).decode("ascii")
+            event["isBase64Encoded"] = True
+        else:
+            event["body"] = text
+    return event
+
+
+def respond(method: str, path: str, headers: Dict[str, str], body: bytes,
+            stream: bool = False) -> Tuple[int, Headers, Body]:
+    """Run one request through handler.stream_handler; returns status, headers, body.
+
+    With ``stream`` a large result's body is an iterator of chunks rather
+    than bytes. The tenant's bucket is charged by the caller, before it
+    reads the body.
+    """
+    if method == "GET" and path == "/healthz":
+        return 200, [("Content-Type", "text/plain")], b"ok"
+    response = handler.stream_handler(to_event(method, path, headers, body), stream)
+    if "chunks" in response:
+        return response["statusCode"], list(response["headers"].items()), response["chunks"]
+    data = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        data = base64.b64decode(data)
+    else:
+        data = data.encode()
+    return response["statusCode"], list((response.get("headers") or {}).items()), data
+
+
+def _too_large(length: str) -> bool:
+    try:
+        return int(length) > handler.CONFIG.max_body_size()
+    except ValueError:
+        return True
+
+
+def _cost(headers: Dict[str, str]) -> float:
+    """Cost units of a request from its headers; a body of unknown length counts as the largest."""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        return admission.estimate(handler.CONFIG.max_body_size())
+    # A bad or oversized Content-Length is refused later, when the body is read
+    length = headers.get("content-length", "0")
+    return admission.estimate(int(length) if length.isdigit() else 0)
+
+
+def _throttled(headers: Dict[str, str], cost: float) -> Optional[Tuple[int, Headers, bytes]]:
+    """A 429 response if the request's tenant is over its rate.
+
+    The tenant is the key id of an API key accepted under AUTH_MODE=handler;
+    any other caller is charged to the shared anonymous bucket.
+    """
+    if handler.ADMISSION is None:
+        return None
+    key = headers.get("x-api-key")
+    tenant = handler._api_keys(key) if key and handler._api_keys is not None else None
+    wait = handler.ADMISSION.take(tenant, cost)
+    if not wait:
+        return None
+    return 429, [("Content-Type", "application/json"), ("Retry-After", admission.retry_after(wait))], _BODY_429
+
+
+# --- asyncio HTTP/1.1 server -------------------------------------------------
+
+def _parse_head(head: bytes) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        return None
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            return None
+        name = name.strip().lower()
+        value = value.strip()
+        headers[name] = f"{headers[name]},{value}" if name in headers else value
+    return method.upper(), target.partition("?")[0], version, headers
+
+
+async def _read_body(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     headers: Dict[str, str]) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        chunks: List[bytes] = []
+        size = 0
+        limit = handler.CONFIG.max_body_size()
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            chunk_size = int(line.split(b";")[0], 16)
+            if chunk_size == 0:
+                # Skip trailers
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            size += chunk_size
+            if size > limit:
+                raise BodyTooLarge()
+            chunks.append(await reader.readexactly(chunk_size))
+            await reader.readexactly(2)
+
+    length = headers.get("content-length", "0")
+    if _too_large(length):
+        raise BodyTooLarge()
+    if headers.get("expect", "").lower() == "100-continue":
+        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+    return await reader.readexactly(int(length)) if int(length) else b""
+
+
+async def _discard_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bool:
+    """Read and drop a Content-Length body; False if it cannot be (chunked, too large, or not yet sent)."""
+    length = headers.get("content-length", "0")
+    if ("chunked" in headers.get("transfer-encoding", "").lower() or _too_large(length)
+            or headers.get("expect", "").lower() == "100-continue"):
+        return False
+    remaining = int(length)
+    while remaining:
+        piece = await reader.read(min(remaining, 64 * 1024))
+        if not piece:
+            return False
+        remaining -= len(piece)
+    return True
+
+
+def _response_head(status: int, headers: Headers, framing: str, keep_alive: bool) -> bytes:
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    lines.append(framing)
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, headers: Headers,
+                    body: bytes, keep_alive: bool) -> None:
+    writer.write(_response_head(status, headers, f"Content-Length: {len(body)}", keep_alive) + body)
+
+
+async def _write_chunked(writer: asyncio.StreamWriter, status: int, headers: Headers,
+                         chunks: Iterator[bytes], keep_alive: bool) -> bool:
+    """Send a body with chunked transfer coding, each chunk as it is encoded.
+
+    False if encoding failed part way: the status is already sent, so the
+    response is cut off without its last chunk and the connection closed.
+    """
+    writer.write(_response_head(status, headers, "Transfer-Encoding: chunked", keep_alive))
+    try:
+        for chunk in chunks:
+            if chunk:
+                writer.writelines((b"%x\r\n" % len(chunk), chunk, b"\r\n"))
+                await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        raise
+    except Exception:
+        logger.exception("streamed response failed")
+        return False
+    writer.write(b"0\r\n\r\n")
+    return True
+
+
+async def _answer(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                  version: str, headers: Dict[str, str], keep_alive: bool, pool: Optional[OffloadPool]) -> bool:
+    """Read one request's body and send its response; False if the connection is done."""
+    try:
+        body = await _read_body(reader, writer, headers)
+    except BodyTooLarge:
+        # The rest of the body is never read, so the connection cannot be reused
+        _write_response(writer, 413, [("Content-Type", "application/json")],
+                        _body_413(handler.CONFIG.max_body_size()), False)
+        return False
+    except (ValueError, asyncio.LimitOverrunError):
+        _write_response(writer, 400, [], b"", False)
+        return False
+
+    if pool is not None and POOL_MIN_BYTES <= len(body) <= pool.slot_size:
+        status, response_headers, data = await pool.respond(method, path, headers, body)
+    else:
+        status, response_headers, data = respond(method, path, headers, body, version == "HTTP/1.1")
+    if isinstance(data, bytes):
+        _write_response(writer, status, response_headers, data, keep_alive)
+    elif not await _write_chunked(writer, status, response_headers, data, keep_alive):
+        return False
+    await writer.drain()
+    return keep_alive
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            pool: Optional[OffloadPool] = None, budget: Optional[CostBudget] = None) -> None:
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+            except asyncio.LimitOverrunError:
+                _write_response(writer, 431, [], b"", False)
+                return
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                return
+
+            request = _parse_head(head)
+            if request is None:
+                _write_response(writer, 400, [], b"", False)
+                return
+            method, path, version, headers = request
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+            # Shed before the body is read: one of known length is then read
+            # and dropped a piece at a time, so the connection can be reused
+            cost = _cost(headers)
+            if budget is not None and not await budget.acquire(cost):
+                retry = admission.retry_after(budget.timeout)
+                shed = 503, [("Content-Type", "application/json"), ("Retry-After", retry)], _BODY_503
+            else:
+                # Only work the server takes on is charged to the tenant
+                shed = _throttled(headers, cost)
+                if shed is not None and budget is not None:
+                    budget.release(cost)
+            if shed is not None:
+                keep_alive = keep_alive and await _discard_body(reader, headers)
+                _write_response(writer, *shed, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+                continue
+            try:
+                if not await _answer(reader, writer, method, path, version, headers, keep_alive, pool):
+                    return
+            finally:
+                if budget is not None:
+                    budget.release(cost)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run(host: str, port: int, reuse_port: bool, pool: Optional[OffloadPool]) -> None:
+    budget = CostBudget(SERVER_MAX_COST, SERVER_QUEUE_TIMEOUT) if SERVER_MAX_COST > 0 else None
+    server = await asyncio.start_server(
+        partial(_serve_connection, pool=pool, budget=budget), host, port,
+        limit=MAX_HEADER_BYTES, reuse_port=reuse_port or None,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # Windows, non-main thread
+            pass
+    logger.info("listening on %s:%d (pid %d)", host, port, os.getpid())
+    async with server:
+        await stop.wait()
+
+
+def _use_uvloop() -> None:
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def _worker(host: str, port: int, reuse_port: bool, pool_size: int) -> None:
+    pool = OffloadPool(pool_size) if pool_size else None
+    try:
+        asyncio.run(_run(host, port, reuse_port, pool))
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def serve(host: str, port: int, workers: int, pool_size: int = 0) -> None:
+    """Run the server; with workers > 1, one process per worker on a shared port."""
+    _use_uvloop()
+    if not hasattr(os, "fork"):
+        if workers > 1 or pool_size:
+            logger.warning("fork is not available, running a single worker without a pool")
+        workers, pool_size = 1, 0
+    if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT is not available, running a single worker")
+        workers = 1
+    if workers == 1:
+        _worker(host, port, False, pool_size)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker(host, port, True, pool_size)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def forward(signum, frame):
+        for child in children:
+            try:
+                os.kill(child, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for child in children:
+        os.waitpid(child, 0)
+
+
+# --- ASGI --------------------------------------------------------------------
+
+async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    """ASGI 3 entry point with the same behaviour as the built-in server."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    headers: Dict[str, str] = {}
+    for name, value in scope.get("headers", []):
+        key = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        headers[key] = f"{headers[key]},{value}" if key in headers else value
+
+    status: int
+    response_headers: Headers
+    limit = handler.CONFIG.max_body_size()
+    throttled = _throttled(headers, _cost(headers))
+    if throttled is not None:
+        status, response_headers, data = throttled
+    elif _too_large(headers.get("content-length", "0")):
+        status, response_headers, data = 413, [("Content-Type", "application/json")], _body_413(limit)
+    else:
+        chunks: List[bytes] = []
+        size = 0
+        more = True
+        while more:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                break
+            chunks.append(chunk)
+            more = message.get("more_body", False)
+        if size > limit:
+            status, response_headers, data = 413, [("Content-Type", "application/json")], _body_413(limit)
+        else:
+            status, response_headers, data = respond(scope["method"].upper(), scope["path"], headers,
+                                                     b"".join(chunks), stream=True)
+
+    raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response_headers]
+    if isinstance(data, bytes):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": raw_headers + [(b"content-length", str(len(data)).encode())]})
+        await send({"type": "http.response.body", "body": data})
+        return
+    # Without a content-length the ASGI server frames the body itself (chunked)
+    await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+    for chunk in data:
+        if chunk:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve the list API over HTTP")
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1))))
+    ap.add_argument("--pool", type=int, default=int(os.getenv("SERVER_POOL", "0")),
+                    help="processes per worker for bodies of POOL_MIN_BYTES or more (0: none)")
+    args = ap.parse_args()
+    serve(args.host, args.port, max(1, args.workers), max(0, args.pool))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Server-side list storage for PUT /v1/lists and list_id requests.
+
+A stored list is written once and then read by index range, so head, tail
+and slice queries only fetch the items they return. Lists are immutable and
+content-addressed: the same list always gets the same list_id.
+
+The backend is chosen by the LIST_STORE environment variable:
+
+  sqlite:<path>     local SQLite file (tests, containers with a volume)
+  dynamodb:<table>  DynamoDB table with list_id/chunk keys (Lambda)
+  dir:<path>        memory-mapped list files, one per list (/tmp, EFS)
+
+Backends implement length() and read(); put() stores a validated list.
+Backend libraries (sqlite3, listfile/mmap, boto3) are imported when a store
+is opened, not at cold start: only ListNotFound is needed by every request.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Sequence, overload
+
+if TYPE_CHECKING:
+    from src import listfile
+
+logger = logging.getLogger(__name__)
+
+
+class ListNotFound(LookupError):
+    """No stored list has the requested list_id."""
+
+
+def list_id_for(items: Sequence[str]) -> str:
+    """Content address of a list: SHA-256 over length-prefixed UTF-8 items."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    for item in items:
+        data = item.encode("utf-8", "surrogatepass")
+        digest.update(len(data).to_bytes(4, "big"))
+        digest.update(data)
+    return digest.hexdigest()[:32]
+
+
+class ListStore(ABC):
+    @abstractmethod
+    def put(self, items: Sequence[str]) -> str:
+        """Store a validated list and return its list_id."""
+
+    @abstractmethod
+    def length(self, list_id: str) -> int:
+        """Number of items, or ListNotFound."""
+
+    @abstractmethod
+    def read(self, list_id: str, start: int, end: int) -> List[str]:
+        """Items [start, end) of a stored list; 0 <= start <= end <= length."""
+
+    def open(self, list_id: str) -> Sequence[str]:
+        return StoredList(self, list_id, self.length(list_id))
+
+
+class StoredList(Sequence[str]):
+    """Read-only view of a stored list; slicing reads only the sliced range."""
+
+    __slots__ = ("store", "list_id", "_length")
+
+    def __init__(self, store: ListStore, list_id: str, length: int):
+        self.store = store
+        self.list_id = list_id
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, end, step = index.indices(self._length)
+            if step != 1:
+                return self[start:end][::step] if start < end else []
+            return self.store.read(self.list_id, start, end) if start < end else []
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("list index out of range")
+        return self.store.read(self.list_id, index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self[:])
+
+
+class SqliteListStore(ListStore):
+    """One row per item, keyed by (list_id, idx) so ranges are index scans."""
+
+    def __init__(self, path: str):
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lists ("
+                " id TEXT PRIMARY KEY, length INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                " list_id TEXT NOT NULL, idx INTEGER NOT NULL, value TEXT NOT NULL,"
+                " PRIMARY KEY (list_id, idx)) WITHOUT ROWID"
+            )
+
+    def put(self, items: Sequence[str]) -> str:
+        list_id = list_id_for(items)
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM lists WHERE id = ?", (list_id,)).fetchone():
+                return list_id
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO items (list_id, idx, value) VALUES (?, ?, ?)",
+                    ((list_id, idx, item) for idx, item in enumerate(items)),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO lists (id, length, created_at) VALUES (?, ?, ?)",
+                    (list_id, len(items), time.time()),
+                )
+        return list_id
+
+    def length(self, list_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT length FROM lists WHERE id = ?", (list_id,)).fetchone()
+        if row is None:
+            raise ListNotFound(list_id)
+        return row[0]
+
+    def read(self, list_id: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT value FROM items WHERE list_id = ? AND idx >= ? AND idx < ? ORDER BY idx",
+                (list_id, start, end),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+class DynamoDbListStore(ListStore):
+    """Items are stored in fixed-size chunks, one DynamoDB item per chunk.
+
+    Keys: list_id (S, partition) and chunk (N, sort). Chunk -1 holds the
+    length. A range read queries only the chunks that overlap it.
+    """
+
+    # 50 strings of <= 1000 characters stay under the 400 KB item limit
+    # even when every character needs a six-byte JSON escape.
+    CHUNK_ITEMS = 50
+    _META = -1
+
+    def __init__(self, table: str, client: Any = None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("dynamodb")
+        self.table = table
+        self._client = client
+
+    def put(self, items: Sequence[str]) -> str:
+        list_id = list_id_for(items)
+        try:
+            self.length(list_id)
+            return list_id
+        except ListNotFound:
+            pass
+
+        size = self.CHUNK_ITEMS
+        requests = [self._item(list_id, self._META, length=len(items))]
+        for chunk, offset in enumerate(range(0, len(items), size)):
+            requests.append(self._item(list_id, chunk, items=list(items[offset:offset + size])))
+
+        # Meta item goes last so a half-written list is never visible
+        requests.append(requests.pop(0))
+        for offset in range(0, len(requests), 25):
+            self._batch_write(requests[offset:offset + 25])
+        return list_id
+
+    def length(self, list_id: str) -> int:
+        response = self._client.get_item(
+            TableName=self.table,
+            Key={"list_id": {"S": list_id}, "chunk": {"N": str(self._META)}},
+            ConsistentRead=True,
+        )
+        item = response.get("Item")
+        if item is None:
+            raise ListNotFound(list_id)
+        return int(item["length"]["N"])
+
+    def read(self, list_id: str, start: int, end: int) -> List[str]:
+        if start >= end:
+            return []
+        size = self.CHUNK_ITEMS
+        first, last = start // size, (end - 1) // size
+        items: List[str] = []
+        kwargs = {
+            "TableName": self.table,
+            "KeyConditionExpression": "list_id = :id AND chunk BETWEEN :first AND :last",
+            "ExpressionAttributeValues": {
+                ":id": {"S": list_id},
+                ":first": {"N": str(first)},
+                ":last": {"N": str(last)},
+            },
+        }
+        while True:
+            response = self._client.query(**kwargs)
+            for item in response.get("Items", []):
+                items.extend(json.loads(item["items"]["S"]))
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        base = first * size
+        return items[start - base:end - base]
+
+    def _item(self, list_id: str, chunk: int, **attrs: Any) -> dict:
+        item = {"list_id": {"S": list_id}, "chunk": {"N": str(chunk)}}
+        if "length" in attrs:
+            item["length"] = {"N": str(attrs["length"])}
+        if "items" in attrs:
+            item["items"] = {"S": json.dumps(attrs["items"])}
+        return {"PutRequest": {"Item": item}}
+
+    def _batch_write(self, requests: List[dict], attempts: int = 5) -> None:
+        pending = {self.table: requests}
+        for attempt in range(attempts):
+            response = self._client.batch_write_item(RequestItems=pending)
+            pending = response.get("UnprocessedItems") or {}
+            if not pending:
+                return
+            time.sleep(0.05 * 2 ** attempt)
+        raise RuntimeError("DynamoDB batch write did not complete")
+
+
+class ListFileStore(ListStore):
+    """One list file per list_id in a directory, read through mmap.
+
+    Files are immutable, so mapped files stay open across invocations in a
+    warm container (up to MAX_OPEN, least recently used dropped first). A
+    dropped file is not closed: the list cache or a running request may
+    still hold it, and it is unmapped once the last reference goes.
+    Files can also be staged ahead of time with scripts/convert_list.py,
+    which is how lists longer than MAX_LIST_LENGTH are served.
+    """
+
+    MAX_OPEN = 32
+    _ID = re.compile(r"[0-9a-f]{32}")
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._open: "OrderedDict[str, listfile.ListFile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, list_id: str) -> str:
+        # list_id comes from the request; never let it name another file
+        if not self._ID.fullmatch(list_id):
+            raise ListNotFound(list_id)
+        return os.path.join(self.directory, f"{list_id}.lst")
+
+    def put(self, items: Sequence[str]) -> str:
+        from src import listfile
+
+        list_id = list_id_for(items)
+        path = self.path(list_id)
+        if not os.path.exists(path):
+            listfile.write(path, items)
+        return list_id
+
+    def open(self, list_id: str) -> "listfile.ListFile":
+        from src import listfile
+
+        with self._lock:
+            mapped = self._open.get(list_id)
+            if mapped is not None:
+                self._open.move_to_end(list_id)
+                return mapped
+            try:
+                mapped = listfile.ListFile(self.path(list_id))
+            except FileNotFoundError:
+                raise ListNotFound(list_id) from None
+            except listfile.FormatError as e:
+                # The message names the file: keep it in the server log
+                logger.error("corrupt list file: %s", e)
+                raise ValueError("Stored list is corrupt") from None
+            self._open[list_id] = mapped
+            if len(self._open) > self.MAX_OPEN:
+                self._open.popitem(last=False)
+            return mapped
+
+    def length(self, list_id: str) -> int:
+        return len(self.open(list_id))
+
+    def read(self, list_id: str, start: int, end: int) -> List[str]:
+        return self.open(list_id)[start:end]
+
+
+def open_store(url: str) -> Optional[ListStore]:
+    """Build the backend described by a LIST_STORE url, or None if unset."""
+    if not url:
+        return None
+    kind, _, target = url.partition(":")
+    if kind == "sqlite" and target:
+        return SqliteListStore(target)
+    if kind == "dynamodb" and target:
+        return DynamoDbListStore(target)
+    if kind == "dir" and target:
+        return ListFileStore(target)
+    raise ValueError(f"unsupported LIST_STORE {url!r}")
@@ -0,0 +1,242 @@
+"""
+Incremental reader for the "list" array of a ListRequest body.
+
+The reader walks the raw JSON text instead of building the whole payload with
+json.loads, so only the strings that end up in the response are kept alive:
+head stops after n items and tail keeps a ring buffer of n items.
+Strings are decoded with the C-accelerated json.decoder.scanstring.
+
+NDJSON bodies (application/x-ndjson) are read a line at a time: an optional
+first line holding the other request fields ({"n": 3}), then one JSON string
+per line. Each line is checked against the limits as it is read, head stops
+reading after n lines, and tail keeps a ring buffer of n.
+
+Anything unusual (a non-string item, a limit violation, malformed JSON, a
+non-object body, or under a strict codec a value it would reject, such as a
+lone surrogate or NaN) raises Fallback. The caller then runs the regular
+json.loads + _validate path, which produces exactly the same error as before.
+"""
+
+import re
+from collections import deque
+from itertools import islice
+from json.decoder import JSONDecoder, scanstring
+from typing import Any, Iterator, List, Tuple
+
+from src import codec
+
+_WS = re.compile(r"[ \t\n\r]*")
+# A surrogate left in a decoded string is a lone one: pairs decode to one character
+_SURROGATE = re.compile("[\ud800-\udfff]")
+_WS_CHARS = " \t\n\r"
+_decoder = JSONDecoder()
+
+
+class Fallback(Exception):
+    """The body cannot be answered incrementally; use the json.loads path."""
+
+
+def _skip_ws(body: str, idx: int) -> int:
+    if body[idx] in _WS_CHARS:
+        return _WS.match(body, idx).end()
+    return idx
+
+
+def _scan_list(body: str, idx: int, max_items: int, max_len: int) -> Tuple[int, int]:
+    """Validate the array starting at body[idx] == "[" without keeping its items.
+
+    Returns the index just past the closing bracket and the item count.
+    """
+    idx = _skip_ws(body, idx + 1)
+    if body[idx] == "]":
+        return idx + 1, 0
+
+    strict = not codec.CODEC.lenient
+    count = 0
+    while True:
+        if body[idx] != '"':
+            raise Fallback("non-string item")
+        item, idx = scanstring(body, idx + 1)
+        if len(item) > max_len:
+            raise Fallback("string too long")
+        if strict and not item.isascii() and _SURROGATE.search(item):
+            raise Fallback("lone surrogate")
+        count += 1
+
+        sep = body[idx]
+        if sep in _WS_CHARS:
+            idx = _WS.match(body, idx).end()
+            sep = body[idx]
+        if sep == ",":
+            idx += 1
+            if body[idx] != '"':
+                idx = _skip_ws(body, idx)
+        elif sep == "]":
+            break
+        else:
+            raise Fallback("bad separator")
+
+    if count > max_items:
+        raise Fallback("list too long")
+    return idx + 1, count
+
+
+def iter_items(body: str, start: int) -> Iterator[str]:
+    """Yield the decoded strings of an array already checked by _scan_list."""
+    idx = _skip_ws(body, start + 1)
+    if body[idx] == "]":
+        return
+    while True:
+        item, idx = scanstring(body, idx + 1)
+        yield item
+        sep = body[idx]
+        if sep in _WS_CHARS:
+            idx = _WS.match(body, idx).end()
+            sep = body[idx]
+        if sep == "]":
+            return
+        idx += 1
+        if body[idx] != '"':
+            idx = _skip_ws(body, idx)
+
+
+def scan_request(body: str, max_items: int, max_len: int) -> Tuple[int, Any, int]:
+    """Walk the top-level object of a ListRequest body.
+
+    Returns (list_start, n, count): the index of the "list" array's opening
+    bracket, the raw "n" value (1 if absent) and the number of items. The
+    list is fully validated against max_items and max_len on the way.
+    """
+    list_start = -1
+    count = 0
+    n: Any = 1
+    strict = not codec.CODEC.lenient
+    try:
+        idx = _skip_ws(body, 0)
+        if body[idx] != "{":
+            raise Fallback("body is not an object")
+        idx = _skip_ws(body, idx + 1)
+        if body[idx] != "}":
+            while True:
+                if body[idx] != '"':
+                    raise Fallback("bad key")
+                key, idx = scanstring(body, idx + 1)
+                if strict and _SURROGATE.search(key):
+                    raise Fallback("lone surrogate")
+                idx = _skip_ws(body, idx)
+                if body[idx] != ":":
+                    raise Fallback("missing colon")
+                idx = _skip_ws(body, idx + 1)
+
+                if key == "list":
+                    # Duplicate keys: the last one wins, as with json.loads
+                    if body[idx] != "[":
+                        raise Fallback("'list' is not an array")
+                    list_start = idx
+                    idx, count = _scan_list(body, idx, max_items, max_len)
+                else:
+                    start = idx
+                    value, idx = _decoder.raw_decode(body, idx)
+                    if strict:
+                        # Raises on whatever the codec rejects and stdlib accepts
+                        codec.CODEC.loads(body[start:idx])
+                    if key == "n":
+                        n = value
+
+                idx = _skip_ws(body, idx)
+                if body[idx] == "}":
+                    break
+                if body[idx] != ",":
+                    raise Fallback("bad separator")
+                idx = _skip_ws(body, idx + 1)
+        if _WS.match(body, idx + 1).end() != len(body):
+            raise Fallback("extra data")
+    except (ValueError, IndexError) as e:
+        raise Fallback(str(e)) from e
+
+    if list_start < 0:
+        raise Fallback("missing 'list'")
+    return list_start, n, count
+
+
+def _check_n(n: Any, max_n: int) -> int:
+    if not isinstance(n, int) or n <= 0 or n > max_n:
+        raise Fallback("invalid 'n'")
+    return n
+
+
+def _window(body: str, max_items: int, max_len: int, max_n: int) -> Tuple[int, int]:
+    start, n, _ = scan_request(body, max_items, max_len)
+    return start, _check_n(n, max_n)
+
+
+def _lines_window(body: str, max_n: int) -> Tuple[int, int]:
+    """The index of the first item line and n from the header line (1 without one)."""
+    if not body.startswith("{"):
+        return 0, 1
+    end = body.find("\n")
+    if end < 0:
+        end = len(body)
+    try:
+        # The codec in use, so the header is read as formats.loads_ndjson reads it
+        header = codec.CODEC.loads(body[:end])
+    except ValueError as e:
+        raise Fallback(str(e)) from e
+    if not isinstance(header, dict):
+        raise Fallback("header is not an object")
+    return end + 1, _check_n(header.get("n", 1), max_n)
+
+
+def iter_lines(body: str, idx: int, max_items: int, max_len: int) -> Iterator[str]:
+    """Yield the string on each line from body[idx], checking each as it is read."""
+    size = len(body)
+    count = 0
+    strict = not codec.CODEC.lenient
+    while idx < size:
+        if body[idx] != '"':
+            raise Fallback("line is not a string")
+        try:
+            item, idx = scanstring(body, idx + 1)
+        except ValueError as e:
+            raise Fallback(str(e)) from e
+        if len(item) > max_len:
+            raise Fallback("string too long")
+        if strict and not item.isascii() and _SURROGATE.search(item):
+            raise Fallback("lone surrogate")
+        count += 1
+        if count > max_items:
+            raise Fallback("list too long")
+        yield item
+        if idx < size and body[idx] != "\n":
+            if not body.startswith("\r\n", idx):
+                raise Fallback("extra data after string")
+            idx += 1
+        idx += 1
+
+
+def head(body: str, max_items: int, max_len: int, max_n: int) -> List[str]:
+    """Return the first n strings of the body's list, decoding nothing else."""
+    start, n = _window(body, max_items, max_len, max_n)
+    return list(islice(iter_items(body, start), n))
+
+
+def tail(body: str, max_items: int, max_len: int, max_n: int) -> List[str]:
+    """Return the last n strings of the body's list.
+
+    Items stream through a ring buffer of size n, so at most n decoded
+    strings are alive at any time.
+    """
+    start, n = _window(body, max_items, max_len, max_n)
+    return list(deque(iter_items(body, start), maxlen=n))
+
+
+def head_lines(body: str, max_items: int, max_len: int, max_n: int) -> List[str]:
+    """Return the first n lines' strings of an NDJSON body; later lines are never read."""
+    start, n = _lines_window(body, max_n)
+    return list(islice(iter_lines(body, start, max_items, max_len), n))
+
+
+def tail_lines(body: str, max_items: int, max_len: int, max_n: int) -> List[str]:
+    """Return the last n lines' strings of an NDJSON body, through a ring buffer of n."""
+    start, n = _lines_window(body, max_n)
+    return list(deque(iter_lines(body, start, max_items, max_len), maxlen=n))
@@ -0,0 +1,56 @@
+"""
+Shared helpers for the benchmark suite.
+
+Benchmarks are opt-in because their timings depend on the machine they run on.
+
+Usage:
+  RUN_BENCHMARKS=1 pytest src/tests/benchmarks/ -v -s
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def pytest_collection_modifyitems(config, items):
+    if RUN_BENCHMARKS:
+        return
+    skip = pytest.mark.skip(reason="RUN_BENCHMARKS=1 not set. Set it to run benchmarks.")
+    for item in items:
+        if BENCH_DIR in Path(item.fspath).resolve().parents:
+            item.add_marker(skip)
+
+
+def best_of(fn: Callable[[], Any], number: int = 50, repeat: int = 5) -> float:
+    """Return the best mean wall time of ``fn`` in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def make_event(path: str, body: str, method: str = "POST") -> Dict[str, Any]:
+    """Build an HTTP API v2 event shaped like ``_event()`` in test_handler.py"""
+    return {
+        "requestContext": {"http": {"path": path, "method": method}},
+        "body": body,
+    }
+
+
+def make_list(size: int, width: int = 40) -> List[str]:
+    return [f"item-{i}".ljust(width, "x") for i in range(size)]
+
+
+def report(title: str, rows: List[List[Any]]) -> None:
+    print(f"\n{title}")
+    for row in rows:
+        print("  " + "  ".join(f"{c:>12}" if not isinstance(c, float) else f"{c:>12.1f}" for c in row))
@@ -0,0 +1,79 @@
+"""
+Overload: p99 of cheap requests while another API key floods the server
+with expensive ones (scripts/loadgen.py against python -m src.server, one
+worker, list cache off so every body is parsed).
+
+  interactive  100-item /head and /tail at a fixed 400 req/s (open loop,
+               latency from the scheduled time) over 16 connections
+  bulk         10,000-item /tail (~420 KB, ~160 cost units each) as fast
+               as 16 connections allow, never backing off
+
+The first row is the interactive load alone; the others add the flood with
+no admission control, per-tenant buckets (ADMISSION_RATE), the in-flight cost
+budget (SERVER_MAX_COST), and both. Both keys are verified by the server
+(AUTH_MODE=handler), so each is a tenant with its own bucket. The client and
+the server share the machine, so rejected floods still cost their upload.
+"""
+
+import asyncio
+import signal
+import sys
+from pathlib import Path
+
+from src import auth
+from .conftest import report
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import loadgen  # noqa: E402
+
+DURATION = 3.0
+RATE = 400
+AUTH = {"AUTH_MODE": "handler",
+        "API_KEY_HASHES": ",".join(auth.hash_key(key) for key in ("interactive", "bulk"))}
+CONFIGS = [
+    ("alone", None, {}),
+    ("no admission", 16, {}),
+    ("buckets", 16, {"ADMISSION_RATE": "1000", "ADMISSION_BURST": "500"}),
+    ("budget", 16, {"SERVER_MAX_COST": "200", "SERVER_QUEUE_TIMEOUT": "0.05"}),
+    ("both", 16, {"ADMISSION_RATE": "1000", "ADMISSION_BURST": "500",
+                  "SERVER_MAX_COST": "200", "SERVER_QUEUE_TIMEOUT": "0.05"}),
+]
+
+
+async def _load(url, bulk_connections):
+    cheap = loadgen.make_requests([("head", 1), ("tail", 1)], [(100, 1)], 40, 10, 4096, "", 1)
+    interactive = loadgen.run_http(url, cheap, 16, DURATION, RATE, 10, {"x-api-key": "interactive"})
+    if bulk_connections is None:
+        return await interactive, ([], DURATION)
+    heavy = loadgen.make_requests([("tail", 1)], [(10000, 1)], 40, 10, 64, "", 2)
+    bulk = loadgen.run_http(url, heavy, bulk_connections, DURATION, None, 10, {"x-api-key": "bulk"})
+    return await asyncio.gather(interactive, bulk)
+
+
+def _shed(stats):
+    return sum(count for status, count in stats["status"].items() if status in ("429", "503"))
+
+
+def test_overload_p99(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "ERROR")
+    monkeypatch.setenv("LIST_CACHE_ENTRIES", "0")
+    rows = [["config", "p50 ms", "p99 ms", "shed", "bulk ok/s", "bulk shed"]]
+    for name, bulk_connections, env in CONFIGS:
+        with monkeypatch.context() as m:
+            for key, value in {**AUTH, **env}.items():
+                m.setenv(key, value)
+            proc, url = loadgen.start_local(1)
+        try:
+            (cheap, cheap_s), (bulk, bulk_s) = asyncio.run(_load(url, bulk_connections))
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=10)
+        interactive = loadgen.summarize(cheap, cheap_s)["all"]
+        flood = loadgen.summarize(bulk, bulk_s)["all"] if bulk else None
+        assert interactive["requests"]
+        rows.append([name, interactive["p50_ms"], interactive["p99_ms"], _shed(interactive),
+                     round(flood["status"].get("200", 0) / bulk_s, 1) if flood else "-",
+                     _shed(flood) if flood else "-"])
+    report(f"interactive p50/p99 at {RATE} req/s while a bulk key floods 10,000-item lists, {DURATION:.0f} s", rows)
@@ -0,0 +1,48 @@
+"""
+API key decision cost: KeyVerifier with 1, 10 and 100 configured keys
+(accepted and rejected keys take the same time), the authorizer Lambda's
+whole handler, and lambda_handler for a 10-item /head with AUTH_MODE=gateway
+vs AUTH_MODE=handler.
+
+The in-handler check replaces an authorizer invocation that costs
+milliseconds on every uncached key; here it adds about one hash.
+"""
+
+import json
+
+import src.handler as handler
+from src import auth
+from .conftest import best_of, make_list, report
+
+KEY = "k" * 40
+
+
+def _event(key):
+    return {"requestContext": {"http": {"path": "/v1/list/head", "method": "POST"}},
+            "headers": {"x-api-key": key},
+            "body": json.dumps({"list": make_list(10), "n": 2})}
+
+
+def test_verifier_cost():
+    rows = [["keys", "accept us", "reject us"]]
+    for count in (1, 10, 100):
+        verifier = auth.KeyVerifier([auth.hash_key(KEY)] + [auth.hash_key(f"other-{i}") for i in range(count - 1)])
+        assert verifier(KEY) is not None
+        rows.append([count, best_of(lambda: verifier(KEY), number=20000),
+                     best_of(lambda: verifier("x" * 40), number=20000)])
+    report("KeyVerifier decision (us)", rows)
+
+
+def test_authorizer_and_handler_modes(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    verifier = auth.KeyVerifier([auth.hash_key(KEY)])
+    monkeypatch.setattr(auth, "VERIFIER", verifier)
+    event = _event(KEY)
+
+    rows = [["path", "us"]]
+    rows.append(["authorizer lambda_handler", best_of(lambda: auth.lambda_handler(event, None), number=20000)])
+    rows.append(["gateway mode /head", best_of(lambda: handler.lambda_handler(event, None), number=5000)])
+    monkeypatch.setattr(handler, "_api_keys", verifier)
+    assert handler.lambda_handler(event, None)["statusCode"] == 200
+    rows.append(["handler mode /head", best_of(lambda: handler.lambda_handler(event, None), number=5000)])
+    report("API key check (us)", rows)
@@ -0,0 +1,38 @@
+"""
+One /batch invocation vs the equivalent number of single /head and /tail calls.
+"""
+
+import json
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+
+@pytest.mark.parametrize("jobs", [10, 100, 500])
+def test_batch_vs_single_calls(jobs):
+    items = make_list(20)
+    singles = [
+        make_event(f"/v1/list/{'head' if i % 2 else 'tail'}", json.dumps({"list": items, "n": 5}))
+        for i in range(jobs)
+    ]
+    batch = make_event("/v1/list/batch", json.dumps({"jobs": [
+        {"op": "head" if i % 2 else "tail", "list": items, "n": 5} for i in range(jobs)
+    ]}))
+    shared = make_event("/v1/list/batch", json.dumps({
+        "list": items,
+        "queries": [{"op": "head" if i % 2 else "tail", "n": 5} for i in range(jobs)],
+    }))
+    assert handler.lambda_handler(batch, None)["statusCode"] == 200
+
+    def run_singles():
+        for event in singles:
+            handler.lambda_handler(event, None)
+
+    single = best_of(run_singles, number=5)
+    batched = best_of(lambda: handler.lambda_handler(batch, None), number=5)
+    queries = best_of(lambda: handler.lambda_handler(shared, None), number=5)
+    report(f"{jobs} operations (us, handler only; excludes API Gateway/Lambda overhead)",
+           [["single calls", "batch jobs", "shared list"], [single, batched, queries]])
+    assert batched < single
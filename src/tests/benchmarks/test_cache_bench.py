@@ -0,0 +1,32 @@
+"""
+Warm-hit latency of the list cache vs parsing and validating every request.
+"""
+
+import json
+
+import pytest
+
+import src.handler as handler
+from src.cache import ListCache
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_cache_warm_hit(size, monkeypatch):
+    event = make_event("/v1/list/tail", json.dumps({"list": make_list(size), "n": 5}))
+    call = lambda: handler.lambda_handler(event, None)
+
+    monkeypatch.setattr(handler, "LIST_CACHE", ListCache(0, 0, 0))
+    uncached = best_of(call, number=20)
+
+    monkeypatch.setattr(handler, "LIST_CACHE", ListCache(128, 32 * 1024 * 1024, 300))
+    call()
+    hit = best_of(call, number=20)
+    # Lambda hands every invocation a fresh body string, so its hash is not cached yet
+    fresh = lambda: handler.lambda_handler(dict(event, body=event["body"][:-1] + "}"), None)
+    fresh_hit = best_of(fresh, number=20)
+
+    report(f"/tail, {size} items (us)", [["uncached", "hit", "hit, new str"], [uncached, hit, fresh_hit]])
+    assert fresh_hit < uncached
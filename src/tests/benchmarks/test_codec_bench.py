@@ -0,0 +1,33 @@
+"""
+Encode/decode throughput of the JSON codec backends for the ListRequest and
+ListResponse shapes from openapi.yaml.
+"""
+
+import pytest
+
+from src import codec
+from .conftest import best_of, make_list, report
+
+SIZES = [100, 1000, 10000]
+BACKENDS = ["json", "ujson", "orjson"]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_codec_throughput(size):
+    request = {"list": make_list(size), "n": 5}
+    response = {"result": make_list(size)}
+
+    rows = [["codec", "decode us", "encode us", "encode-b us", "MB/s dec"]]
+    for name in BACKENDS:
+        c = codec.load(name)
+        if c.name != name:
+            continue
+        raw = c.dumps(request)
+        raw_b = c.dumpb(request)
+        assert c.loads(raw_b) == request
+
+        decode = best_of(lambda: c.loads(raw_b), number=20)
+        encode = best_of(lambda: c.dumps(response), number=20)
+        encode_b = best_of(lambda: c.dumpb(response), number=20)
+        rows.append([name, decode, encode, encode_b, len(raw) / decode])
+    report(f"ListRequest decode / ListResponse encode, {size} items", rows)
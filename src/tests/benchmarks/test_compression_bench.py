@@ -0,0 +1,45 @@
+"""
+Bytes on the wire and handler latency with and without Content-Encoding.
+
+Request: plain JSON vs base64(gzip(JSON)). Response: n = size, so the whole
+list comes back, with and without Accept-Encoding: gzip.
+"""
+
+import base64
+import gzip
+import json
+
+import pytest
+
+import src.handler as handler
+from src import compress
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+def _wire(response):
+    return len(response["body"])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_compression(size, monkeypatch):
+    monkeypatch.setattr(handler, "COMPRESS_ENCODINGS", tuple(compress.available()))
+    body = json.dumps({"list": make_list(size), "n": size})
+    plain = make_event("/v1/list/head", body)
+    packed = make_event("/v1/list/head", base64.b64encode(gzip.compress(body.encode(), 6)).decode())
+    packed.update(isBase64Encoded=True, headers={"content-encoding": "gzip"})
+
+    rows = [["request", "response", "req B", "resp B", "us"]]
+    for name, event in (("json", plain), ("gzip+b64", packed)):
+        for accept in (None, *compress.available()):
+            case = dict(event, headers=dict(event.get("headers", {})))
+            if accept:
+                case["headers"]["accept-encoding"] = accept
+            # Bypass the body cache so every call decodes the request
+            handler.LIST_CACHE.clear()
+            response = handler.lambda_handler(case, None)
+            assert response["statusCode"] == 200
+            us = best_of(lambda: (handler.LIST_CACHE.clear(), handler.lambda_handler(case, None)), number=10)
+            rows.append([name, accept or "identity", len(case["body"]), _wire(response), us])
+    report(f"{size} items", rows)
@@ -0,0 +1,38 @@
+"""
+Runtime limits cost on the request path: RuntimeConfig.limits() for the
+global limits and for a tenant among 1,000, and lambda_handler for a 10-item
+/head with and without a tenant from the authorizer context.
+
+limits() is a clock read and a dict lookup; the fetch never happens on the
+request path.
+"""
+
+import json
+
+import src.handler as handler
+from src import config
+from .conftest import best_of, make_list, report
+
+
+def _event(tenant=None):
+    context = {"http": {"path": "/v1/list/head", "method": "POST"}}
+    if tenant is not None:
+        context["authorizer"] = {"lambda": {"key_id": tenant}}
+    return {"requestContext": context, "body": json.dumps({"list": make_list(10), "n": 2})}
+
+
+def test_limits_lookup(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    tenants = {f"tenant-{i}": {"max_n": 100 + i} for i in range(1000)}
+    runtime = config.RuntimeConfig(handler.DEFAULT_LIMITS, config.StaticSource({"tenants": tenants}))
+    assert runtime.load()
+
+    rows = [["path", "us"]]
+    rows.append(["limits() global", best_of(lambda: runtime.limits(), number=100000)])
+    rows.append(["limits() tenant", best_of(lambda: runtime.limits("tenant-500"), number=100000)])
+    plain, tenant = _event(), _event("tenant-500")
+    rows.append(["/head, built-in limits", best_of(lambda: handler.lambda_handler(plain, None), number=5000)])
+    monkeypatch.setattr(handler, "CONFIG", runtime)
+    assert handler.lambda_handler(tenant, None)["statusCode"] == 200
+    rows.append(["/head, tenant limits", best_of(lambda: handler.lambda_handler(tenant, None), number=5000)])
+    report("Runtime limits (us)", rows)
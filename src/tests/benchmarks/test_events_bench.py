@@ -0,0 +1,73 @@
+"""
+Dispatch overhead per event shape: HTTP API v2, REST API v1 and ALB (with
+and without multi-value headers).
+
+For each shape: events.from_event alone, the route lookup, and a full
+lambda_handler call for the cheapest response (405) and a 10-item /head.
+The "endswith" row is the previous routing (requestContext.http lookups and
+a path.endswith chain), for comparison.
+"""
+
+import json
+
+import src.handler as handler
+from src import events
+from .conftest import best_of, make_list, report
+
+BODY = json.dumps({"list": make_list(10), "n": 2})
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "*/*",
+    "User-Agent": "bench",
+    "Host": "api.example.com",
+    "X-Forwarded-For": "10.0.0.1",
+    "X-Forwarded-Proto": "https",
+    "X-Amzn-Trace-Id": "Root=1-abc",
+}
+
+
+def _shapes(path, method="POST"):
+    lower = {k.lower(): v for k, v in HEADERS.items()}
+    multi = {k: [v] for k, v in HEADERS.items()}
+    return {
+        "http v2": {"version": "2.0", "requestContext": {"http": {"method": method, "path": path}},
+                    "headers": lower, "body": BODY, "isBase64Encoded": False},
+        "rest v1": {"httpMethod": method, "path": path, "headers": HEADERS, "multiValueHeaders": multi,
+                    "requestContext": {"stage": "dev"}, "body": BODY, "isBase64Encoded": False},
+        "alb": {"httpMethod": method, "path": path, "headers": HEADERS,
+                "requestContext": {"elb": {}}, "body": BODY, "isBase64Encoded": False},
+        "alb multi": {"httpMethod": method, "path": path, "multiValueHeaders": multi,
+                      "requestContext": {"elb": {}}, "body": BODY, "isBase64Encoded": False},
+    }
+
+
+def _endswith(event):
+    http = (event.get("requestContext") or {}).get("http") or {}
+    path = (http.get("path") or "").lower()
+    (http.get("method") or "GET").upper()
+    for suffix in ("/lists", "/batch", "/head", "/tail"):
+        if path.endswith(suffix):
+            return suffix
+    return None
+
+
+def test_dispatch_overhead(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    posts = _shapes("/v1/list/tail")
+    gets = _shapes("/v1/list/tail", "GET")
+
+    rows = [["event", "from_event", "route", "405", "/tail 10"]]
+    endswith = best_of(lambda: _endswith(posts["http v2"]), number=20000)
+    rows.append(["endswith", "-", endswith, "-", "-"])
+    for name, event in posts.items():
+        request = events.from_event(event)
+        rows.append([
+            name,
+            best_of(lambda: events.from_event(event), number=20000),
+            best_of(lambda: handler.ROUTES.get(request.path.rpartition("/")[2]), number=20000),
+            best_of(lambda: handler.lambda_handler(gets[name], None), number=5000),
+            best_of(lambda: handler.lambda_handler(event, None), number=5000),
+        ])
+        assert handler.lambda_handler(event, None)["statusCode"] == 200
+    report("Dispatch per event shape (us)", rows)
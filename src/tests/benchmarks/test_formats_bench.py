@@ -0,0 +1,51 @@
+"""
+Decode + validate + encode time and payload size: JSON vs MessagePack vs
+length-prefixed binary, through the handler with n = size (the whole list
+comes back, so encoding cost is included).
+"""
+
+import base64
+import json
+import struct
+
+import pytest
+
+import src.handler as handler
+from src import formats
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+def _length_prefixed(items, n):
+    encoded = [item.encode() for item in items]
+    lengths = struct.pack(f"<{len(encoded)}I", *map(len, encoded))
+    return struct.pack("<II", n, len(encoded)) + lengths + b"".join(encoded)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_formats(size, monkeypatch):
+    # Every call decodes its body, as a fresh request would
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    items = make_list(size)
+
+    bodies = {"application/json": json.dumps({"list": items, "n": size}).encode(),
+              formats.LENGTH_PREFIXED: _length_prefixed(items, size)}
+    if formats.MSGPACK in formats.available():
+        import msgpack
+        bodies[formats.MSGPACK] = msgpack.packb({"list": items, "n": size})
+
+    rows = [["format", "req B", "resp B", "us"]]
+    for media_type, data in bodies.items():
+        if media_type == "application/json":
+            event = make_event("/v1/list/head", data.decode())
+        else:
+            event = make_event("/v1/list/head", base64.b64encode(data).decode())
+            event.update(isBase64Encoded=True, headers={"content-type": media_type, "accept": media_type})
+        response = handler.lambda_handler(event, None)
+        assert response["statusCode"] == 200
+        # Wire size before base64, which API Gateway removes
+        wire = len(base64.b64decode(response["body"])) if response.get("isBase64Encoded") else len(response["body"])
+        rows.append([media_type.rsplit("/", 1)[1], len(data), wire,
+                     best_of(lambda: handler.lambda_handler(event, None), number=10)])
+    report(f"{size} items, n={size}", rows)
@@ -0,0 +1,44 @@
+"""
+Head/tail/slice from a memory-mapped list file vs json.loads + list slicing.
+
+The list file column includes opening (mapping) the file, so it is the cost
+of a cold query; a warm ListFileStore keeps the mapping open.
+"""
+
+import json
+
+import pytest
+
+from src import listfile
+from .conftest import best_of, make_list, report
+
+SIZES = [10_000, 100_000, 1_000_000]
+N = 10
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_listfile_vs_json(size, tmp_path):
+    items = make_list(size)
+    json_path = tmp_path / "list.json"
+    json_path.write_text(json.dumps({"list": items}))
+    lst_path = str(tmp_path / "list.lst")
+    listfile.write(lst_path, items)
+
+    mid = size // 2
+    windows = {"head": slice(0, N), "tail": slice(-N, None), "slice": slice(mid, mid + N)}
+    number = 3 if size >= 1_000_000 else 10
+
+    rows = [["op", "json us", "mmap us", "speedup"]]
+    for op, window in windows.items():
+        def from_json():
+            return json.loads(json_path.read_bytes())["list"][window]
+
+        def from_listfile():
+            with listfile.ListFile(lst_path) as lf:
+                return lf[window]
+
+        assert from_json() == from_listfile()
+        t_json = best_of(from_json, number=number, repeat=3)
+        t_mmap = best_of(from_listfile, number=number, repeat=3)
+        rows.append([op, t_json, t_mmap, f"{t_json / t_mmap:.0f}x"])
+    report(f"{size} items, n={N} (json {json_path.stat().st_size} B, list file {tmp_path.joinpath('list.lst').stat().st_size} B)", rows)
@@ -0,0 +1,38 @@
+"""
+Cost of the per-request instrumentation: METRICS_SAMPLE_RATE 0 (off) vs
+0.01 vs 1 (every request timed and an EMF line written).
+"""
+
+import contextlib
+import json
+import os
+
+import pytest
+
+import src.handler as handler
+from src import metrics
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [10, 1000]
+RATES = [0.0, 0.01, 1.0]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_metrics_overhead(size, monkeypatch):
+    event = make_event("/v1/list/head", json.dumps({"list": make_list(size), "n": 5}))
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    call = lambda: handler.lambda_handler(event, None)
+
+    # Rates interleaved over several rounds, each keeping its best, so a
+    # burst of machine noise does not land on one rate only
+    times = [float("inf")] * len(RATES)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(3):
+            for i, rate in enumerate(RATES):
+                monkeypatch.setattr(metrics, "METRICS_SAMPLE_RATE", rate)
+                times[i] = min(times[i], best_of(call, number=200))
+
+    report(f"/head, {size} items (us)", [[f"rate {rate:g}" for rate in RATES], times])
+    # Sampling off is not slower than sampling every request, within timing noise
+    assert times[0] <= times[-1] * 1.2
@@ -0,0 +1,60 @@
+"""
+NDJSON request bodies vs one JSON array: /head and /tail with n=10 over
+10,000 items, through lambda_handler with the list cache off.
+
+  json         LIST_PARSER=json: the whole body decoded, then validated
+  json stream  LIST_PARSER=stream: the array walked, n items kept
+  ndjson       Content-Type: application/x-ndjson, one line at a time
+
+Reports the latency and the peak traced allocation of one request. NDJSON
+/head stops reading after n lines, so its cost does not grow with the list.
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_list, report
+
+ITEMS = make_list(10000)
+
+
+def _event(path, body, content_type="application/json"):
+    return {"requestContext": {"http": {"path": path, "method": "POST"}},
+            "headers": {"content-type": content_type}, "body": body}
+
+
+def _peak_kb(event):
+    tracemalloc.start()
+    handler.lambda_handler(event, None)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e3
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    monkeypatch.setattr(handler, "LIST_CACHE", handler.ListCache(max_entries=0, max_bytes=0, ttl=0))
+
+
+def test_ndjson_vs_json(monkeypatch):
+    json_body = json.dumps({"list": ITEMS, "n": 10})
+    ndjson_body = json.dumps({"n": 10}) + "\n" + "\n".join(map(json.dumps, ITEMS)) + "\n"
+    rows = [["route", "body", "us", "peak KB"]]
+    for route in ("head", "tail"):
+        path = f"/v1/list/{route}"
+        cases = [
+            ("json", "json", _event(path, json_body)),
+            ("json stream", "stream", _event(path, json_body)),
+            ("ndjson", "json", _event(path, ndjson_body, "application/x-ndjson")),
+        ]
+        for name, parser, event in cases:
+            monkeypatch.setattr(handler, "LIST_PARSER", parser)
+            response = handler.lambda_handler(event, None)
+            assert json.loads(response["body"])["result"] == (ITEMS[:10] if route == "head" else ITEMS[-10:])
+            rows.append([route, name, best_of(lambda: handler.lambda_handler(event, None), number=20),
+                         _peak_kb(event)])
+    report("NDJSON vs JSON request bodies, 10,000 items, n=10", rows)
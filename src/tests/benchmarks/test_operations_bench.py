@@ -0,0 +1,40 @@
+"""
+Cost of the list operations on one 10,000-item list: /head, /slice, /page
+and /sample selecting 100 items, cold (parse + validate every request) and
+with a warm list cache. The window is the only part that differs, so every
+route should cost about the same as /head; /sample with a step reads a
+strided view of the same list.
+"""
+
+import json
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+ITEMS = make_list(10000)
+PAYLOADS = {
+    "head": {"n": 100},
+    "slice": {"n": 100, "offset": 5000},
+    "page": {"n": 100, "cursor": handler._encode_cursor(5000)},
+    "sample": {"n": 100, "step": 100},
+}
+
+
+def test_operations(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    rows = [["route", "cold us", "cached us", "window us"]]
+    for op, params in PAYLOADS.items():
+        payload = {"list": ITEMS, **params}
+        event = make_event(f"/v1/list/{op}", json.dumps(payload))
+        assert handler.lambda_handler(event, None)["statusCode"] == 200
+
+        monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+        cold = best_of(lambda: handler.lambda_handler(event, None), number=20)
+        monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 128)
+        handler.lambda_handler(event, None)
+        cached = best_of(lambda: handler.lambda_handler(event, None), number=200)
+
+        list_op = handler.LIST_OPS[op]
+        window = best_of(lambda: handler._take(ITEMS, list_op.window(len(ITEMS), 100, payload)), number=2000)
+        rows.append([op, cold, cached, window])
+    report("List operations, 10,000 items, 100 selected (us)", rows)
@@ -0,0 +1,44 @@
+"""
+A/B benchmark of the /head and /tail request parsers selected by LIST_PARSER.
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+def _peak_kib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("op", ["head", "tail"])
+@pytest.mark.parametrize("size", SIZES)
+def test_parser_ab(size, op, monkeypatch):
+    items = make_list(size)
+    expected = items[:5] if op == "head" else items[-5:]
+    event = make_event(f"/v1/list/{op}", json.dumps({"list": items, "n": 5}))
+    # Every call parses: the cache would answer the json parser's repeats
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    call = lambda: handler.lambda_handler(event, None)
+
+    rows = [["parser", "time us", "peak KiB"]]
+    peaks = {}
+    for parser in ("json", "stream"):
+        monkeypatch.setattr(handler, "LIST_PARSER", parser)
+        assert json.loads(call()["body"])["result"] == expected
+        peaks[parser] = _peak_kib(call)
+        rows.append([parser, best_of(call, number=20), peaks[parser]])
+    report(f"/{op} n=5, {size} items", rows)
+
+    assert peaks["stream"] < peaks["json"]
@@ -0,0 +1,63 @@
+"""
+Throughput of large requests (10,000 x 90-character items, ~1 MB) inline in
+the event loop vs through the process pool with 1 to N worker processes.
+
+Requests are issued 16 at a time. The list cache is off so that every
+request is parsed and validated. Scaling is bounded by the cores on the
+machine (printed in the title).
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+import src.handler as handler
+from src import server
+from src.pool import OffloadPool
+from .conftest import make_list, report
+
+REQUESTS = 64
+CONCURRENCY = 16
+
+
+def _bodies():
+    items = make_list(handler.MAX_LIST_LENGTH, width=90)
+    # Distinct bodies, as from different clients
+    return [json.dumps({"list": items, "n": 10 + i}).encode() for i in range(REQUESTS)]
+
+
+async def _drive(call, bodies):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(body):
+        async with semaphore:
+            status, _, _ = await call("POST", "/v1/list/tail", {}, body)
+            assert status == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(body) for body in bodies))
+    return len(bodies) / (time.perf_counter() - start)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_pool_scaling(monkeypatch):
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    monkeypatch.setattr(handler.logger, "level", 30)
+    bodies = _bodies()
+
+    async def inline(method, path, headers, body):
+        return server.respond(method, path, headers, body)
+
+    base = asyncio.run(_drive(inline, bodies))
+    rows = [["mode", "req/s", "speedup"], ["inline", base, "1.0x"]]
+    for processes in sorted({1, 2, 4, os.cpu_count() or 1}):
+        pool = OffloadPool(processes)
+        try:
+            rps = asyncio.run(_drive(pool.respond, bodies))
+        finally:
+            pool.close()
+        rows.append([f"pool x{processes}", rps, f"{rps / base:.1f}x"])
+    report(f"~1 MB requests, {CONCURRENCY} in flight, {os.cpu_count()} CPUs", rows)
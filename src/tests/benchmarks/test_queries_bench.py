@@ -0,0 +1,41 @@
+"""
+Validation cost amortized across many windows over one shared list.
+"""
+
+import json
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+
+def _queries(k):
+    ops = [{"op": "head", "n": 10}, {"op": "head", "n": 100}, {"op": "tail", "n": 50},
+           {"op": "slice", "offset": 500, "n": 100}]
+    return [ops[i % len(ops)] for i in range(k)]
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, 100])
+def test_shared_list_amortization(k, monkeypatch):
+    # Singles and batch both parse every call: the cache would answer repeated singles
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    items = make_list(10000)
+    queries = _queries(k)
+    singles = [make_event("/v1/list/head", json.dumps({"list": items, "n": q["n"]})) for q in queries]
+    shared = make_event("/v1/list/batch", json.dumps({"list": items, "queries": queries}))
+    spans = make_event("/v1/list/batch", json.dumps({"list": items, "queries": queries, "spans": True}))
+
+    def run_singles():
+        for event in singles:
+            handler.lambda_handler(event, None)
+
+    single = best_of(run_singles, number=3) / k
+    per_query = best_of(lambda: handler.lambda_handler(shared, None), number=3) / k
+    per_span = best_of(lambda: handler.lambda_handler(spans, None), number=3) / k
+    size = len(handler.lambda_handler(shared, None)["body"])
+    span_size = len(handler.lambda_handler(spans, None)["body"])
+    report(f"{k} queries over 10,000 items (us per query)",
+           [["single calls", "shared list", "spans", "bytes", "span bytes"],
+            [single, per_query, per_span, size, span_size]])
+    assert per_query <= single * 1.1
@@ -0,0 +1,61 @@
+"""
+Hot-invocation latency of the 405/404/400/200 paths: prebuilt headers and
+canned bodies vs building every response from scratch.
+"""
+
+import json
+from typing import Any, Dict
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+
+def _resp_from_scratch(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    """The previous _resp, kept as the comparison baseline"""
+    return {
+        "statusCode": status,
+        "headers": {
+            "Content-Type": "application/json",
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+            "Content-Security-Policy": "default-src 'none'",
+            "X-XSS-Protection": "1; mode=block",
+        },
+        "body": json.dumps(body),
+    }
+
+
+RESULT = make_list(10)
+BUILDERS = {
+    405: (lambda: _resp_from_scratch(405, {"error": "Method Not Allowed"}),
+          lambda: handler._resp_raw(405, handler._BODY_405)),
+    404: (lambda: _resp_from_scratch(404, {"error": "Not Found"}),
+          lambda: handler._resp_raw(404, handler._BODY_404)),
+    400: (lambda: _resp_from_scratch(400, {"code": "VALIDATION_ERROR", "error": "'n' must be a positive integer"}),
+          lambda: handler._resp(400, {"code": "VALIDATION_ERROR", "error": "'n' must be a positive integer"})),
+    200: (lambda: _resp_from_scratch(200, {"result": RESULT}),
+          lambda: handler._resp_result(RESULT)),
+}
+
+EVENTS = {
+    405: make_event("/v1/list/head", "{}", method="GET"),
+    404: make_event("/v1/list/unknown", json.dumps({"list": ["a"]})),
+    400: make_event("/v1/list/head", json.dumps({"list": ["a"], "n": 0})),
+    200: make_event("/v1/list/head", json.dumps({"list": make_list(100), "n": 10})),
+}
+
+
+@pytest.mark.parametrize("status", [405, 404, 400, 200])
+def test_response_paths(status):
+    old_build, new_build = BUILDERS[status]
+    assert json.loads(old_build()["body"]) == json.loads(new_build()["body"])
+
+    old = best_of(old_build, number=2000)
+    new = best_of(new_build, number=2000)
+    event = EVENTS[status]
+    assert handler.lambda_handler(event, None)["statusCode"] == status
+    full = best_of(lambda: handler.lambda_handler(event, None), number=500)
+    report(f"{status} response (us)", [["from scratch", "prebuilt", "handler"], [old, new, full]])
@@ -0,0 +1,104 @@
+"""
+Local load test: the persistent server (src/server.py) vs calling
+lambda_handler directly in-process.
+
+Each server run uses 32 keep-alive connections for ~2 s and reports req/s
+and latency percentiles. The direct row is the ceiling: the same handler
+work without HTTP parsing, sockets or the event adapter.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import src.handler as handler
+from .conftest import make_event, make_list, report
+
+ROOT = Path(__file__).resolve().parents[3]
+CONNECTIONS = 32
+DURATION = 2.0
+BODY = json.dumps({"list": make_list(100), "n": 10}).encode()
+REQUEST = (b"POST /v1/list/tail HTTP/1.1\r\nHost: bench\r\nContent-Length: %d\r\n\r\n" % len(BODY)) + BODY
+
+
+def _percentiles(latencies):
+    latencies.sort()
+    return [latencies[int(len(latencies) * p)] * 1e6 for p in (0.5, 0.99)]
+
+
+def _direct():
+    event = make_event("/v1/list/tail", BODY.decode())
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+    while True:
+        start = time.perf_counter()
+        handler.lambda_handler(event, None)
+        end = time.perf_counter()
+        latencies.append(end - start)
+        if end > deadline:
+            break
+    return len(latencies) / DURATION, latencies
+
+
+async def _client(port, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        writer.write(REQUEST)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def _load(port):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, start + DURATION, latencies) for _ in range(CONNECTIONS)))
+    return len(latencies) / (time.perf_counter() - start), latencies
+
+
+def _start_server(workers):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = dict(os.environ, LOG_LEVEL="WARNING")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT, env=env,
+    )
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, port
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="needs SO_REUSEPORT")
+def test_server_vs_direct(monkeypatch):
+    monkeypatch.setattr(handler.logger, "level", 30)
+    rows = [["runtime", "req/s", "p50 us", "p99 us"]]
+    rps, latencies = _direct()
+    rows.append(["direct", rps, *_percentiles(latencies)])
+
+    for workers in sorted({1, min(4, os.cpu_count() or 1)}):
+        proc, port = _start_server(workers)
+        try:
+            rps, latencies = asyncio.run(_load(port))
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=10)
+        rows.append([f"server x{workers}", rps, *_percentiles(latencies)])
+    report(f"100-item tail, {CONNECTIONS} keep-alive connections, {DURATION:.0f} s", rows)
@@ -0,0 +1,36 @@
+"""
+Repeated head/tail queries by list_id (SQLite store) vs sending the list inline.
+"""
+
+import json
+
+import pytest
+
+import src.handler as handler
+from src.cache import ListCache
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_id_vs_inline(size, tmp_path, monkeypatch):
+    monkeypatch.setattr(handler, "LIST_STORE", f"sqlite:{tmp_path / 'lists.db'}")
+    monkeypatch.setattr(handler, "_store", None)
+    # Measure the store itself, not the body cache
+    monkeypatch.setattr(handler, "LIST_CACHE", ListCache(0, 0, 0))
+
+    items = make_list(size)
+    put = handler.lambda_handler(make_event("/v1/lists", json.dumps({"list": items}), method="PUT"), None)
+    list_id = json.loads(put["body"])["list_id"]
+
+    rows = [["op", "inline us", "by id us", "inline B", "by id B"]]
+    for op in ("head", "tail"):
+        inline = make_event(f"/v1/list/{op}", json.dumps({"list": items, "n": 5}))
+        by_id = make_event(f"/v1/list/{op}", json.dumps({"list_id": list_id, "n": 5}))
+        assert handler.lambda_handler(inline, None)["body"] == handler.lambda_handler(by_id, None)["body"]
+        rows.append([op,
+                     best_of(lambda: handler.lambda_handler(inline, None), number=20),
+                     best_of(lambda: handler.lambda_handler(by_id, None), number=20),
+                     len(inline["body"]), len(by_id["body"])])
+    report(f"{size} items, n=5", rows)
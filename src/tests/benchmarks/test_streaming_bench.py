@@ -0,0 +1,113 @@
+"""
+Large results buffered vs streamed: /head returning 10,000 items of 100 and
+1,000 characters (1 MB and 10 MB of JSON), under raised limits.
+
+  buffered  lambda_handler: the whole body encoded as one string
+  json      stream_handler: {"result": [...]} in chunks of STREAM_CHUNK_ITEMS
+  ndjson    stream_handler with Accept: application/x-ndjson
+
+For each: time to the first body byte and to the last one through the
+container server over a local socket (request parsing included, so both
+modes share that floor), and the peak traced allocation of one request
+(tracemalloc) with the response consumed chunk by chunk and dropped.
+"""
+
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+import pytest
+
+import src.handler as handler
+from src import config, server
+from .conftest import make_list, report
+
+SIZE = 10000
+MODES = {
+    "buffered": (False, ""),
+    "json": (True, ""),
+    "ndjson": (True, "Accept: application/x-ndjson\r\n"),
+}
+
+
+@pytest.fixture(autouse=True)
+def large_limits(monkeypatch):
+    monkeypatch.setattr(handler.logger, "disabled", True)
+    monkeypatch.setattr(handler, "LIST_CACHE", handler.ListCache(max_entries=0, max_bytes=0, ttl=0))
+    limits = handler.DEFAULT_LIMITS._replace(max_string_length=2000, max_body_size=32 * 1024 * 1024)
+    monkeypatch.setattr(handler, "CONFIG", config.RuntimeConfig(limits))
+    monkeypatch.setattr(server, "_too_large", lambda length: False)
+
+
+def _body(width):
+    return json.dumps({"list": make_list(SIZE, width), "n": SIZE}).encode()
+
+
+async def _timed_request(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    start = time.perf_counter()
+    writer.write(request)
+    await reader.readuntil(b"\r\n\r\n")
+    await reader.read(1)
+    first = time.perf_counter() - start
+    await reader.read()
+    last = time.perf_counter() - start
+    writer.close()
+    return first * 1e3, last * 1e3
+
+
+def _server_times(body, rounds=10):
+    """Best first/last-byte ms per mode, the modes taking turns so drift hits them alike."""
+    original = server.respond
+    streaming = {}
+
+    def respond(method, path, headers, data, stream=False):
+        return original(method, path, headers, data, stream and streaming["on"])
+
+    async def run():
+        srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        times = {mode: [] for mode in MODES}
+        async with srv:
+            for _ in range(rounds):
+                for mode, (stream, extra) in MODES.items():
+                    streaming["on"] = stream
+                    request = (f"POST /v1/list/head HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                               f"Connection: close\r\n{extra}\r\n").encode() + body
+                    gc.collect()
+                    times[mode].append(await _timed_request(port, request))
+        return {mode: (min(t[0] for t in ts), min(t[1] for t in ts)) for mode, ts in times.items()}
+
+    server.respond = respond
+    try:
+        return asyncio.run(run())
+    finally:
+        server.respond = original
+
+
+def _peak_mb(body, streaming, accept):
+    headers = {"accept": accept} if accept else {}
+    tracemalloc.start()
+    status, _, data = server.respond("POST", "/v1/list/head", headers, body, streaming)
+    if not isinstance(data, bytes):
+        for _ in data:
+            pass
+    del data
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert status == 200
+    return peak / 1e6
+
+
+def test_ttfb_and_peak_memory():
+    rows = [["width", "mode", "first ms", "last ms", "peak MB"]]
+    for width in (100, 1000):
+        body = _body(width)
+        times = _server_times(body)
+        # Traced afterwards: tracemalloc slows down whatever runs after it
+        for mode, (streaming, extra) in MODES.items():
+            accept = extra.partition(": ")[2].strip()
+            rows.append([width, mode, *times[mode], _peak_mb(body, streaming, accept)])
+    report(f"/head of {SIZE} items through the server", rows)
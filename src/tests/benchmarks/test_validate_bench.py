@@ -0,0 +1,58 @@
+"""
+Validation micro-benchmarks: single-pass _validate vs the previous three-pass version.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+import src.handler as handler
+from .conftest import best_of, make_event, make_list, report
+
+SIZES = [100, 1000, 10000]
+
+
+def _validate_three_pass(payload: Dict[str, Any]) -> Tuple[List[str], int]:
+    """The pre-single-pass implementation, kept as the comparison baseline"""
+    arr = payload.get("list")
+    n = payload.get("n", 1)
+    if not isinstance(arr, list):
+        raise ValueError("'list' must be an array")
+    if len(arr) > handler.MAX_LIST_LENGTH:
+        raise ValueError(f"'list' length must be <= {handler.MAX_LIST_LENGTH}")
+    if not all(isinstance(x, str) for x in arr):
+        raise ValueError("'list' must contain only strings")
+    for idx, item in enumerate(arr):
+        if len(item) > handler.MAX_STRING_LENGTH:
+            raise ValueError(f"String at index {idx} exceeds max length of {handler.MAX_STRING_LENGTH} characters")
+    if not isinstance(n, int) or n <= 0:
+        raise ValueError("'n' must be a positive integer")
+    if n > 10000:
+        raise ValueError("'n' must be <= 10000")
+    return arr, n
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_validate_single_pass_is_faster(size):
+    payload = {"list": make_list(size), "n": 5}
+
+    old = best_of(lambda: _validate_three_pass(payload), number=200)
+    new = best_of(lambda: handler._validate(payload, handler.DEFAULT_LIMITS), number=200)
+    report(f"_validate, {size} items (us)", [["three-pass", "single-pass", "saving %"],
+                                             [old, new, (1 - new / old) * 100]])
+    assert new < old
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_request_cpu_head(size):
+    body = json.dumps({"list": make_list(size), "n": 5})
+    event = make_event("/v1/list/head", body)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(handler, "_validate", _validate_three_pass)
+        old = best_of(lambda: handler.lambda_handler(event, None))
+    new = best_of(lambda: handler.lambda_handler(event, None))
+    report(f"lambda_handler /head, {size} items (us)", [["three-pass", "single-pass", "saving %"],
+                                                        [old, new, (1 - new / old) * 100]])
+    assert new < old * 1.05
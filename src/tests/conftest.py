@@ -0,0 +1,10 @@
+import pytest
+import src.handler as handler
+
+
+@pytest.fixture(autouse=True)
+def _clear_list_cache():
+    """Every test starts with a cold list cache"""
+    handler.LIST_CACHE.clear()
+    yield
+    handler.LIST_CACHE.clear()
@@ -0,0 +1,310 @@
+import asyncio
+import base64
+import gzip
+import json
+
+import pytest
+
+import src.handler as handler
+from src import admission, auth, events, server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _request(body, headers=None, is_base64=False):
+    return events.Request("http", "POST", "/v1/list/head", headers or {}, body, is_base64)
+
+
+def test_estimate_counts_bytes_and_items():
+    assert admission.request_cost(_request(None), 1000) == 1.0
+    body = json.dumps({"list": ["a"] * 400, "n": 1})
+    assert admission.request_cost(_request(body), 10 ** 6) == admission.estimate(len(body), 401)
+    lines = "\n".join(['"a"'] * 400) + "\n"
+    ndjson = _request(lines, {"content-type": "application/x-ndjson"})
+    assert admission.request_cost(ndjson, 10 ** 6) == admission.estimate(len(lines), 401)
+    # Items per byte matter: the same size in short items costs more
+    short = json.dumps({"list": ["a"] * 1000, "n": 1})
+    long = json.dumps({"list": ["a" * 40] * 100, "n": 1})
+    long = long + " " * (len(short) - len(long))
+    assert admission.request_cost(_request(short), 10 ** 6) > admission.request_cost(_request(long), 10 ** 6)
+
+
+def test_estimate_scales_a_sample_of_large_bodies():
+    body = json.dumps({"list": ["abc"] * 100000, "n": 1})
+    estimated = admission.request_cost(_request(body), 10 ** 7)
+    exact = admission.estimate(len(body), 100000)
+    assert abs(estimated - exact) / exact < 0.01
+
+
+def test_estimate_of_encoded_bodies():
+    raw = json.dumps({"list": ["a"] * 1000, "n": 1}).encode()
+    # Priced at the decoded size, give or take base64 padding
+    encoded = base64.b64encode(raw).decode()
+    cost = admission.request_cost(_request(encoded, is_base64=True), 10 ** 6)
+    assert cost == pytest.approx(admission.estimate(len(raw)), abs=0.01)
+    packed = base64.b64encode(gzip.compress(raw)).decode()
+    cost = admission.request_cost(_request(packed, {"content-encoding": "gzip"}, True), 10 ** 6)
+    assert cost == pytest.approx(admission.estimate(len(gzip.compress(raw)) * 4), abs=0.01)
+    # Never priced above the body size limit
+    assert admission.request_cost(_request(packed, {"content-encoding": "gzip"}, True), 100) == admission.estimate(100)
+
+
+def test_bucket_refills_at_rate():
+    clock = Clock()
+    buckets = admission.TokenBuckets(rate=10, burst=20, clock=clock)
+    assert buckets.take("a", 15) == 0.0
+    assert buckets.take("a", 10) == pytest.approx(0.5)
+    # Other keys have their own bucket
+    assert buckets.take("b", 20) == 0.0
+    clock.now = 0.5
+    assert buckets.take("a", 10) == 0.0
+    assert buckets.take("a", 1) == pytest.approx(0.1)
+    assert buckets.rejected == 2
+    clock.now = 100
+    assert buckets.take("a", 20) == 0.0
+
+
+def test_cost_above_burst_runs_on_a_full_bucket():
+    clock = Clock()
+    buckets = admission.TokenBuckets(rate=1, burst=5, clock=clock)
+    assert buckets.take(None, 50) == 0.0
+    assert buckets.take(None, 50) == pytest.approx(5.0)
+
+
+def test_least_recently_used_keys_are_dropped():
+    buckets = admission.TokenBuckets(rate=1, burst=5, max_keys=2, clock=Clock())
+    buckets.take("a", 5)
+    buckets.take("b", 5)
+    buckets.take("a", 0)
+    buckets.take("c", 5)
+    assert list(buckets._buckets) == ["a", "c"]
+    # "b" starts again with a full bucket
+    assert buckets.take("b", 5) == 0.0
+
+
+def test_retry_after_is_whole_seconds():
+    assert [admission.retry_after(w) for w in (0.01, 1.0, 1.2, 30)] == ["1", "1", "2", "30"]
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    buckets = admission.TokenBuckets(rate=1, burst=10, clock=Clock())
+    monkeypatch.setattr(handler, "ADMISSION", buckets)
+    return buckets
+
+
+def _event(body, key="k1", tenant=None):
+    context = {"http": {"method": "POST", "path": "/v1/list/head"}}
+    if tenant is not None:
+        context["authorizer"] = {"lambda": {"key_id": tenant}}
+    return {"requestContext": context, "headers": {"x-api-key": key}, "body": json.dumps(body)}
+
+
+def test_handler_throttles_before_parsing(buckets, monkeypatch):
+    big = {"list": ["a"] * 1000, "n": 1}
+    assert handler.lambda_handler(_event(big), None)["statusCode"] == 200
+
+    def parse(*args):
+        raise AssertionError("parsed a throttled request")
+
+    validated = handler._validated
+    monkeypatch.setattr(handler, "_validated", parse)
+    r = handler.lambda_handler(_event(big), None)
+    assert r["statusCode"] == 429
+    assert r["headers"]["Retry-After"] == "5"
+    assert json.loads(r["body"]) == {"message": "Too Many Requests"}
+    # The container server charges the buckets itself
+    monkeypatch.setattr(handler, "_validated", validated)
+    assert handler.stream_handler(_event(big), False)["statusCode"] == 200
+    # An unverified key is not a tenant: a new one does not get a fresh bucket
+    assert handler.lambda_handler(_event(big, "k2"), None)["statusCode"] == 429
+    # A verified tenant has its own
+    assert handler.lambda_handler(_event(big, "k2", tenant="t2"), None)["statusCode"] == 200
+    assert list(buckets._buckets) == [None, "t2"]
+
+
+def test_unrouted_requests_are_not_charged(buckets):
+    event = _event({"list": ["a"] * 1000, "n": 1})
+    event["requestContext"]["http"]["method"] = "GET"
+    assert handler.lambda_handler(event, None)["statusCode"] == 405
+    assert handler.lambda_handler(_event({"list": ["a"] * 1000, "n": 1}), None)["statusCode"] == 200
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return int(lines[0].split(" ")[1]), headers, body
+
+
+def _head(length, key="k1", extra=""):
+    return f"POST /v1/list/head HTTP/1.1\r\nX-Api-Key: {key}\r\nContent-Length: {length}\r\n{extra}\r\n".encode()
+
+
+def test_server_throttles_without_parsing(buckets, monkeypatch):
+    monkeypatch.setattr(handler, "_api_keys", auth.KeyVerifier([auth.hash_key("k1"), auth.hash_key("k2")]))
+    body = json.dumps({"list": ["a"] * 10, "n": 1}).encode()
+    big = json.dumps({"list": ["a"] * 20000, "n": 1}).encode()
+
+    async def run():
+        srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(_head(len(body)) + body)
+            first = await _read_response(reader)
+            respond = server.respond
+            monkeypatch.setattr(server, "respond", None)
+            writer.write(_head(len(big)) + big)
+            throttled = await _read_response(reader)
+            # The body was read and dropped: the connection carries on
+            monkeypatch.setattr(server, "respond", respond)
+            writer.write(_head(len(body), "k2") + body)
+            other = await _read_response(reader)
+            # Nothing is read of a body the client holds back for 100 Continue
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(_head(len(big), extra="Expect: 100-continue\r\n"))
+            held = await _read_response(reader)
+            writer.close()
+            return first, throttled, other, held
+
+    first, (status, headers, data), other, held = asyncio.run(run())
+    assert first[0] == other[0] == 200
+    assert status == 429
+    # Charged the whole burst, less what the first request left
+    assert headers["retry-after"] == "2"
+    assert headers["connection"] == "keep-alive"
+    assert json.loads(data) == {"message": "Too Many Requests"}
+    assert held[0] == 429
+    assert held[1]["connection"] == "close"
+
+
+def test_server_unverified_keys_share_one_bucket(buckets, monkeypatch):
+    monkeypatch.setattr(handler, "_api_keys", None)
+    big = json.dumps({"list": ["a"] * 5000, "n": 1}).encode()
+
+    async def run():
+        srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            statuses = []
+            for key in ("random-1", "random-2", "random-3"):
+                writer.write(_head(len(big), key) + big)
+                statuses.append((await _read_response(reader))[0])
+            writer.close()
+            return statuses
+
+    assert asyncio.run(run()) == [200, 429, 429]
+    assert list(buckets._buckets) == [None]
+
+
+def test_server_budget_queues_then_sheds():
+    body = json.dumps({"list": ["a"] * 10, "n": 1}).encode()
+    cost = admission.estimate(len(body))
+
+    async def run():
+        budget = server.CostBudget(limit=cost * 1.5, timeout=0.2)
+        srv = await asyncio.start_server(lambda r, w: server._serve_connection(r, w, budget=budget), "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            # The first request holds its cost while its body is outstanding
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            w1.write(_head(len(body)))
+            await asyncio.sleep(0.05)
+            assert budget.in_flight == cost
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            w2.write(_head(len(body)) + body)
+            shed = await _read_response(r2)
+
+            # A queued request gets in once the first one is answered
+            w2.write(_head(len(body)) + body)
+            await asyncio.sleep(0.05)
+            w1.write(body)
+            first = await _read_response(r1)
+            queued = await _read_response(r2)
+            for w in (w1, w2):
+                w.close()
+            await asyncio.sleep(0.01)
+            return shed, first, queued, budget
+
+    (status, headers, data), first, queued, budget = asyncio.run(run())
+    assert status == 503
+    assert headers["retry-after"] == "1"
+    assert headers["connection"] == "keep-alive"
+    assert json.loads(data)["code"] == "OVERLOADED"
+    assert first[0] == queued[0] == 200
+    assert budget.shed == 1
+    assert budget.in_flight == 0
+
+
+def test_shed_requests_are_not_charged(buckets):
+    body = json.dumps({"list": ["a"] * 10, "n": 1}).encode()
+    cost = admission.estimate(len(body))
+
+    async def run():
+        budget = server.CostBudget(limit=cost, timeout=0)
+        srv = await asyncio.start_server(lambda r, w: server._serve_connection(r, w, budget=budget), "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            # The first request holds the whole budget while its body is outstanding
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            w1.write(_head(len(body)))
+            await asyncio.sleep(0.05)
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            shed = []
+            for _ in range(3):
+                w2.write(_head(len(body)) + body)
+                shed.append((await _read_response(r2))[0])
+            w1.write(body)
+            await _read_response(r1)
+            for w in (w1, w2):
+                w.close()
+            await asyncio.sleep(0.01)
+            return shed, budget
+
+    shed, budget = asyncio.run(run())
+    assert shed == [503, 503, 503]
+    # Only the admitted request was charged
+    assert buckets._buckets[None][0] == pytest.approx(buckets.burst - cost)
+    assert budget.in_flight == 0
+
+
+def test_cheap_requests_pass_a_queued_expensive_one():
+    async def run():
+        budget = server.CostBudget(limit=10, timeout=1)
+        assert await budget.acquire(8)
+        expensive = asyncio.ensure_future(budget.acquire(5))
+        await asyncio.sleep(0)
+        assert await budget.acquire(2)
+        assert not expensive.done()
+        budget.release(8)
+        budget.release(2)
+        assert await expensive
+        return budget.in_flight
+
+    assert asyncio.run(run()) == 5
+
+
+def test_budget_always_admits_a_request_alone():
+    async def run():
+        budget = server.CostBudget(limit=1, timeout=0)
+        assert await budget.acquire(100)
+        admitted = await budget.acquire(0.5)
+        budget.release(100)
+        return admitted, budget.in_flight
+
+    assert asyncio.run(run()) == (False, 0)
+
+
+def test_chunked_bodies_cost_the_most():
+    assert server._cost({"transfer-encoding": "chunked"}) == admission.estimate(handler.MAX_BODY_SIZE)
+    assert server._cost({"content-length": "4096"}) == 2.0
+    assert server._cost({"content-length": "junk"}) == 1.0
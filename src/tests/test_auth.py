@@ -0,0 +1,143 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import src.handler as handler
+from src import auth
+
+KEYS = ["key-one", "key-two"]
+HASHES = [auth.hash_key(key) for key in KEYS]
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _event(path="/v1/list/head", key=None, method="POST"):
+    headers = {"content-type": "application/json"}
+    if key is not None:
+        headers["x-api-key"] = key
+    return {
+        "version": "2.0",
+        "requestContext": {"http": {"method": method, "path": path}},
+        "headers": headers,
+        "body": json.dumps({"list": ["a", "b", "c"], "n": 2}),
+    }
+
+
+class Gateway:
+    """Local stand-in for the HTTP API in front of the function.
+
+    "authorizer": the REQUEST authorizer runs first, with its decision cached
+    per x-api-key for ttl seconds, as the http_api module configures it.
+    "handler": requests go straight to lambda_handler, which checks the key.
+    """
+
+    def __init__(self, mode, ttl=300, clock=lambda: 0.0):
+        self.mode = mode
+        self.ttl = ttl
+        self.clock = clock
+        self.cache = {}
+        self.authorizer_calls = 0
+
+    def __call__(self, event):
+        if self.mode == "authorizer":
+            key = event["headers"].get("x-api-key")
+            if not key:
+                # A missing identity source is rejected without calling the authorizer
+                return {"statusCode": 401, "body": json.dumps({"message": "Unauthorized"})}
+            decision, expires = self.cache.get(key, (None, 0.0))
+            if decision is None or self.clock() >= expires:
+                self.authorizer_calls += 1
+                decision = auth.lambda_handler(event, None)
+                if self.ttl:
+                    self.cache[key] = (decision, self.clock() + self.ttl)
+            if not decision["isAuthorized"]:
+                return {"statusCode": 403, "body": json.dumps({"message": "Forbidden"})}
+        return handler.lambda_handler(event, None)
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    verifier = auth.KeyVerifier(HASHES)
+    monkeypatch.setattr(auth, "VERIFIER", verifier)
+    return verifier
+
+
+@pytest.fixture(params=["authorizer", "handler"])
+def gateway(request, verifier, monkeypatch):
+    if request.param == "handler":
+        monkeypatch.setattr(handler, "_api_keys", verifier)
+    return Gateway(request.param)
+
+
+def test_verifier_accepts_every_configured_key(verifier):
+    ids = [verifier(key) for key in KEYS]
+    assert ids == [digest[:auth.KEY_ID_LENGTH] for digest in HASHES]
+    assert verifier("key-three") is None
+    assert verifier("") is None
+    assert verifier("key-one ") is None
+
+
+def test_verifier_parses_env_entries():
+    verifier = auth.KeyVerifier([f" {HASHES[0].upper()} ", "", HASHES[1]])
+    assert len(verifier) == 2
+    assert verifier("key-two") is not None
+    with pytest.raises(ValueError, match="hex SHA-256"):
+        auth.KeyVerifier(["abc"])
+    with pytest.raises(ValueError, match="hex SHA-256"):
+        auth.KeyVerifier(["z" * 64])
+
+
+def test_empty_verifier_rejects_everything():
+    assert auth.KeyVerifier([])("key-one") is None
+
+
+def test_authorizer_responses(verifier):
+    assert auth.lambda_handler(_event(key="key-two"), None) == {
+        "isAuthorized": True, "context": {"auth": "apikey", "key_id": HASHES[1][:auth.KEY_ID_LENGTH]}}
+    assert auth.lambda_handler(_event(key="nope"), None) == {"isAuthorized": False}
+    assert auth.lambda_handler(_event(), None) == {"isAuthorized": False}
+    assert auth.lambda_handler({}, None) == {"isAuthorized": False}
+
+
+def test_both_modes_answer_the_same(gateway):
+    r = gateway(_event(key="key-one"))
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"])["result"] == ["a", "b"]
+
+    r = gateway(_event())
+    assert (r["statusCode"], json.loads(r["body"])) == (401, {"message": "Unauthorized"})
+    r = gateway(_event(key="wrong"))
+    assert (r["statusCode"], json.loads(r["body"])) == (403, {"message": "Forbidden"})
+
+
+def test_handler_mode_checks_the_key_before_routing(verifier, monkeypatch):
+    monkeypatch.setattr(handler, "_api_keys", verifier)
+    assert handler.lambda_handler(_event("/v1/list/middle"), None)["statusCode"] == 401
+    assert handler.lambda_handler(_event("/v1/list/head", key="x", method="GET"), None)["statusCode"] == 403
+    assert handler.lambda_handler(_event("/v1/list/head", key="key-two", method="GET"), None)["statusCode"] == 405
+
+
+def test_gateway_mode_does_not_check_keys():
+    assert handler._api_keys is None
+    assert handler.lambda_handler(_event(), None)["statusCode"] == 200
+
+
+def test_authorizer_decisions_are_cached_per_key(verifier):
+    now = [0.0]
+    gateway = Gateway("authorizer", ttl=300, clock=lambda: now[0])
+    for _ in range(5):
+        assert gateway(_event(key="key-one"))["statusCode"] == 200
+        assert gateway(_event(key="wrong"))["statusCode"] == 403
+    assert gateway.authorizer_calls == 2
+
+    now[0] = 301.0
+    gateway(_event(key="key-one"))
+    assert gateway.authorizer_calls == 3
+
+
+def test_hash_cli():
+    out = subprocess.run([sys.executable, "-m", "src.auth", "key-one"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == HASHES[0]
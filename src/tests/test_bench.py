@@ -0,0 +1,45 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import src.handler as handler
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import bench  # noqa: E402
+
+
+@pytest.mark.parametrize("case", bench.cases(), ids=lambda case: case.name)
+def test_case_status(case):
+    assert handler.lambda_handler(case.event, None)["statusCode"] == case.status
+
+
+def test_baseline_covers_every_case():
+    baseline = json.loads(bench.BASELINE.read_text())
+    assert set(baseline["cases"]) == {case.name for case in bench.cases()}
+
+
+def _results(**calibrated):
+    return {"cases": {name: {"calibrated": value} for name, value in calibrated.items()}}
+
+
+def test_compare_flags_throughput_loss_beyond_threshold():
+    baseline = _results(a=1.0, b=1.0, c=1.0)
+    # Throughput 80%, 75% and 50% of the baseline
+    current = _results(a=1.25, b=1 / 0.75 - 1e-9, c=2.0)
+    assert bench.compare(current, baseline, 0.25) == ["c: 50% of baseline throughput"]
+
+
+def test_compare_ignores_cases_without_baseline():
+    assert bench.compare(_results(new=10.0), _results(), 0.25) == []
+
+
+def test_compare_keeps_a_faster_retry(monkeypatch):
+    monkeypatch.setattr(bench, "cases", lambda: [bench.Case("a", 200, {})])
+    monkeypatch.setattr(bench, "measure", lambda case, repeat: {"calibrated": 1.1})
+    current = _results(a=3.0)
+    assert bench.compare(current, _results(a=1.0), 0.25, retries=2) == []
+    assert current["cases"]["a"]["calibrated"] == 1.1
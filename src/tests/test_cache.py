@@ -0,0 +1,136 @@
+import gc
+import json
+import tracemalloc
+from unittest.mock import patch
+import src.handler as handler
+from src.cache import ListCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_and_miss():
+    cache = ListCache(max_entries=4, max_bytes=1 << 20, ttl=60)
+    assert cache.get("body") is None
+    cache.put("body", (["a"], 1))
+    assert cache.get("body") == (["a"], 1)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_entries():
+    cache = ListCache(max_entries=2, max_bytes=1 << 20, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    cache = ListCache(max_entries=100, max_bytes=1000, ttl=60)
+    cache.put("x" * 300, 1)
+    cache.put("y" * 300, 2)
+    assert cache.stats()["entries"] == 1
+    assert cache.get("y" * 300) == 2
+    assert cache.stats()["bytes"] <= 1000
+
+    cache.put("z" * 600, 3)  # larger than the whole budget: not stored
+    assert cache.get("z" * 600) is None
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ListCache(max_entries=4, max_bytes=1 << 20, ttl=10, clock=clock)
+    cache.put("body", 1)
+    clock.now = 9.9
+    assert cache.get("body") == 1
+    clock.now = 10.0
+    assert cache.get("body") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_hash_collision_is_a_miss():
+    cache = ListCache(max_entries=4, max_bytes=1 << 20, ttl=60)
+    cache.put("body", 1)
+    with patch("src.cache.hash", create=True, side_effect=lambda s: 42):
+        cache.put("one", 1)
+        assert cache.get("two") is None
+        assert cache.get("one") == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ListCache(max_entries=0, max_bytes=1 << 20, ttl=60)
+    cache.put("body", 1)
+    assert cache.get("body") is None
+
+
+def _event(path, body):
+    return {"requestContext": {"http": {"path": path, "method": "POST"}}, "body": json.dumps(body)}
+
+
+def test_handler_skips_validation_on_hit():
+    e = _event("/v1/list/head", {"list": ["a", "b", "c"], "n": 2})
+    with patch("src.handler._validate", wraps=handler._validate) as validate:
+        r1 = handler.lambda_handler(e, None)
+        r2 = handler.lambda_handler(dict(e), None)
+        # head and tail of the same body share the cached list
+        r3 = handler.lambda_handler(_event("/v1/list/tail", {"list": ["a", "b", "c"], "n": 2}), None)
+    assert validate.call_count == 1
+    assert r1 == r2
+    assert json.loads(r3["body"])["result"] == ["b", "c"]
+
+
+def test_handler_caches_validation_errors():
+    e = _event("/v1/list/head", {"list": ["ok", 1]})
+    with patch("src.handler._validate", wraps=handler._validate) as validate:
+        r1 = handler.lambda_handler(e, None)
+        r2 = handler.lambda_handler(e, None)
+    assert validate.call_count == 1
+    assert r1["statusCode"] == r2["statusCode"] == 400
+    assert r1["body"] == r2["body"]
+
+
+def test_structured_log_line_has_cache_counters(caplog):
+    e = _event("/v1/list/head", {"list": ["a"]})
+    before = handler.LIST_CACHE.stats()
+    with caplog.at_level("INFO", logger="src.handler"):
+        handler.lambda_handler(e, None)
+        handler.lambda_handler(e, None)
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["path"] == "/v1/list/head"
+    assert line["status"] == 200
+    assert line["cache"]["hits"] == before["hits"] + 1
+    assert line["cache"]["misses"] == before["misses"] + 1
+
+
+def test_entry_cost_covers_retained_memory(monkeypatch):
+    # Many short strings: the decoded list outweighs the body several times over
+    cache = ListCache(max_entries=16, max_bytes=1 << 30, ttl=60)
+    monkeypatch.setattr(handler, "LIST_CACHE", cache)
+    handler.lambda_handler(_event("/v1/list/head", {"list": ["warm"]}), None)
+    cache.clear()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(4):
+            body = {"list": [f"{i}-{j}" for j in range(10000)], "n": 1}
+            assert handler.lambda_handler(_event("/v1/list/head", body), None)["statusCode"] == 200
+        del body
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert cache.stats()["entries"] == 4
+    assert retained <= cache.stats()["bytes"] < 2 * retained
@@ -0,0 +1,104 @@
+import gzip
+import json
+import zlib
+
+import pytest
+import src.handler as handler
+from src import chunked, compress, formats
+
+TRICKY = ["a", 'x",', "next", "b\\", '","', "é", "line\nbreak", "", "a,b"]
+ITEMS = [f"item-{i}" for i in range(2500)]
+
+
+def _event(path, body, accept=None, accept_encoding=None):
+    headers = {}
+    if accept:
+        headers["accept"] = accept
+    if accept_encoding:
+        headers["accept-encoding"] = accept_encoding
+    return {"requestContext": {"http": {"path": path, "method": "POST"}}, "headers": headers,
+            "body": json.dumps(body)}
+
+
+def _lines(data):
+    return [json.loads(line) for line in data.splitlines()]
+
+
+@pytest.mark.parametrize("result", [[], ["a"], TRICKY, ITEMS])
+@pytest.mark.parametrize("chunk_items", [1, 2, 1000])
+def test_chunks_decode_to_the_result(result, chunk_items):
+    assert _lines(b"".join(chunked.ndjson(result, chunk_items))) == result
+    assert json.loads(b"".join(chunked.json_result(result, chunk_items))) == {"result": result}
+    page = b"".join(chunked.json_result(result, chunk_items, "MTA", paged=True))
+    assert json.loads(page) == {"result": result, "next_cursor": "MTA"}
+    assert json.loads(b"".join(chunked.json_result(result, chunk_items, None, paged=True)))["next_cursor"] is None
+
+
+@pytest.mark.parametrize("chunk_items", [1, 1000])
+def test_streamed_json_is_the_buffered_body(chunk_items):
+    streamed = b"".join(chunked.json_result(ITEMS, chunk_items)).decode()
+    assert streamed == handler._resp_result(ITEMS)["body"]
+    page = b"".join(chunked.json_result(ITEMS, chunk_items, "MTA", paged=True)).decode()
+    assert page == handler._resp_page(ITEMS, "MTA")["body"]
+
+
+def test_chunk_count():
+    assert len(list(chunked.ndjson(ITEMS, 1000))) == 3
+    # Three slices and the closing bracket
+    assert len(list(chunked.json_result(ITEMS, 1000))) == 4
+
+
+def test_lambda_ndjson_response_is_one_text_body():
+    r = handler.lambda_handler(_event("/v1/list/head", {"list": TRICKY, "n": 5}, accept=formats.NDJSON), None)
+    assert r["statusCode"] == 200
+    assert r["headers"]["Content-Type"] == formats.NDJSON
+    assert "isBase64Encoded" not in r
+    assert _lines(r["body"].encode()) == TRICKY[:5]
+
+
+def test_ndjson_page_cursor_is_a_header():
+    body = {"list": ["a", "b", "c"], "n": 2}
+    r = handler.lambda_handler(_event("/v1/list/page", body, accept="application/jsonl"), None)
+    assert _lines(r["body"].encode()) == ["a", "b"]
+    assert r["headers"]["X-Next-Cursor"]
+
+
+def test_json_stays_preferred_on_ties():
+    assert formats.from_accept(f"application/json, {formats.NDJSON}") is None
+    assert formats.from_accept(f"application/json;q=0.5, {formats.NDJSON}").media_type == formats.NDJSON
+
+
+def test_stream_handler_chunks_large_results_only():
+    r = handler.stream_handler(_event("/v1/list/tail", {"list": ITEMS, "n": 2000}))
+    assert "body" not in r
+    assert json.loads(b"".join(r["chunks"])) == {"result": ITEMS[-2000:]}
+
+    r = handler.stream_handler(_event("/v1/list/tail", {"list": ITEMS, "n": handler.STREAM_MIN_ITEMS - 1}))
+    assert json.loads(r["body"])["result"] == ITEMS[-handler.STREAM_MIN_ITEMS + 1:]
+
+    # NDJSON is chunked whatever its size
+    r = handler.stream_handler(_event("/v1/list/head", {"list": ITEMS, "n": 3}, accept=formats.NDJSON))
+    assert _lines(b"".join(r["chunks"])) == ITEMS[:3]
+
+
+def test_streamed_page_envelope():
+    r = handler.stream_handler(_event("/v1/list/page", {"list": ITEMS, "n": 2000}))
+    page = json.loads(b"".join(r["chunks"]))
+    assert page["result"] == ITEMS[:2000]
+    assert page["next_cursor"]
+
+
+def test_stream_handler_compresses_with_zlib_encodings():
+    r = handler.stream_handler(_event("/v1/list/head", {"list": ITEMS, "n": 2500}, accept_encoding="br, gzip"))
+    assert r["headers"]["Content-Encoding"] == "gzip"
+    chunks = list(r["chunks"])
+    assert json.loads(gzip.decompress(b"".join(chunks)))["result"] == ITEMS
+
+    # Every chunk decodes on arrival, before the stream ends
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert d.decompress(chunks[0]).startswith(b'{"result": ["item-0"')
+
+
+def test_compress_chunks_deflate():
+    data = b"".join(compress.compress_chunks("deflate", [b"abc" * 100, b"def" * 100]))
+    assert zlib.decompress(data) == b"abc" * 100 + b"def" * 100
@@ -0,0 +1,80 @@
+import json
+import sys
+import pytest
+import src.handler as handler
+from src import codec
+
+
+def _available():
+    names = []
+    for name in ("orjson", "ujson", "json"):
+        if codec.load(name).name == name:
+            names.append(name)
+    return names
+
+
+def test_load_stdlib():
+    c = codec.load("json")
+    assert c.name == "json"
+    assert c.loads('{"list": ["a"]}') == {"list": ["a"]}
+
+
+def test_load_falls_back_when_library_missing(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "ujson", None)
+    assert codec.load("orjson").name == "json"
+    assert codec.load("ujson").name == "json"
+    assert codec.load("auto").name == "json"
+
+
+def test_default_is_stdlib():
+    assert codec.load("").name == "json"
+
+
+@pytest.mark.parametrize("name", _available())
+def test_unencodable_value_raises_encode_error(name):
+    c = codec.load(name)
+    if c.lenient:
+        assert c.loads(c.dumps(["\ud800"])) == ["\ud800"]
+        return
+    for dump in (c.dumps, c.dumpb):
+        with pytest.raises(codec.EncodeError):
+            dump(["\ud800"])
+
+
+def test_load_unknown_name():
+    assert codec.load("simdjson").name == "json"
+
+
+@pytest.mark.parametrize("name", _available())
+def test_round_trip(name):
+    c = codec.load(name)
+    payload = {"list": ["a", "é", "x/y", 'q"q'], "n": 2}
+    assert c.loads(c.dumps(payload)) == payload
+    assert c.loads(c.dumpb(payload)) == payload
+    assert isinstance(c.dumps(payload), str)
+    assert isinstance(c.dumpb(payload), bytes)
+    assert json.loads(c.dumps(payload)) == payload
+
+
+@pytest.mark.parametrize("name", _available())
+def test_malformed_input_raises_value_error(name):
+    with pytest.raises(ValueError):
+        codec.load(name).loads("not valid json {{{")
+
+
+@pytest.mark.parametrize("name", _available())
+def test_handler_with_each_codec(name, monkeypatch):
+    monkeypatch.setattr(codec, "CODEC", codec.load(name))
+    e = {
+        "requestContext": {"http": {"path": "/v1/list/tail", "method": "POST"}},
+        "body": json.dumps({"list": ["a", "b", "c"], "n": 2}),
+    }
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"]) == {"result": ["b", "c"]}
+
+    e["body"] = "not valid json {{{"
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"])["error"] == "Body must be valid JSON"
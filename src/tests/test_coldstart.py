@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import build_zip  # noqa: E402
+import coldstart  # noqa: E402
+
+
+def test_optional_libraries_are_not_imported_at_cold_start():
+    code = "import sys, src.handler; print(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = set(out.stdout.split())
+    assert "src.handler" in loaded
+    assert loaded.isdisjoint(coldstart.LAZY_MODULES)
+
+
+def test_build_excludes_tests_and_server():
+    names = {p.relative_to(ROOT).as_posix() for p in build_zip.lambda_sources()}
+    assert "src/handler.py" in names
+    assert not any(name.startswith("src/tests/") for name in names)
+    assert "src/server.py" not in names
@@ -0,0 +1,162 @@
+import base64
+import gzip
+import json
+import tracemalloc
+import zlib
+
+import pytest
+import src.handler as handler
+from src import compress
+
+
+def _event(path, data, encoding=None, accept=None, b64=True, header_case=str.lower):
+    headers = {}
+    if encoding:
+        headers[header_case("Content-Encoding")] = encoding
+    if accept:
+        headers[header_case("Accept-Encoding")] = accept
+    return {
+        "requestContext": {"http": {"path": path, "method": "POST"}},
+        "headers": headers,
+        "body": base64.b64encode(data).decode() if b64 else data,
+        "isBase64Encoded": b64,
+    }
+
+
+def _result(r):
+    body = r["body"]
+    if r.get("isBase64Encoded"):
+        body = compress.decompress(r["headers"]["Content-Encoding"], base64.b64decode(body), 1 << 30).decode()
+    return json.loads(body)
+
+
+ITEMS = [f"item-{i:05d}" for i in range(2000)]
+BODY = json.dumps({"list": ITEMS, "n": 3}).encode()
+
+
+@pytest.mark.parametrize("encoding, data", [
+    ("gzip", gzip.compress(BODY)),
+    ("deflate", zlib.compress(BODY)),
+    ("identity", BODY),
+    (None, BODY),
+])
+def test_encoded_request(encoding, data):
+    r = handler.lambda_handler(_event("/v1/list/tail", data, encoding), None)
+    assert r["statusCode"] == 200
+    assert _result(r)["result"] == ITEMS[-3:]
+
+
+def test_rest_style_header_names():
+    event = _event("/v1/list/head", gzip.compress(BODY), "gzip", header_case=str.title)
+    # REST API (payload 1.0) keeps the client's header names
+    event["httpMethod"], event["path"] = "POST", "/v1/list/head"
+    del event["requestContext"]
+    r = handler.lambda_handler(event, None)
+    assert r["statusCode"] == 200
+    assert _result(r)["result"] == ITEMS[:3]
+
+
+def test_concatenated_gzip_members():
+    half = len(BODY) // 2
+    data = gzip.compress(BODY[:half]) + gzip.compress(BODY[half:])
+    r = handler.lambda_handler(_event("/v1/list/head", data, "gzip"), None)
+    assert r["statusCode"] == 200
+
+
+def test_decompressed_size_is_bounded():
+    """A zip bomb is rejected once its output passes MAX_BODY_SIZE"""
+    bomb = gzip.compress(b"[" + b" " * (50 * handler.MAX_BODY_SIZE) + b"]")
+    assert len(bomb) < handler.MAX_BODY_SIZE // 10
+    r = handler.lambda_handler(_event("/v1/list/head", bomb, "gzip"), None)
+    assert r["statusCode"] == 400
+    assert "too large" in json.loads(r["body"])["error"]
+
+
+def test_brotli_output_is_bounded_while_decoding():
+    """One brotli metablock can inflate a few bytes to 16 MiB: never decoded past the limit"""
+    brotli = pytest.importorskip("brotli")
+    c = brotli.Compressor(quality=5)
+    block = b" " * (1 << 20)
+    bomb = c.process(b"[") + b"".join(c.process(block) for _ in range(200)) + c.process(b"]") + c.finish()
+    assert len(bomb) < 1024
+
+    tracemalloc.start()
+    try:
+        with pytest.raises(compress.TooLarge):
+            compress.decompress("br", bomb, handler.MAX_BODY_SIZE)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 4 * handler.MAX_BODY_SIZE
+    r = handler.lambda_handler(_event("/v1/list/head", bomb, "br"), None)
+    assert r["statusCode"] == 400
+    assert "too large" in json.loads(r["body"])["error"]
+
+
+def test_decoded_identity_body_is_bounded():
+    data = b" " * (handler.MAX_BODY_SIZE + 1)
+    r = handler.lambda_handler(_event("/v1/list/head", data), None)
+    assert r["statusCode"] == 400
+    assert "too large" in json.loads(r["body"])["error"]
+
+
+@pytest.mark.parametrize("event, message", [
+    (_event("/v1/list/head", gzip.compress(BODY)[:-10], "gzip"), "not valid gzip"),
+    (_event("/v1/list/head", b"not gzip", "gzip"), "not valid gzip"),
+    (_event("/v1/list/head", b"") | {"body": "%%%"}, "not valid base64"),
+    (_event("/v1/list/head", BODY.decode(), "gzip", b64=False), "must be base64-encoded"),
+    (_event("/v1/list/head", b"\xff\xfe"), "valid UTF-8"),
+])
+def test_invalid_bodies(event, message):
+    r = handler.lambda_handler(event, None)
+    assert r["statusCode"] == 400
+    assert message in json.loads(r["body"])["error"]
+
+
+def test_unsupported_encoding():
+    r = handler.lambda_handler(_event("/v1/list/head", BODY, "lzma"), None)
+    assert r["statusCode"] == 415
+    assert json.loads(r["body"])["code"] == "UNSUPPORTED_ENCODING"
+    # The same without base64
+    r = handler.lambda_handler(_event("/v1/list/head", BODY.decode(), "compress", b64=False), None)
+    assert r["statusCode"] == 415
+    assert json.loads(r["body"]) == {"code": "UNSUPPORTED_ENCODING", "error": "Unsupported Content-Encoding 'compress'"}
+
+
+def test_large_response_is_compressed():
+    body = json.dumps({"list": ITEMS, "n": 1000}).encode()
+    r = handler.lambda_handler(_event("/v1/list/head", body, accept="gzip, deflate"), None)
+    assert r["statusCode"] == 200
+    assert r["isBase64Encoded"] is True
+    assert r["headers"]["Content-Encoding"] == "gzip"
+    assert r["headers"]["Vary"] == "Accept-Encoding"
+    assert _result(r)["result"] == ITEMS[:1000]
+
+
+@pytest.mark.parametrize("n, accept", [(3, "gzip"), (1000, None), (1000, "gzip;q=0"), (1000, "compress")])
+def test_response_not_compressed(n, accept):
+    body = json.dumps({"list": ITEMS, "n": n}).encode()
+    r = handler.lambda_handler(_event("/v1/list/head", body, accept=accept), None)
+    assert r["statusCode"] == 200
+    assert "Content-Encoding" not in r["headers"]
+    assert not r.get("isBase64Encoded")
+
+
+def test_compression_disabled(monkeypatch):
+    monkeypatch.setattr(handler, "COMPRESS_ENCODINGS", ())
+    body = json.dumps({"list": ITEMS, "n": 1000}).encode()
+    r = handler.lambda_handler(_event("/v1/list/head", body, accept="gzip"), None)
+    assert "Content-Encoding" not in r["headers"]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+    ("identity", None),
+    ("gzip;q=bad", None),
+    ("", None),
+])
+def test_negotiate(accept, expected):
+    assert compress.negotiate(accept, ["zz", "gzip"]) == expected
@@ -0,0 +1,219 @@
+import json
+import threading
+
+import pytest
+
+import src.handler as handler
+from src import config, events
+
+DEFAULTS = config.Limits(max_list_length=10, max_string_length=5, max_body_size=1000, max_n=10)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingSource(config.ConfigSource):
+    """Returns its document only once released, like a slow SSM call"""
+
+    def __init__(self, document):
+        self.document = document
+        self.release = threading.Event()
+        self.fetched = threading.Event()
+
+    def fetch(self):
+        self.release.wait(5)
+        self.fetched.set()
+        return self.document
+
+
+class FailingSource(config.ConfigSource):
+    def fetch(self):
+        raise ConnectionError("ssm unreachable")
+
+
+def test_incomplete_source_fails_at_construction():
+    class NoFetch(config.ConfigSource):
+        pass
+
+    with pytest.raises(TypeError):
+        NoFetch()
+
+
+def _wait_for_refresh(runtime):
+    for thread in threading.enumerate():
+        if thread.name == "config-refresh":
+            thread.join(5)
+
+
+def test_parse_overrides_and_tenants():
+    table = config.parse({"max_list_length": 20, "tenants": {"big": {"max_n": 500}, "small": {"max_list_length": 2}}},
+                         DEFAULTS)
+    assert table[None] == DEFAULTS._replace(max_list_length=20)
+    # A tenant starts from the top level, not the built-in defaults
+    assert table["big"] == DEFAULTS._replace(max_list_length=20, max_n=500)
+    assert table["small"] == DEFAULTS._replace(max_list_length=2)
+    assert config.parse({}, DEFAULTS) == {None: DEFAULTS}
+
+
+@pytest.mark.parametrize("document, error", [
+    ([], "config must be an object"),
+    ({"max_n": 0}, "config.max_n must be a positive integer"),
+    ({"max_n": "10"}, "config.max_n must be a positive integer"),
+    ({"max_n": True}, "config.max_n must be a positive integer"),
+    ({"tenants": []}, "config.tenants must be an object"),
+    ({"tenants": {"a": {"max_body_size": -1}}}, "config.tenants.a.max_body_size must be a positive integer"),
+])
+def test_parse_errors(document, error):
+    with pytest.raises(ValueError, match=error):
+        config.parse(document, DEFAULTS)
+
+
+def test_without_source_nothing_is_fetched():
+    runtime = config.RuntimeConfig(DEFAULTS)
+    assert runtime.load()
+    assert runtime.limits() == DEFAULTS
+    assert runtime.limits("anyone") == DEFAULTS
+
+
+def test_load_then_refresh_after_ttl_without_blocking():
+    clock = Clock()
+    source = config.StaticSource({"max_n": 20})
+    runtime = config.RuntimeConfig(DEFAULTS, source, ttl=60, clock=clock)
+    assert runtime.load()
+    assert runtime.limits().max_n == 20
+    clock.now = 59
+    runtime.limits()
+    assert source.fetches == 1
+
+    slow = BlockingSource({"max_n": 30})
+    runtime.source = slow
+    clock.now = 61
+    # Expired: the refresh starts, and this request keeps the current limits
+    assert runtime.limits().max_n == 20
+    assert runtime.limits().max_n == 20
+    slow.release.set()
+    assert slow.fetched.wait(5)
+    _wait_for_refresh(runtime)
+    assert runtime.limits().max_n == 30
+    assert runtime.refreshes == 2
+
+
+def test_failed_fetch_keeps_last_good_limits(caplog):
+    clock = Clock()
+    runtime = config.RuntimeConfig(DEFAULTS, config.StaticSource({"max_n": 20}), ttl=300, clock=clock)
+    runtime.load()
+    runtime.source = FailingSource()
+    assert not runtime.load()
+    assert runtime.limits().max_n == 20
+    assert runtime.failures == 1
+    assert "config fetch failed" in caplog.text
+
+    # Retried sooner than a full TTL
+    runtime.source = config.StaticSource({"max_n": 40})
+    clock.now = config.RETRY_AFTER
+    runtime.limits()
+    _wait_for_refresh(runtime)
+    assert runtime.limits().max_n == 40
+
+
+def test_invalid_document_keeps_last_good_limits():
+    runtime = config.RuntimeConfig(DEFAULTS, config.StaticSource({"max_n": -1}))
+    assert not runtime.load()
+    assert runtime.limits() == DEFAULTS
+
+
+def test_open_source_urls(tmp_path):
+    path = tmp_path / "limits.json"
+    path.write_text(json.dumps({"max_n": 7}))
+    source = config.open_source(f"file:{path}")
+    assert isinstance(source, config.FileSource)
+    assert source.fetch() == {"max_n": 7}
+    assert config.open_source("") is None
+    with pytest.raises(ValueError, match="unsupported CONFIG_SOURCE"):
+        config.open_source("consul:limits")
+
+
+def test_aws_sources_make_one_call():
+    class FakeSsm:
+        def __init__(self):
+            self.calls = []
+
+        def get_parameter(self, Name, WithDecryption):
+            self.calls.append((Name, WithDecryption))
+            return {"Parameter": {"Value": '{"max_n": 11}'}}
+
+    class FakeSecrets:
+        def __init__(self):
+            self.calls = []
+
+        def get_secret_value(self, SecretId):
+            self.calls.append(SecretId)
+            return {"SecretString": '{"max_n": 12}'}
+
+    ssm = FakeSsm()
+    assert config.SsmSource("/listservice/dev/limits", client=ssm).fetch() == {"max_n": 11}
+    assert ssm.calls == [("/listservice/dev/limits", True)]
+    secrets = FakeSecrets()
+    assert config.SecretsManagerSource("listservice-dev-limits", client=secrets).fetch() == {"max_n": 12}
+    assert secrets.calls == ["listservice-dev-limits"]
+
+
+def test_tenant_from_events():
+    http = {"requestContext": {"http": {"method": "POST", "path": "/v1/list/head"},
+                               "authorizer": {"lambda": {"auth": "apikey", "key_id": "abc123"}}}}
+    assert events.from_event(http).tenant == "abc123"
+    http["requestContext"]["authorizer"] = {"jwt": {"claims": {}}}
+    assert events.from_event(http).tenant is None
+    rest = {"httpMethod": "POST", "path": "/v1/list/head", "requestContext": {"identity": {"apiKeyId": "k9"}}}
+    assert events.from_event(rest).tenant == "k9"
+    assert events.from_event({"httpMethod": "POST", "path": "/v1/list/head"}).tenant is None
+
+
+@pytest.fixture
+def tenant_config(monkeypatch):
+    runtime = config.RuntimeConfig(handler.DEFAULT_LIMITS, config.StaticSource(
+        {"max_n": 3, "tenants": {"big": {"max_n": 100}, "tiny": {"max_list_length": 2}}}))
+    runtime.load()
+    monkeypatch.setattr(handler, "CONFIG", runtime)
+    return runtime
+
+
+def _event(body, tenant=None):
+    context = {"http": {"method": "POST", "path": "/v1/list/head"}}
+    if tenant is not None:
+        context["authorizer"] = {"lambda": {"key_id": tenant}}
+    return {"requestContext": context, "body": json.dumps(body)}
+
+
+def _call(body, tenant=None):
+    r = handler.lambda_handler(_event(body, tenant), None)
+    return r["statusCode"], json.loads(r["body"])
+
+
+def test_handler_applies_tenant_limits(tenant_config):
+    body = {"list": ["a", "b", "c", "d", "e"], "n": 5}
+    assert _call(body) == (400, {"code": "VALIDATION_ERROR", "error": "'n' must be <= 3"})
+    assert _call(body, "big") == (200, {"result": body["list"]})
+    # The cached outcome is not reused across different limits
+    assert _call(body) == (400, {"code": "VALIDATION_ERROR", "error": "'n' must be <= 3"})
+    assert _call({"list": ["a", "b", "c"], "n": 1}, "tiny")[1]["error"] == "'list' length must be <= 2"
+    # Unknown tenants get the top-level limits
+    assert _call({"list": ["a"], "n": 3}, "someone")[0] == 200
+
+
+def test_handler_mode_tenant_is_the_key_id(tenant_config, monkeypatch):
+    from src import auth
+
+    verifier = auth.KeyVerifier([auth.hash_key("secret")])
+    key_id = verifier("secret")
+    tenant_config._table = config.parse({"tenants": {key_id: {"max_n": 1}}}, handler.DEFAULT_LIMITS)
+    monkeypatch.setattr(handler, "_api_keys", verifier)
+    event = _event({"list": ["a", "b"], "n": 2})
+    event["headers"] = {"x-api-key": "secret"}
+    r = handler.lambda_handler(event, None)
+    assert json.loads(r["body"])["error"] == "'n' must be <= 1"
@@ -0,0 +1,144 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+import src.handler as handler
+from src import events
+
+BODY = json.dumps({"list": ["a", "b", "c"], "n": 2})
+
+
+def _http_api(path, body=BODY, method="POST", headers=None):
+    return {
+        "version": "2.0",
+        "rawPath": path,
+        "requestContext": {"http": {"method": method, "path": path}, "stage": "$default"},
+        "headers": headers or {"content-type": "application/json"},
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+def _rest_api(path, body=BODY, method="POST", headers=None):
+    headers = headers or {"Content-Type": "application/json"}
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "multiValueHeaders": {name: [value] for name, value in headers.items()},
+        "requestContext": {"resourcePath": path, "httpMethod": method, "stage": "dev"},
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+def _alb(path, body=BODY, method="POST", headers=None, multi_value=False):
+    headers = headers or {"Content-Type": "application/json"}
+    event = {
+        "requestContext": {"elb": {"targetGroupArn": "arn:aws:elasticloadbalancing:tg"}},
+        "httpMethod": method,
+        "path": path,
+        "body": body,
+        "isBase64Encoded": False,
+    }
+    if multi_value:
+        event["multiValueHeaders"] = {name: [value] for name, value in headers.items()}
+    else:
+        event["headers"] = headers
+    return event
+
+
+@pytest.mark.parametrize("make, kind", [
+    (_http_api, events.HTTP_API),
+    (_rest_api, events.REST_API),
+    (_alb, events.ALB),
+    (lambda *a, **k: _alb(*a, multi_value=True, **k), events.ALB),
+])
+def test_from_event(make, kind):
+    headers = {"Content-Type": "application/json", "X-Api-Key": "k"}
+    if kind == events.HTTP_API:
+        # HTTP API sends lowercase names
+        headers = {name.lower(): value for name, value in headers.items()}
+    request = events.from_event(make("/V1/List/Head", headers=headers))
+    assert request.kind == kind
+    assert request.method == "POST"
+    assert request.path == "/v1/list/head"
+    assert request.header("content-type") == "application/json"
+    assert request.header("x-api-key") == "k"
+    assert request.header("accept") == ""
+    assert request.body == BODY
+    assert request.is_base64 is False
+
+
+def test_multi_value_headers_are_joined():
+    event = _alb("/v1/list/head", multi_value=True)
+    event["multiValueHeaders"]["Accept-Encoding"] = ["gzip", "br"]
+    request = events.from_event(event)
+    assert request.multi_value
+    assert request.header("accept-encoding") == "gzip,br"
+
+
+def test_empty_event():
+    request = events.from_event({})
+    assert (request.kind, request.method, request.path, request.headers, request.body) == (
+        events.REST_API, "GET", "", {}, None)
+
+
+@pytest.mark.parametrize("make", [_http_api, _rest_api, _alb])
+@pytest.mark.parametrize("path, expected", [("/v1/list/head", ["a", "b"]), ("/v1/list/tail", ["b", "c"])])
+def test_handler_serves_every_event_shape(make, path, expected):
+    r = handler.lambda_handler(make(path), None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"])["result"] == expected
+
+
+@pytest.mark.parametrize("make", [_http_api, _rest_api, _alb])
+def test_errors_for_every_event_shape(make):
+    assert handler.lambda_handler(make("/v1/list/head", method="GET"), None)["statusCode"] == 405
+    assert handler.lambda_handler(make("/v1/list/middle"), None)["statusCode"] == 404
+    r = handler.lambda_handler(make("/v1/list/head", body='{"list": 1}'), None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"])["code"] == "VALIDATION_ERROR"
+
+
+def test_rest_api_compressed_body_with_client_header_case():
+    body = base64.b64encode(gzip.compress(BODY.encode())).decode()
+    event = _rest_api("/v1/list/tail", body=body, headers={"Content-Encoding": "gzip"})
+    event["isBase64Encoded"] = True
+    r = handler.lambda_handler(event, None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"])["result"] == ["b", "c"]
+
+
+def test_api_gateway_responses_are_unchanged():
+    r = handler.lambda_handler(_rest_api("/v1/list/head"), None)
+    assert "statusDescription" not in r
+    assert "multiValueHeaders" not in r
+
+
+def test_alb_response():
+    r = handler.lambda_handler(_alb("/v1/list/head"), None)
+    assert r["statusDescription"] == "200 OK"
+    assert r["isBase64Encoded"] is False
+    assert r["headers"]["Content-Type"] == "application/json"
+
+    r = handler.lambda_handler(_alb("/v1/list/middle"), None)
+    assert r["statusDescription"] == "404 Not Found"
+
+
+def test_alb_multi_value_response():
+    r = handler.lambda_handler(_alb("/v1/list/head", multi_value=True), None)
+    assert "headers" not in r
+    assert r["multiValueHeaders"]["Content-Type"] == ["application/json"]
+    assert json.loads(r["body"])["result"] == ["a", "b"]
+
+
+def test_route_table_matches_last_segment():
+    assert set(handler.ROUTES) == {"head", "tail", "slice", "page", "sample", "batch", "lists"}
+    e = _http_api("/dev/v1/list/head")
+    assert handler.lambda_handler(e, None)["statusCode"] == 200
+    e = _http_api("/v1/list/head/")
+    assert handler.lambda_handler(e, None)["statusCode"] == 404
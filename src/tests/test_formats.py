@@ -0,0 +1,152 @@
+import base64
+import gzip
+import json
+import struct
+
+import pytest
+import src.handler as handler
+from src import formats
+
+BINARY = formats.LENGTH_PREFIXED
+
+
+def pack_request(items, n):
+    encoded = [item.encode() for item in items]
+    lengths = struct.pack(f"<{len(encoded)}I", *map(len, encoded))
+    return struct.pack("<II", n, len(encoded)) + lengths + b"".join(encoded)
+
+
+def unpack_response(data):
+    (count,) = struct.unpack_from("<I", data)
+    lengths = struct.unpack_from(f"<{count}I", data, 4)
+    pos, items = 4 + 4 * count, []
+    for size in lengths:
+        items.append(data[pos:pos + size].decode())
+        pos += size
+    assert pos == len(data)
+    return items
+
+
+def _event(path, data, content_type=None, accept=None):
+    headers = {}
+    if content_type:
+        headers["content-type"] = content_type
+    if accept:
+        headers["accept"] = accept
+    return {
+        "requestContext": {"http": {"path": path, "method": "POST"}},
+        "headers": headers,
+        "body": base64.b64encode(data).decode(),
+        "isBase64Encoded": True,
+    }
+
+
+ITEMS = ["apple", "banana", "cherry", "日本語"]
+
+
+def test_length_prefixed_round_trip():
+    r = handler.lambda_handler(_event("/v1/list/tail", pack_request(ITEMS, 2), BINARY, BINARY), None)
+    assert r["statusCode"] == 200
+    assert r["headers"]["Content-Type"] == BINARY
+    assert r["isBase64Encoded"] is True
+    assert unpack_response(base64.b64decode(r["body"])) == ITEMS[-2:]
+
+
+def test_binary_request_json_response():
+    r = handler.lambda_handler(_event("/v1/list/head", pack_request(ITEMS, 2), BINARY), None)
+    assert r["statusCode"] == 200
+    assert r["headers"]["Content-Type"] == "application/json"
+    assert json.loads(r["body"]) == {"result": ITEMS[:2]}
+
+
+def test_json_request_binary_response():
+    event = {
+        "requestContext": {"http": {"path": "/v1/list/head", "method": "POST"}},
+        "headers": {"accept": BINARY},
+        "body": json.dumps({"list": ITEMS, "n": 3}),
+    }
+    r = handler.lambda_handler(event, None)
+    assert unpack_response(base64.b64decode(r["body"])) == ITEMS[:3]
+
+
+def test_binary_response_is_compressed():
+    items = [f"item-{i}" for i in range(1000)]
+    event = _event("/v1/list/head", pack_request(items, 1000), BINARY, BINARY)
+    event["headers"]["accept-encoding"] = "gzip"
+    r = handler.lambda_handler(event, None)
+    assert r["headers"]["Content-Encoding"] == "gzip"
+    assert unpack_response(gzip.decompress(base64.b64decode(r["body"]))) == items
+
+
+def test_binary_request_uses_validate_limits():
+    items = ["x"] * (handler.MAX_LIST_LENGTH + 1)
+    r = handler.lambda_handler(_event("/v1/list/head", pack_request(items, 1), BINARY), None)
+    assert r["statusCode"] == 400
+    assert "'list' length must be <=" in json.loads(r["body"])["error"]
+
+    r = handler.lambda_handler(_event("/v1/list/head", pack_request(["a" * 1001], 1), BINARY), None)
+    assert r["statusCode"] == 400
+
+    r = handler.lambda_handler(_event("/v1/list/head", pack_request(ITEMS, handler.MAX_N + 1), BINARY), None)
+    assert r["statusCode"] == 400
+
+
+@pytest.mark.parametrize("data", [
+    b"\x00",
+    b"\x01\x00\x00\x00",
+    struct.pack("<II", 1, 1000),
+    pack_request(ITEMS, 1)[:-1],
+    pack_request(ITEMS, 1) + b"x",
+    struct.pack("<III", 1, 1, 2) + b"\xff\xfe",
+    struct.pack("<III", 1, 2, 1) + b"ab",
+])
+def test_malformed_length_prefixed(data):
+    r = handler.lambda_handler(_event("/v1/list/head", data, BINARY), None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"])["error"] == "Body must be a length-prefixed list"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("*/*", None),
+    ("application/json", None),
+    ("text/html", None),
+    (BINARY, BINARY),
+    (f"application/json;q=0.5, {BINARY}", BINARY),
+    (f"application/json, {BINARY}", None),
+    (f"{BINARY};q=0", None),
+    ("application/*, application/json;q=0.1", BINARY),
+])
+def test_from_accept(accept, expected):
+    fmt = formats.from_accept(accept)
+    assert (fmt and fmt.media_type) == expected
+
+
+def test_from_content_type():
+    assert formats.from_content_type(f"{BINARY}; charset=binary").media_type == BINARY
+    assert formats.from_content_type("application/json") is None
+    assert formats.from_content_type("") is None
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.packb({"list": ITEMS, "n": 2})
+    r = handler.lambda_handler(_event("/v1/list/tail", body, "application/x-msgpack", "application/msgpack"), None)
+    assert r["statusCode"] == 200
+    assert r["headers"]["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(base64.b64decode(r["body"])) == {"result": ITEMS[-2:]}
+
+
+def test_msgpack_errors():
+    msgpack = pytest.importorskip("msgpack")
+    for data, message in ((b"\xc1", "valid MessagePack"), (msgpack.packb([1]), "MessagePack map")):
+        r = handler.lambda_handler(_event("/v1/list/head", data, "application/msgpack"), None)
+        assert r["statusCode"] == 400
+        assert message in json.loads(r["body"])["error"]
+
+
+def test_msgpack_unavailable(monkeypatch):
+    monkeypatch.setattr(formats, "FORMATS", {BINARY: formats.available()[BINARY]})
+    r = handler.lambda_handler(_event("/v1/list/head", b"\x80", "application/msgpack"), None)
+    assert r["statusCode"] == 415
+    assert json.loads(r["body"])["code"] == "UNSUPPORTED_MEDIA_TYPE"
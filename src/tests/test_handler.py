@@ -248,3 +248,140 @@ def test_security_headers():
     assert headers.get("Content-Security-Policy") == "default-src 'none'"
     assert headers.get("X-XSS-Protection") == "1; mode=block"
     assert headers.get("Content-Type") == "application/json"
+
+
+def test_validation_error_precedence():
+    """A non-string anywhere is reported before an over-long string"""
+    long_string = "a" * 1001
+    e = _event("/v1/list/head", {"list": [long_string, 1], "n": 1})
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 400
+    body = json.loads(r["body"])
+    assert body["error"] == "'list' must contain only strings"
+
+    e = _event("/v1/list/head", {"list": ["ok", long_string, long_string], "n": 1})
+    r = handler.lambda_handler(e, None)
+    body = json.loads(r["body"])
+    assert r["statusCode"] == 400
+    assert "index 1" in body["error"]
+
+
+def test_response_headers_are_not_shared():
+    """Each response gets its own headers dict built from the template"""
+    r1 = handler.lambda_handler(_event("/v1/list/head", {"list": ["a"]}, method="GET"), None)
+    r1["headers"]["X-Frame-Options"] = "SAMEORIGIN"
+    r2 = handler.lambda_handler(_event("/v1/list/head", {"list": ["a"]}, method="GET"), None)
+    assert r2["headers"]["X-Frame-Options"] == "DENY"
+    assert r1["headers"] is not r2["headers"]
+
+
+def test_batch_jobs():
+    """Batch of independent head/tail jobs"""
+    e = _event("/v1/list/batch", {"jobs": [
+        {"op": "head", "list": ["a", "b", "c"], "n": 2},
+        {"op": "tail", "list": ["x", "y"]},
+        {"op": "tail", "list": [], "n": 3},
+    ]})
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"]) == {"results": [["a", "b"], ["y"], []]}
+
+
+def test_batch_shared_list_queries():
+    """One list answered for many (op, n) queries"""
+    e = _event("/v1/list/batch", {
+        "list": ["a", "b", "c", "d"],
+        "queries": [{"op": "head", "n": 3}, {"op": "tail", "n": 2}, {"op": "head"}],
+    })
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"]) == {"results": [["a", "b", "c"], ["c", "d"], ["a"]]}
+
+
+def test_batch_validation_errors():
+    cases = [
+        ({"jobs": "nope"}, "'jobs' must be an array"),
+        ({"jobs": [1]}, "jobs[0] must be an object"),
+        ({"jobs": [{"op": "middle", "list": ["a"]}]}, "jobs[0]: 'op' must be one of head, tail, slice"),
+        ({"jobs": [{"op": ["head"], "list": ["a"]}]}, "jobs[0]: 'op' must be one of head, tail, slice"),
+        ({"jobs": [{"op": "head", "list": ["a"]}, {"op": "tail", "list": [1]}]},
+         "jobs[1]: 'list' must contain only strings"),
+        ({"jobs": [{"op": "head", "list": ["a"] * 6000}, {"op": "tail", "list": ["a"] * 6000}]},
+         "total 'list' length across jobs must be <= 10000"),
+        ({"jobs": [{"op": "head", "list": ["a"]}] * 1001}, "'jobs' length must be <= 1000"),
+        ({"list": ["a"]}, "'queries' must be an array"),
+        ({"list": "nope", "queries": []}, "'list' must be an array"),
+        ({"list": ["a"], "queries": [{"op": "head", "n": 0}]}, "queries[0]: 'n' must be a positive integer"),
+    ]
+    for payload, message in cases:
+        r = handler.lambda_handler(_event("/v1/list/batch", payload), None)
+        assert r["statusCode"] == 400, payload
+        assert json.loads(r["body"])["error"] == message
+
+
+def test_batch_slice_queries():
+    """slice windows with offset over a shared list"""
+    e = _event("/v1/list/batch", {
+        "list": ["a", "b", "c", "d", "e"],
+        "queries": [
+            {"op": "slice", "offset": 1, "n": 2},
+            {"op": "slice", "offset": 4, "n": 10},
+            {"op": "slice", "offset": 9, "n": 1},
+            {"op": "slice", "n": 1},
+        ],
+    })
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"]) == {"results": [["b", "c"], ["e"], [], ["a"]]}
+
+    e = _event("/v1/list/batch", {"jobs": [{"op": "slice", "list": ["a", "b", "c"], "offset": 2}]})
+    r = handler.lambda_handler(e, None)
+    assert json.loads(r["body"]) == {"results": [["c"]]}
+
+    e = _event("/v1/list/batch", {"list": ["a"], "queries": [{"op": "slice", "offset": -1}]})
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"])["error"] == "queries[0]: 'offset' must be a non-negative integer"
+
+
+def test_batch_shared_spans():
+    """With spans, the covered items are returned once and queries index into them"""
+    arr = [f"item-{i}" for i in range(200)]
+    e = _event("/v1/list/batch", {
+        "list": arr,
+        "spans": True,
+        "queries": [
+            {"op": "head", "n": 10},
+            {"op": "head", "n": 100},
+            {"op": "slice", "offset": 50, "n": 20},
+            {"op": "slice", "offset": 500, "n": 5},
+        ],
+    })
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 200
+    body = json.loads(r["body"])
+    assert body["items"] == arr[:100]
+    assert body["spans"] == [[0, 10], [0, 100], [50, 70], [0, 0]]
+
+    e = _event("/v1/list/batch", {"list": arr, "spans": True, "queries": [{"op": "tail", "n": 3}]})
+    body = json.loads(handler.lambda_handler(e, None)["body"])
+    assert body == {"items": arr[-3:], "spans": [[0, 3]]}
+
+    e = _event("/v1/list/batch", {"list": arr, "spans": "yes", "queries": []})
+    r = handler.lambda_handler(e, None)
+    assert r["statusCode"] == 400
+
+
+def test_batch_spans_skip_uncovered_items():
+    """Disjoint windows only return the items they cover"""
+    arr = [f"item-{i}" for i in range(1000)]
+    e = _event("/v1/list/batch", {
+        "list": arr,
+        "spans": True,
+        "queries": [{"op": "tail", "n": 5}, {"op": "head", "n": 3}, {"op": "slice", "offset": 1, "n": 4}],
+    })
+    body = json.loads(handler.lambda_handler(e, None)["body"])
+    assert body["items"] == arr[:5] + arr[-5:]
+    assert body["spans"] == [[5, 10], [0, 3], [1, 5]]
+    for (start, end), expected in zip(body["spans"], [arr[-5:], arr[:3], arr[1:5]]):
+        assert body["items"][start:end] == expected
@@ -0,0 +1,146 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import src.handler as handler
+from src import listfile, storage
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def items():
+    return [f"item-{i}" for i in range(100)] + ["é", "日本語", "\ud800", ""]
+
+
+def test_round_trip(tmp_path, items):
+    path = str(tmp_path / "l.lst")
+    assert listfile.write(path, items) == len(items)
+    with listfile.ListFile(path) as lf:
+        assert len(lf) == len(items)
+        assert list(lf) == items
+        assert lf[:3] == items[:3]
+        assert lf[-4:] == items[-4:]
+        assert lf[50:60] == items[50:60]
+        assert lf[::7] == items[::7]
+        assert lf[200:] == []
+        assert lf[-2] == "\ud800"
+        with pytest.raises(IndexError):
+            lf[len(items)]
+
+
+def test_empty_list(tmp_path):
+    path = str(tmp_path / "empty.lst")
+    listfile.write(path, [])
+    with listfile.ListFile(path) as lf:
+        assert len(lf) == 0
+        assert lf[:5] == []
+
+
+@pytest.mark.parametrize("data", [b"", b"LSTF", b"JSON" + bytes(20), b"LSTF\x01\x00\x00\x00" + (5).to_bytes(8, "little")])
+def test_rejects_invalid_files(tmp_path, data):
+    path = tmp_path / "bad.lst"
+    path.write_bytes(data)
+    with pytest.raises(listfile.FormatError):
+        listfile.ListFile(str(path))
+
+
+def test_truncated_blob(tmp_path):
+    path = tmp_path / "l.lst"
+    listfile.write(str(path), ["abc", "def"])
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(listfile.FormatError):
+        listfile.ListFile(str(path))
+
+
+def test_items_from_request():
+    assert listfile.items_from_request({"list": ["a"], "n": 1}) == ["a"]
+    with pytest.raises(ValueError, match="'list' must be an array"):
+        listfile.items_from_request({"list": "a"})
+    with pytest.raises(ValueError, match="index 1"):
+        listfile.items_from_request({"list": ["a", 1]})
+
+
+def test_dir_store(tmp_path, items):
+    store = storage.open_store(f"dir:{tmp_path}")
+    list_id = store.put(items)
+    assert (tmp_path / f"{list_id}.lst").exists()
+    assert store.length(list_id) == len(items)
+    assert store.read(list_id, 1, 3) == items[1:3]
+    assert store.open(list_id) is store.open(list_id)
+    for bad in ("missing", "0" * 32, "../" + list_id):
+        with pytest.raises(storage.ListNotFound):
+            store.open(bad)
+
+
+def test_dir_store_drops_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage.ListFileStore, "MAX_OPEN", 2)
+    store = storage.ListFileStore(str(tmp_path))
+    ids = [store.put([str(i)]) for i in range(3)]
+    first = store.open(ids[0])
+    store.open(ids[1])
+    store.open(ids[2])
+    assert ids[0] not in store._open
+    assert store.open(ids[0]) is not first
+    assert store.read(ids[0], 0, 1) == ["0"]
+    # Whoever still holds a dropped file can keep reading it
+    assert first[0] == "0"
+
+
+def test_corrupt_file_path_stays_on_the_server(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(handler, "LIST_STORE", f"dir:{tmp_path}")
+    monkeypatch.setattr(handler, "_store", None)
+    list_id = "0" * 32
+    (tmp_path / f"{list_id}.lst").write_bytes(b"not a list file at all")
+    event = {"requestContext": {"http": {"path": "/v1/list/head", "method": "POST"}},
+             "body": json.dumps({"list_id": list_id})}
+    r = handler.lambda_handler(event, None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"]) == {"code": "VALIDATION_ERROR", "error": "Stored list is corrupt"}
+    assert str(tmp_path) in caplog.text
+
+
+def test_handler_rereads_a_list_dropped_from_the_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(handler, "LIST_STORE", f"dir:{tmp_path}")
+    monkeypatch.setattr(handler, "_store", None)
+
+    def call(path, body, method="POST"):
+        event = {"requestContext": {"http": {"path": path, "method": method}}, "body": json.dumps(body)}
+        return handler.lambda_handler(event, None)
+
+    count = storage.ListFileStore.MAX_OPEN + 8
+    ids = [json.loads(call("/v1/lists", {"list": [f"list-{i}"]}, "PUT")["body"])["list_id"]
+           for i in range(count)]
+    for list_id in ids + ids[:1]:
+        r = call("/v1/list/head", {"list_id": list_id})
+        assert r["statusCode"] == 200, r["body"]
+    assert json.loads(r["body"])["result"] == ["list-0"]
+
+
+def test_handler_serves_converted_list_beyond_max_length(tmp_path, monkeypatch):
+    """A list staged with the converter may exceed MAX_LIST_LENGTH"""
+    items = [f"item-{i}" for i in range(handler.MAX_LIST_LENGTH + 5)]
+    request = tmp_path / "request.json"
+    request.write_text(json.dumps({"list": items}))
+    out = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "convert_list.py"), str(request), "--store", str(tmp_path / "lists")],
+        check=True, capture_output=True, text=True,
+    )
+    list_id = out.stdout.strip()
+
+    monkeypatch.setattr(handler, "LIST_STORE", f"dir:{tmp_path / 'lists'}")
+    monkeypatch.setattr(handler, "_store", None)
+
+    def call(path, body):
+        event = {"requestContext": {"http": {"path": path, "method": "POST"}}, "body": json.dumps(body)}
+        return handler.lambda_handler(event, None)
+
+    r = call("/v1/list/tail", {"list_id": list_id, "n": 2})
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"])["result"] == items[-2:]
+
+    r = call("/v1/list/batch", {"list_id": list_id, "queries": [{"op": "slice", "n": 2, "offset": 10002}]})
+    assert r["statusCode"] == 200
+    assert json.loads(r["body"])["results"] == [items[10002:10004]]
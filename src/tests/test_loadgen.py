@@ -0,0 +1,79 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from src import server
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import loadgen  # noqa: E402
+
+
+def test_weighted():
+    assert loadgen.weighted("head=3,tail") == [("head", 3.0), ("tail", 1.0)]
+    assert loadgen.weighted("10:8, 1000:2", int) == [(10, 8.0), (1000, 2.0)]
+    for spec in ("", "a:-1", "a:0"):
+        with pytest.raises(ValueError):
+            loadgen.weighted(spec)
+
+
+def test_make_requests_follows_the_distributions():
+    requests = loadgen.make_requests([("head", 3), ("tail", 1)], [(10, 1), (100, 1)], 8, 5, 2000, "/dev", seed=7)
+    assert requests == loadgen.make_requests([("head", 3), ("tail", 1)], [(10, 1), (100, 1)], 8, 5, 2000, "/dev", seed=7)
+    heads = sum(r.op == "head" for r in requests)
+    assert 0.7 < heads / len(requests) < 0.8
+    assert {r.path for r in requests} == {"/dev/v1/list/head", "/dev/v1/list/tail"}
+    assert {len(json.loads(r.body)["list"]) for r in requests} == {10, 100}
+    with pytest.raises(ValueError):
+        loadgen.make_requests([("middle", 1)], [(10, 1)], 8, 5, 10, "", seed=1)
+
+
+def test_summarize():
+    samples = [loadgen.Sample("head", 200, i / 1000) for i in range(1, 101)]
+    samples += [loadgen.Sample("tail", 429, 0.001), loadgen.Sample("tail", 0, 0.5)]
+    summary = loadgen.summarize(samples, 2.0)
+    assert summary["all"]["requests"] == 102
+    assert summary["all"]["rps"] == 51.0
+    assert summary["all"]["status"] == {"0": 1, "200": 100, "429": 1}
+    assert summary["head"]["p50_ms"] == 51.0
+    assert summary["head"]["p99_ms"] == 100.0
+    assert summary["head"]["error_rate"] == 0.0
+    assert summary["tail"]["error_rate"] == 1.0
+    assert summary["tail"]["max_ms"] == 500.0
+    assert summary["tail"]["ok_p99_ms"] is None
+    assert summary["all"]["ok_p99_ms"] == 100.0
+
+
+@pytest.mark.parametrize("rate", [None, 200.0])
+def test_run_http_against_the_server(rate):
+    requests = loadgen.make_requests([("head", 1), ("tail", 1)], [(10, 1)], 8, 2, 64, "", seed=1)
+
+    async def scenario():
+        srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return await loadgen.run_http(f"http://127.0.0.1:{port}", requests, 4, 0.3, rate, 5.0, {})
+
+    samples, elapsed = asyncio.run(scenario())
+    assert samples
+    assert {s.status for s in samples} == {200}
+    assert {s.op for s in samples} == {"head", "tail"}
+    if rate:
+        # Open loop: about rate * duration requests, however fast the server is
+        assert len(samples) <= rate * 0.3 + 1
+
+
+def test_connection_errors_are_counted():
+    requests = loadgen.make_requests([("head", 1)], [(10, 1)], 8, 2, 4, "", seed=1)
+    samples, _ = asyncio.run(loadgen.run_http("http://127.0.0.1:9", requests, 1, 0.05, 100.0, 1.0, {}))
+    assert samples and {s.status for s in samples} == {0}
+
+
+def test_inprocess():
+    requests = loadgen.make_requests([("tail", 1)], [(10, 1)], 8, 2, 4, "", seed=1)
+    samples, elapsed = loadgen.run_inprocess(requests, 0.05)
+    assert samples and {s.status for s in samples} == {200}
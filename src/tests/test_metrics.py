@@ -0,0 +1,154 @@
+import base64
+import gzip
+import json
+
+import pytest
+import src.handler as handler
+from src import metrics
+
+
+def _event(path, payload, method="POST", headers=None):
+    return {
+        "requestContext": {"http": {"path": path, "method": method}},
+        "headers": headers or {},
+        "body": json.dumps(payload),
+    }
+
+
+def _records(capsys):
+    out = capsys.readouterr().out
+    return [json.loads(line) for line in out.splitlines() if line.startswith("{")]
+
+
+@pytest.fixture
+def sampled(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_SAMPLE_RATE", 1.0)
+
+
+def test_rate_zero_disables(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_SAMPLE_RATE", 0.0)
+    assert metrics.sample() is None
+
+
+def test_sample_rate(monkeypatch):
+    assert isinstance(metrics.sample(1.0), metrics.Timing)
+    monkeypatch.setattr(metrics, "_random", lambda: 0.3)
+    assert metrics.sample(0.5) is not None
+    assert metrics.sample(0.2) is None
+    assert metrics.sample(0) is None
+
+
+def test_mark_accumulates_phases(monkeypatch):
+    now = iter([10.0, 10.5, 11.0, 12.0])
+    monkeypatch.setattr(metrics.time, "perf_counter", lambda: next(now))
+    timing = metrics.Timing()
+    timing.mark("parse")
+    timing.mark("validate")
+    timing.mark("parse")
+    assert timing.phases == {"parse": 1.5, "validate": 0.5}
+
+
+def test_record_is_embedded_metric_format():
+    timing = metrics.Timing()
+    timing.mark("parse")
+    timing.sizes["BodyBytes"] = 120
+    timing.sizes["ItemCount"] = 3
+    record = metrics.record(timing, "head", 200, path="/v1/list/head")
+
+    directive = record["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == metrics.METRICS_NAMESPACE
+    assert directive["Dimensions"] == [["Stage"], ["Stage", "Route"]]
+    units = {m["Name"]: m["Unit"] for m in directive["Metrics"]}
+    assert units == {"ParseTime": "Milliseconds", "TotalTime": "Milliseconds",
+                     "BodyBytes": "Bytes", "ItemCount": "Count"}
+    # Every declared metric and dimension has a value at the top level
+    for name in [*units, "Stage", "Route"]:
+        assert name in record
+    assert record["Route"] == "head"
+    assert record["status"] == 200
+    assert record["path"] == "/v1/list/head"
+    assert record["TotalTime"] >= record["ParseTime"] >= 0
+
+
+def test_head_request_emits_one_record(sampled, capsys):
+    response = handler.lambda_handler(_event("/v1/list/head", {"list": ["a", "b", "c"], "n": 2}), None)
+    (record,) = _records(capsys)
+    assert record["Route"] == "head"
+    assert record["status"] == 200
+    assert record["ItemCount"] == 3
+    assert record["N"] == 2
+    assert record["BodyBytes"] == len(json.dumps({"list": ["a", "b", "c"], "n": 2}))
+    assert record["ResultBytes"] == len(response["body"])
+    for name in ("SliceTime", "SerializeTime", "TotalTime"):
+        assert record[name] >= 0
+    assert "ParseTime" in record or "CacheTime" in record
+    assert "cache" in record
+
+
+def test_phases_without_cache(sampled, capsys, monkeypatch):
+    monkeypatch.setattr(handler.LIST_CACHE, "max_entries", 0)
+    handler.lambda_handler(_event("/v1/list/tail", {"list": ["x", "y"], "n": 1}), None)
+    (record,) = _records(capsys)
+    names = {m["Name"] for m in record["_aws"]["CloudWatchMetrics"][0]["Metrics"]}
+    assert {"ParseTime", "ValidateTime", "SliceTime", "SerializeTime", "TotalTime"} <= names
+
+
+def test_cache_hit_is_timed_as_cache(sampled, capsys):
+    e = _event("/v1/list/head", {"list": ["cache-hit-metrics"], "n": 1})
+    handler.lambda_handler(e, None)
+    handler.lambda_handler(e, None)
+    first, second = _records(capsys)
+    assert "ValidateTime" in first and "CacheTime" not in first
+    assert "CacheTime" in second and "ValidateTime" not in second
+
+
+def test_streaming_parser_is_timed_as_parse(sampled, capsys, monkeypatch):
+    monkeypatch.setattr(handler, "LIST_PARSER", "stream")
+    handler.lambda_handler(_event("/v1/list/head", {"list": ["a", "b"], "n": 1}), None)
+    (record,) = _records(capsys)
+    assert "ParseTime" in record
+    assert "ItemCount" not in record
+
+
+def test_compression_phase(sampled, capsys):
+    items = [f"item-{i:05d}" for i in range(500)]
+    e = _event("/v1/list/head", {"list": items, "n": 500}, headers={"accept-encoding": "gzip"})
+    response = handler.lambda_handler(e, None)
+    (record,) = _records(capsys)
+    assert response["headers"]["Content-Encoding"] == "gzip"
+    assert record["CompressTime"] >= 0
+    assert record["ResultBytes"] == len(response["body"])
+
+
+@pytest.mark.parametrize("path, method, route, status", [
+    ("/v1/list/head", "POST", "head", 400),
+    ("/v1/list/batch", "POST", "batch", 400),
+    ("/v1/list/../../etc", "POST", "other", 400),
+    ("/v1/list/head", "GET", "head", 405),
+])
+def test_every_request_is_recorded(sampled, capsys, path, method, route, status):
+    handler.lambda_handler(_event(path, {"list": "nope"}, method=method), None)
+    (record,) = _records(capsys)
+    assert record["Route"] == route
+    assert record["status"] == status
+    assert record["TotalTime"] >= 0
+
+
+def test_unsampled_request_logs_plain_line(capsys, caplog):
+    with caplog.at_level("INFO", logger="src.handler"):
+        handler.lambda_handler(_event("/v1/list/head", {"list": ["a"]}), None)
+    assert _records(capsys) == []
+    assert json.loads(caplog.records[-1].getMessage())["status"] == 200
+
+
+def test_compressed_request_body_bytes_are_wire_bytes(sampled, capsys):
+    body = base64.b64encode(gzip.compress(json.dumps({"list": ["a"]}).encode())).decode()
+    e = {
+        "requestContext": {"http": {"path": "/v1/list/head", "method": "POST"}},
+        "headers": {"content-encoding": "gzip"},
+        "body": body,
+        "isBase64Encoded": True,
+    }
+    handler.lambda_handler(e, None)
+    (record,) = _records(capsys)
+    assert record["BodyBytes"] == len(body)
@@ -0,0 +1,129 @@
+import base64
+import json
+
+import pytest
+
+import src.handler as handler
+from src import formats
+
+ITEMS = [f"item-{i}" for i in range(10)]
+
+
+def _event(path, body, method="POST", headers=None):
+    event = {"requestContext": {"http": {"path": path, "method": method}}, "body": json.dumps(body)}
+    if headers:
+        event["headers"] = headers
+    return event
+
+
+def _call(op, **payload):
+    r = handler.lambda_handler(_event(f"/v1/list/{op}", {"list": ITEMS, **payload}), None)
+    return r["statusCode"], json.loads(r["body"])
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"offset": 2, "n": 3}, ITEMS[2:5]),
+    ({"n": 2}, ITEMS[:2]),
+    ({"offset": 8, "n": 5}, ITEMS[8:]),
+    ({"offset": 50, "n": 5}, []),
+])
+def test_slice(payload, expected):
+    assert _call("slice", **payload) == (200, {"result": expected})
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"step": 3, "n": 10}, ITEMS[::3]),
+    ({"step": 2, "offset": 1, "n": 2}, ITEMS[1:5:2]),
+    ({"n": 3}, ITEMS[:3]),
+    ({"step": 4, "offset": 9, "n": 3}, ITEMS[9:]),
+    ({"step": 100, "n": 3}, ITEMS[:1]),
+])
+def test_sample(payload, expected):
+    assert _call("sample", **payload) == (200, {"result": expected})
+
+
+def test_page_walks_the_whole_list():
+    pages = []
+    cursor = None
+    while True:
+        payload = {"n": 4} if cursor is None else {"n": 4, "cursor": cursor}
+        status, body = _call("page", **payload)
+        assert status == 200
+        pages.append(body["result"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [ITEMS[:4], ITEMS[4:8], ITEMS[8:]]
+
+
+def test_page_exact_fit_has_no_next_cursor():
+    assert _call("page", n=10) == (200, {"result": ITEMS, "next_cursor": None})
+
+
+@pytest.mark.parametrize("op, payload, error", [
+    ("slice", {"offset": -1}, "'offset' must be a non-negative integer"),
+    ("slice", {"offset": "2"}, "'offset' must be a non-negative integer"),
+    ("sample", {"step": 0}, "'step' must be a positive integer"),
+    ("sample", {"step": 1.5}, "'step' must be a positive integer"),
+    ("page", {"cursor": "!!"}, "'cursor' is not valid"),
+    ("page", {"cursor": 4}, "'cursor' is not valid"),
+    ("page", {"cursor": base64.urlsafe_b64encode(b"-1").decode()}, "'cursor' is not valid"),
+    ("page", {"n": 0}, "'n' must be a positive integer"),
+])
+def test_parameter_errors(op, payload, error):
+    status, body = _call(op, **payload)
+    assert status == 400
+    assert body["error"] == error
+
+
+def test_list_is_validated_before_parameters():
+    r = handler.lambda_handler(_event("/v1/list/slice", {"list": [1], "offset": -1}), None)
+    assert json.loads(r["body"])["error"] == "'list' must contain only strings"
+
+
+def test_cached_body_serves_every_route():
+    body = {"list": ITEMS, "n": 2, "offset": 3, "step": 3}
+    hits = handler.LIST_CACHE.hits
+    results = {op: json.loads(handler.lambda_handler(_event(f"/v1/list/{op}", body), None)["body"])["result"]
+               for op in ("head", "slice", "sample", "tail")}
+    assert results == {"head": ITEMS[:2], "slice": ITEMS[3:5], "sample": [ITEMS[3], ITEMS[6]], "tail": ITEMS[-2:]}
+    assert handler.LIST_CACHE.hits - hits == 3
+
+
+def test_page_cursor_header_for_binary_responses():
+    r = handler.lambda_handler(_event("/v1/list/page", {"list": ITEMS, "n": 4},
+                                      headers={"accept": formats.LENGTH_PREFIXED}), None)
+    assert r["statusCode"] == 200
+    assert r["headers"]["Content-Type"] == formats.LENGTH_PREFIXED
+    cursor = r["headers"]["X-Next-Cursor"]
+    status, body = _call("page", n=4, cursor=cursor)
+    assert body["result"] == ITEMS[4:8]
+
+
+def test_streaming_parser_falls_back_for_new_operations(monkeypatch):
+    monkeypatch.setattr(handler, "LIST_PARSER", "stream")
+    assert _call("head", n=2) == (200, {"result": ITEMS[:2]})
+    assert _call("sample", n=2, step=5) == (200, {"result": [ITEMS[0], ITEMS[5]]})
+
+
+def test_new_routes_are_post_only():
+    for op in ("slice", "page", "sample"):
+        r = handler.lambda_handler(_event(f"/v1/list/{op}", {"list": ITEMS}, method="GET"), None)
+        assert r["statusCode"] == 405
+
+
+def test_page_over_stored_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(handler, "LIST_STORE", f"sqlite:{tmp_path / 'lists.db'}")
+    monkeypatch.setattr(handler, "_store", None)
+    items = [f"item-{i}" for i in range(1000)]
+    r = handler.lambda_handler(_event("/v1/lists", {"list": items}, method="PUT"), None)
+    list_id = json.loads(r["body"])["list_id"]
+
+    r = handler.lambda_handler(_event("/v1/list/page", {"list_id": list_id, "n": 300}), None)
+    first = json.loads(r["body"])
+    r = handler.lambda_handler(_event("/v1/list/page", {"list_id": list_id, "n": 300,
+                                                        "cursor": first["next_cursor"]}), None)
+    assert first["result"] + json.loads(r["body"])["result"] == items[:600]
+
+    r = handler.lambda_handler(_event("/v1/list/sample", {"list_id": list_id, "n": 4, "step": 250}), None)
+    assert json.loads(r["body"])["result"] == items[::250]
@@ -0,0 +1,317 @@
+import asyncio
+import gzip
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import src.handler as handler
+from src import auth, config, server
+
+ROOT = Path(__file__).resolve().parents[2]
+BODY = json.dumps({"list": ["a", "b", "c"], "n": 2}).encode()
+
+
+async def _exchange(requests, read_responses=None):
+    """Send raw requests on one connection and return the raw responses."""
+    srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0, limit=server.MAX_HEADER_BYTES)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for request in requests:
+            writer.write(request)
+            responses.append(await _read_response(reader))
+        writer.close()
+        return responses
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    headers = {k.lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size = int(await reader.readuntil(b"\r\n"), 16)
+            if not size:
+                await reader.readexactly(2)
+                break
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+        headers["chunks"] = len(chunks)
+        return status, headers, b"".join(chunks)
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, headers, body
+
+
+def _post(path, body, extra=""):
+    return (f"POST {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n{extra}\r\n").encode() + body
+
+
+def test_keep_alive_serves_several_requests():
+    responses = asyncio.run(_exchange([_post("/v1/list/head", BODY), _post("/v1/list/tail?x=1", BODY)]))
+    assert [(s, json.loads(b)) for s, _, b in responses] == [(200, {"result": ["a", "b"]}), (200, {"result": ["b", "c"]})]
+    assert responses[0][1]["connection"] == "keep-alive"
+    assert responses[0][1]["x-content-type-options"] == "nosniff"
+
+
+def test_connection_close():
+    ((status, headers, _),) = asyncio.run(_exchange([_post("/v1/list/head", BODY, "Connection: close\r\n")]))
+    assert status == 200
+    assert headers["connection"] == "close"
+
+
+def test_oversized_content_length_is_refused_before_reading():
+    request = f"POST /v1/list/head HTTP/1.1\r\nContent-Length: {handler.MAX_BODY_SIZE + 1}\r\n\r\n".encode()
+    ((status, headers, body),) = asyncio.run(_exchange([request]))
+    assert status == 413
+    assert headers["connection"] == "close"
+    assert "too large" in json.loads(body)["error"]
+
+
+@pytest.fixture
+def raised_limit(monkeypatch):
+    """A tenant whose max_body_size is twice the built-in one; returns its API key"""
+    verifier = auth.KeyVerifier([auth.hash_key("secret"), auth.hash_key("other")])
+    runtime = config.RuntimeConfig(handler.DEFAULT_LIMITS, config.StaticSource(
+        {"tenants": {verifier("secret"): {"max_body_size": 2 * handler.MAX_BODY_SIZE}}}))
+    runtime.load()
+    monkeypatch.setattr(handler, "CONFIG", runtime)
+    monkeypatch.setattr(handler, "_api_keys", verifier)
+    return "secret"
+
+
+def test_configured_body_limit(raised_limit):
+    items = ["x" * 150] * 10000
+    large = json.dumps({"list": items, "n": 1}).encode()
+    assert handler.MAX_BODY_SIZE < len(large) < 2 * handler.MAX_BODY_SIZE
+    too_large = f"POST /v1/list/head HTTP/1.1\r\nContent-Length: {2 * handler.MAX_BODY_SIZE + 1}\r\n\r\n"
+    (tenant, other, refused) = asyncio.run(_exchange([
+        _post("/v1/list/head", large, f"X-Api-Key: {raised_limit}\r\n"),
+        _post("/v1/list/head", large, "X-Api-Key: other\r\n"),
+        too_large.encode(),
+    ]))
+    assert (tenant[0], json.loads(tenant[2])) == (200, {"result": items[:1]})
+    # Read under the largest limit, then held to the caller's own
+    assert other[0] == 400
+    assert json.loads(other[2])["error"] == f"Request body too large (max {handler.MAX_BODY_SIZE} bytes)"
+    assert refused[0] == 413
+    assert json.loads(refused[2])["error"] == f"Request body too large (max {2 * handler.MAX_BODY_SIZE} bytes)"
+
+
+def test_chunked_body():
+    chunks = b"".join(b"%x\r\n%s\r\n" % (len(BODY[i:i + 7]), BODY[i:i + 7]) for i in range(0, len(BODY), 7))
+    request = b"POST /v1/list/tail HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunks + b"0\r\n\r\n"
+    ((status, _, body),) = asyncio.run(_exchange([request]))
+    assert (status, json.loads(body)) == (200, {"result": ["b", "c"]})
+
+
+def test_oversized_chunked_body_is_cut_off():
+    chunk = b"x" * (handler.MAX_BODY_SIZE // 2 + 1)
+    request = b"POST /v1/list/head HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + (b"%x\r\n%s\r\n" % (len(chunk), chunk)) * 2
+    ((status, _, _),) = asyncio.run(_exchange([request]))
+    assert status == 413
+
+
+def test_compressed_request_and_response():
+    items = [f"item-{i}" for i in range(1000)]
+    body = gzip.compress(json.dumps({"list": items, "n": 1000}).encode())
+    request = _post("/v1/list/head", body, "Content-Encoding: gzip\r\nAccept-Encoding: gzip\r\n")
+    ((status, headers, data),) = asyncio.run(_exchange([request]))
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(data))["result"] == items
+
+
+def test_errors_and_health():
+    responses = asyncio.run(_exchange([
+        _post("/v1/list/head", b"not json"),
+        b"GET /v1/list/head HTTP/1.1\r\n\r\n",
+        b"GET /healthz HTTP/1.1\r\n\r\n",
+        b"garbage\r\n\r\n",
+    ]))
+    assert [s for s, _, _ in responses] == [400, 405, 200, 400]
+
+
+def test_asgi_app():
+    sent = []
+    messages = [{"type": "http.request", "body": BODY[:10], "more_body": True},
+                {"type": "http.request", "body": BODY[10:]}]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/v1/list/head", "headers": [(b"content-type", b"application/json")]}
+    asyncio.run(server.app(scope, receive, send))
+    assert sent[0]["status"] == 200
+    assert json.loads(sent[1]["body"]) == {"result": ["a", "b"]}
+
+    sent.clear()
+    scope["headers"] = [(b"content-length", str(handler.MAX_BODY_SIZE + 1).encode())]
+    asyncio.run(server.app(scope, receive, send))
+    assert sent[0]["status"] == 413
+
+
+def test_to_event_encodes_binary_bodies():
+    assert server.to_event("POST", "/p", {}, b"{}")["body"] == "{}"
+    event = server.to_event("POST", "/p", {}, b"\xff")
+    assert event["isBase64Encoded"] is True
+    assert server.to_event("POST", "/p", {"content-encoding": "gzip"}, b"{}")["isBase64Encoded"] is True
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT") or not hasattr(os, "fork"), reason="needs SO_REUSEPORT and fork")
+def test_workers_share_the_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 10
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=1) as conn:
+                    conn.sendall(_post("/v1/list/head", BODY, "Connection: close\r\n"))
+                    data = b""
+                    while chunk := conn.recv(65536):
+                        data += chunk
+                break
+            except ConnectionRefusedError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+        assert data.startswith(b"HTTP/1.1 200 OK")
+        assert data.endswith(b'{"result": ["a","b"]}') or data.endswith(b'{"result": ["a", "b"]}')
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+
+
+@pytest.fixture
+def pool():
+    from src.pool import OffloadPool
+
+    if not hasattr(os, "fork"):
+        pytest.skip("needs fork")
+    p = OffloadPool(1, slots=1)
+    yield p
+    p.close()
+
+
+def test_pool_answers_large_bodies(pool, monkeypatch):
+    monkeypatch.setattr(server, "POOL_MIN_BYTES", 1000)
+    items = [f"item-{i}" for i in range(500)]
+    large = json.dumps({"list": items, "n": 2}).encode()
+
+    async def run():
+        srv = await asyncio.start_server(lambda r, w: server._serve_connection(r, w, pool=pool), "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            async def one(body):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(_post("/v1/list/tail", body, "Connection: close\r\n"))
+                response = await _read_response(reader)
+                writer.close()
+                return response
+            # More concurrent requests than slots: they wait for a free one
+            return await asyncio.gather(one(large), one(large), one(large), one(BODY))
+
+    responses = asyncio.run(run())
+    assert [json.loads(b)["result"] for _, _, b in responses] == [items[-2:]] * 3 + [["b", "c"]]
+
+
+def test_pool_slots_fit_the_configured_limit(raised_limit, pool):
+    assert pool.slot_size == 2 * handler.MAX_BODY_SIZE
+    items = ["x" * 150] * 10000
+    large = json.dumps({"list": items, "n": 1}).encode()
+    status, _, data = asyncio.run(pool.respond("POST", "/v1/list/tail", {"x-api-key": raised_limit}, large))
+    assert (status, json.loads(data)) == (200, {"result": items[-1:]})
+
+
+def test_pool_reports_validation_errors(pool):
+    body = json.dumps({"list": ["a", 1]}).encode() + b" " * 100
+    status, _, data = asyncio.run(pool.respond("POST", "/v1/list/head", {}, body))
+    assert status == 400
+    assert json.loads(data)["error"] == "'list' must contain only strings"
+
+
+def test_large_results_are_streamed():
+    items = [f"item-{i}" for i in range(2500)]
+    body = json.dumps({"list": items, "n": 2500}).encode()
+    responses = asyncio.run(_exchange([
+        _post("/v1/list/head", body),
+        _post("/v1/list/head", body, "Accept: application/x-ndjson\r\n"),
+        # Still usable after a streamed response
+        _post("/v1/list/head", BODY),
+    ]))
+    (status, headers, data), (_, ndjson_headers, lines), (_, _, small) = responses
+    assert status == 200
+    assert headers["transfer-encoding"] == "chunked"
+    assert headers["chunks"] == 4
+    assert json.loads(data) == {"result": items}
+    assert ndjson_headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in lines.splitlines()] == items
+    assert json.loads(small) == {"result": ["a", "b"]}
+
+
+def test_http10_clients_get_whole_bodies():
+    items = [f"item-{i}" for i in range(2500)]
+    body = json.dumps({"list": items, "n": 2500}).encode()
+    request = (f"POST /v1/list/head HTTP/1.0\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+    ((status, headers, data),) = asyncio.run(_exchange([request]))
+    assert "transfer-encoding" not in headers
+    assert json.loads(data) == {"result": items}
+
+
+def test_failed_stream_is_cut_off(monkeypatch):
+    def failing(result, chunk_items, next_cursor=None, paged=False):
+        yield b'{"result": ['
+        raise RuntimeError("encoder failed")
+
+    monkeypatch.setattr(handler.chunked, "json_result", failing)
+    body = json.dumps({"list": [f"item-{i}" for i in range(2000)], "n": 2000}).encode()
+
+    async def run():
+        srv = await asyncio.start_server(server._serve_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(_post("/v1/list/head", body))
+            data = await reader.read()
+            writer.close()
+            return data
+
+    data = asyncio.run(run())
+    assert data.startswith(b"HTTP/1.1 200 OK")
+    # No terminating chunk: the client sees a truncated response, not a complete wrong one
+    assert not data.endswith(b"0\r\n\r\n")
+
+
+def test_asgi_streams_large_results():
+    items = [f"item-{i}" for i in range(2500)]
+    messages = [{"type": "http.request", "body": json.dumps({"list": items, "n": 2500}).encode()}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/v1/list/head", "headers": []}
+    asyncio.run(server.app(scope, receive, send))
+    assert b"content-length" not in dict(sent[0]["headers"])
+    assert all(m["more_body"] for m in sent[1:-1]) and not sent[-1].get("more_body")
+    assert len(sent) == 6
+    assert json.loads(b"".join(m["body"] for m in sent[1:])) == {"result": items}
@@ -0,0 +1,160 @@
+import json
+import pytest
+import src.handler as handler
+from src import storage
+
+
+@pytest.fixture
+def store(tmp_path):
+    return storage.SqliteListStore(str(tmp_path / "lists.db"))
+
+
+@pytest.fixture
+def enabled_store(tmp_path, monkeypatch):
+    """Point the handler at a fresh SQLite store"""
+    monkeypatch.setattr(handler, "LIST_STORE", f"sqlite:{tmp_path / 'lists.db'}")
+    monkeypatch.setattr(handler, "_store", None)
+    yield
+
+
+def _event(path, body, method="POST"):
+    return {"requestContext": {"http": {"path": path, "method": method}}, "body": json.dumps(body)}
+
+
+def test_sqlite_put_and_read(store):
+    items = [f"item-{i}" for i in range(100)]
+    list_id = store.put(items)
+    assert store.length(list_id) == 100
+    assert store.read(list_id, 0, 3) == ["item-0", "item-1", "item-2"]
+    assert store.read(list_id, 98, 100) == ["item-98", "item-99"]
+    assert store.read(list_id, 5, 5) == []
+
+
+def test_list_id_is_content_addressed(store):
+    assert store.put(["a", "b"]) == store.put(["a", "b"])
+    assert store.put(["a", "b"]) != store.put(["ab"])
+    assert store.put(["a", "b"]) == storage.list_id_for(["a", "b"])
+
+
+def test_unknown_list_id(store):
+    with pytest.raises(storage.ListNotFound):
+        store.length("missing")
+
+
+def test_stored_list_slicing(store):
+    items = [f"item-{i}" for i in range(10)]
+    view = store.open(store.put(items))
+    assert len(view) == 10
+    assert view[:3] == items[:3]
+    assert view[-2:] == items[-2:]
+    assert view[4:7] == items[4:7]
+    assert view[20:] == []
+    assert view[::3] == items[::3]
+    assert view[-1] == "item-9"
+    assert list(view) == items
+    with pytest.raises(IndexError):
+        view[10]
+
+
+class FakeDynamoDB:
+    """Just enough of the low-level DynamoDB client for DynamoDbListStore"""
+
+    def __init__(self):
+        self.items = {}
+        self.queries = 0
+
+    def batch_write_item(self, RequestItems):
+        for requests in RequestItems.values():
+            for request in requests:
+                item = request["PutRequest"]["Item"]
+                self.items[(item["list_id"]["S"], int(item["chunk"]["N"]))] = item
+        return {"UnprocessedItems": {}}
+
+    def get_item(self, TableName, Key, ConsistentRead):
+        item = self.items.get((Key["list_id"]["S"], int(Key["chunk"]["N"])))
+        return {"Item": item} if item else {}
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues):
+        self.queries += 1
+        values = ExpressionAttributeValues
+        first, last = int(values[":first"]["N"]), int(values[":last"]["N"])
+        keys = sorted(k for k in self.items if k[0] == values[":id"]["S"] and first <= k[1] <= last)
+        return {"Items": [self.items[k] for k in keys]}
+
+
+def test_dynamodb_store_reads_only_overlapping_chunks():
+    client = FakeDynamoDB()
+    store = storage.DynamoDbListStore("lists", client=client)
+    items = [f"item-{i}" for i in range(237)]
+    list_id = store.put(items)
+
+    assert store.length(list_id) == 237
+    assert store.read(list_id, 0, 5) == items[:5]
+    assert store.read(list_id, 230, 237) == items[230:]
+    assert store.read(list_id, 45, 105) == items[45:105]
+    assert store.open(list_id)[-10:] == items[-10:]
+    with pytest.raises(storage.ListNotFound):
+        store.length("missing")
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoRead(storage.ListStore):
+        def put(self, items):
+            return "id"
+
+        def length(self, list_id):
+            return 0
+
+    with pytest.raises(TypeError):
+        NoRead()
+
+
+def test_open_store_urls(tmp_path):
+    assert storage.open_store("") is None
+    assert isinstance(storage.open_store(f"sqlite:{tmp_path / 'x.db'}"), storage.SqliteListStore)
+    with pytest.raises(ValueError):
+        storage.open_store("redis:localhost")
+
+
+def test_put_then_head_and_tail_by_id(enabled_store):
+    items = [f"item-{i}" for i in range(1000)]
+    r = handler.lambda_handler(_event("/v1/lists", {"list": items}, method="PUT"), None)
+    assert r["statusCode"] == 201
+    body = json.loads(r["body"])
+    assert body["length"] == 1000
+    list_id = body["list_id"]
+
+    r = handler.lambda_handler(_event("/v1/list/head", {"list_id": list_id, "n": 3}), None)
+    assert json.loads(r["body"])["result"] == items[:3]
+    r = handler.lambda_handler(_event("/v1/list/tail", {"list_id": list_id, "n": 2000}), None)
+    assert json.loads(r["body"])["result"] == items
+
+    r = handler.lambda_handler(_event("/v1/list/batch", {
+        "list_id": list_id, "queries": [{"op": "tail", "n": 2}, {"op": "slice", "offset": 10, "n": 2}],
+    }), None)
+    assert json.loads(r["body"])["results"] == [items[-2:], items[10:12]]
+
+
+def test_list_id_errors(enabled_store):
+    r = handler.lambda_handler(_event("/v1/list/head", {"list_id": "missing"}), None)
+    assert r["statusCode"] == 404
+    assert json.loads(r["body"])["code"] == "LIST_NOT_FOUND"
+
+    r = handler.lambda_handler(_event("/v1/list/head", {"list_id": 5}), None)
+    assert r["statusCode"] == 400
+
+    r = handler.lambda_handler(_event("/v1/lists", {"list": ["ok", 1]}, method="PUT"), None)
+    assert r["statusCode"] == 400
+
+    r = handler.lambda_handler(_event("/v1/lists", {"list": ["a"]}), None)
+    assert r["statusCode"] == 405
+
+
+def test_storage_disabled(monkeypatch):
+    monkeypatch.setattr(handler, "LIST_STORE", "")
+    monkeypatch.setattr(handler, "_store", None)
+    r = handler.lambda_handler(_event("/v1/lists", {"list": ["a"]}, method="PUT"), None)
+    assert r["statusCode"] == 404
+    r = handler.lambda_handler(_event("/v1/list/head", {"list_id": "abc"}), None)
+    assert r["statusCode"] == 400
+    assert json.loads(r["body"])["error"] == "list storage is not enabled"
@@ -0,0 +1,223 @@
+import json
+import pytest
+import src.handler as handler
+from src import codec, stream
+
+
+def _head(body: str):
+    return stream.head(body, handler.MAX_LIST_LENGTH, handler.MAX_STRING_LENGTH, handler.MAX_N)
+
+
+def _tail(body: str):
+    return stream.tail(body, handler.MAX_LIST_LENGTH, handler.MAX_STRING_LENGTH, handler.MAX_N)
+
+
+def test_head_basic():
+    assert _head(json.dumps({"list": ["a", "b", "c"], "n": 2})) == ["a", "b"]
+
+
+def test_tail_basic():
+    assert _tail(json.dumps({"list": ["a", "b", "c"], "n": 2})) == ["b", "c"]
+    assert _tail(json.dumps({"list": ["a", "b"], "n": 10})) == ["a", "b"]
+    assert _tail(json.dumps({"list": [], "n": 3})) == []
+    assert _tail('{"n": 1, "list": ["a", "b", "c"]}') == ["c"]
+
+
+def test_head_n_before_list_and_default_n():
+    assert _head('{"n": 2, "list": ["a", "b", "c"]}') == ["a", "b"]
+    assert _head('{"list": ["a", "b", "c"]}') == ["a"]
+
+
+def test_head_whitespace_and_escapes():
+    body = '\n{ "list" : [ "a\\"b" ,\t"\\u00e9" , "c" ] ,\r\n "n" : 5 }\n'
+    assert _head(body) == ['a"b', "é", "c"]
+
+
+def test_head_other_keys_are_skipped():
+    body = json.dumps({"meta": {"x": [1, {"y": "]"}]}, "list": ["a"], "n": 1})
+    assert _head(body) == ["a"]
+
+
+def test_iter_items_is_lazy():
+    body = json.dumps({"list": [f"item-{i}" for i in range(1000)]})
+    items = stream.iter_items(body, body.index("["))
+    assert next(items) == "item-0"
+    assert next(items) == "item-1"
+
+
+@pytest.mark.parametrize("body", [
+    "not valid json {{{",
+    "[]",
+    '{"n": 1}',
+    '{"list": "nope"}',
+    '{"list": ["ok", 1]}',
+    '{"list": ["a",]}',
+    '{"list": ["a"], "n": 0}',
+    '{"list": ["a"], "n": "five"}',
+    '{"list": ["a"], "n": 10001}',
+    '{"list": ["a"]} extra',
+    json.dumps({"list": ["a" * 1001]}),
+    json.dumps({"list": ["a"] * 10001}),
+])
+def test_falls_back_on_invalid_input(body):
+    with pytest.raises(stream.Fallback):
+        _head(body)
+    with pytest.raises(stream.Fallback):
+        _tail(body)
+
+
+@pytest.mark.parametrize("body", [
+    json.dumps({"list": ["a", "b", "c"], "n": 2}),
+    json.dumps({"list": [], "n": 3}),
+    '{"list": ["a"], "list": ["b", "c"], "n": 5}',
+    '{"list": ["ok", 1]}',
+    '{"list": ["a"], "n": 0}',
+    '{"list": ["a"]} extra',
+    "[]",
+    json.dumps({"list": ["a", "a" * 1001, 2]}),
+    json.dumps({"list": ["a"] * 10001}),
+])
+@pytest.mark.parametrize("path", ["/v1/list/head", "/v1/list/tail"])
+def test_stream_parser_matches_json_parser(body, path, monkeypatch):
+    event = {"requestContext": {"http": {"path": path, "method": "POST"}}, "body": body}
+
+    monkeypatch.setattr(handler, "LIST_PARSER", "json")
+    expected = handler.lambda_handler(event, None)
+    monkeypatch.setattr(handler, "LIST_PARSER", "stream")
+    assert handler.lambda_handler(event, None) == expected
+
+
+@pytest.mark.parametrize("body", [
+    '{"list": ["\\ud800"]}',
+    '{"list": ["a", "b\\udc00c"], "n": 1}',
+    '{"list": ["\\ud83d\\ude00"]}',
+    '{"\\ud800": 1, "list": ["a"]}',
+    '{"list": ["a"], "x": NaN}',
+    '{"list": ["a"], "x": [Infinity]}',
+    '{"list": ["a"], "x": 100000000000000000000000}',
+    '{"list": ["a"], "n": NaN}',
+    '{"list": ["a"], "n": 100000000000000000000000}',
+])
+@pytest.mark.parametrize("name", ["json", "orjson"])
+@pytest.mark.parametrize("path", ["/v1/list/head", "/v1/list/tail"])
+def test_stream_parser_follows_the_codec(body, name, path, monkeypatch):
+    # Inputs stdlib json accepts and the libraries reject
+    if codec.load(name).name != name:
+        pytest.skip(f"{name} is not installed")
+    monkeypatch.setattr(codec, "CODEC", codec.load(name))
+    event = {"requestContext": {"http": {"path": path, "method": "POST"}}, "body": body}
+
+    monkeypatch.setattr(handler, "LIST_PARSER", "json")
+    expected = handler.lambda_handler(event, None)
+    assert expected["statusCode"] in (200, 400)
+    monkeypatch.setattr(handler, "LIST_PARSER", "stream")
+    assert handler.lambda_handler(event, None) == expected
+
+
+def _ndjson(items, **fields):
+    header = [json.dumps(fields)] if fields else []
+    return "\n".join(header + [json.dumps(item) for item in items]) + "\n"
+
+
+def _head_lines(body: str):
+    return stream.head_lines(body, handler.MAX_LIST_LENGTH, handler.MAX_STRING_LENGTH, handler.MAX_N)
+
+
+def _tail_lines(body: str):
+    return stream.tail_lines(body, handler.MAX_LIST_LENGTH, handler.MAX_STRING_LENGTH, handler.MAX_N)
+
+
+def test_lines_basic():
+    assert _head_lines(_ndjson(["a", "b", "c"], n=2)) == ["a", "b"]
+    assert _tail_lines(_ndjson(["a", "b", "c"], n=2)) == ["b", "c"]
+    # No header line: n defaults to 1; the last newline is optional, CRLF is accepted
+    assert _head_lines('"a"\r\n"b"') == ["a"]
+    assert _tail_lines('"a"\r\n"b"') == ["b"]
+    assert _tail_lines('{"n": 3}\n') == []
+    assert _head_lines(_ndjson(['a"b', "é", "\\"], n=3)) == ['a"b', "é", "\\"]
+
+
+def test_head_lines_stops_after_n():
+    # Line 3 is invalid, but head never reads it
+    assert _head_lines('{"n": 2}\n"a"\n"b"\nnot json\n') == ["a", "b"]
+    with pytest.raises(stream.Fallback):
+        _tail_lines('{"n": 2}\n"a"\n"b"\nnot json\n')
+
+
+@pytest.mark.parametrize("body", [
+    '{"n": 0}\n"a"\n',
+    '{"n": "five"}\n"a"\n',
+    '{"n": 10001}\n"a"\n',
+    '{"n": 1\n"a"\n',
+    '"a"\n1\n',
+    '"a"\n\n"b"\n',
+    '"a" "b"\n',
+    '"a\n"\n',
+    _ndjson(["a" * 1001]),
+    _ndjson(["a"] * 10001),
+])
+def test_lines_fall_back_on_invalid_input(body):
+    with pytest.raises(stream.Fallback):
+        _tail_lines(body)
+
+
+@pytest.mark.parametrize("items, fields", [
+    (["a", "b", "c"], {"n": 2}),
+    ([], {"n": 3}),
+    (["a", "b"], {}),
+    (["ok", 1], {}),
+    (["a", "a" * 1001, "b", "c" * 1001], {"n": 2}),
+    (["a", "a" * 1001, 2], {}),
+    (["a"] * 10001, {}),
+    (["a"], {"n": 0}),
+    (["a"], {"n": 10001}),
+])
+@pytest.mark.parametrize("path", ["/v1/list/head", "/v1/list/tail"])
+def test_ndjson_body_matches_json_body(items, fields, path):
+    def event(body, content_type):
+        return {"requestContext": {"http": {"path": path, "method": "POST"}},
+                "headers": {"content-type": content_type}, "body": body}
+
+    expected = handler.lambda_handler(event(json.dumps({"list": items, **fields}), "application/json"), None)
+    actual = handler.lambda_handler(event(_ndjson(items, **fields), "application/x-ndjson"), None)
+    if path.endswith("head") and expected["statusCode"] == 400 and actual["statusCode"] == 200:
+        # head stops reading at line n, before the bad one
+        n = fields.get("n", 1)
+        assert json.loads(actual["body"])["result"] == items[:n]
+    else:
+        assert actual == expected
+
+
+@pytest.mark.parametrize("body", [
+    '"\\ud800"\n',
+    '"a\\udfffb"\n',
+    '{"n": 1}\n"\\ud800"\n',
+    '{"n": 1, "x": NaN}\n"a"\n',
+    '{"n": 1, "x": 100000000000000000000000}\n"a"\n',
+])
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_ndjson_answers_alike_on_every_route(body, name, monkeypatch):
+    # Inputs stdlib json accepts and the libraries reject; every body has one item
+    if codec.load(name).name != name:
+        pytest.skip(f"{name} is not installed")
+    monkeypatch.setattr(codec, "CODEC", codec.load(name))
+    responses = [handler.lambda_handler({
+        "requestContext": {"http": {"path": f"/v1/list/{route}", "method": "POST"}},
+        "headers": {"content-type": "application/x-ndjson"}, "body": body}, None)
+        for route in ("head", "tail", "slice")]
+    if "\\u" in body:
+        assert responses[0]["statusCode"] == (200 if name == "json" else 400)
+    assert responses[1] == responses[2] == responses[0]
+
+
+def test_ndjson_errors_name_the_line():
+    event = {"requestContext": {"http": {"path": "/v1/list/tail", "method": "POST"}},
+             "headers": {"content-type": "application/x-ndjson"}, "body": '{"n": 1}\n"a"\n{oops\n'}
+    r = handler.lambda_handler(event, None)
+    assert json.loads(r["body"]) == {"code": "VALIDATION_ERROR", "error": "Body must be valid NDJSON (line 3)"}
+
+
+def test_ndjson_other_routes_decode_the_whole_body():
+    event = {"requestContext": {"http": {"path": "/v1/list/slice", "method": "POST"}},
+             "headers": {"content-type": "application/x-ndjson"}, "body": _ndjson(["a", "b", "c", "d"], n=2, offset=1)}
+    assert json.loads(handler.lambda_handler(event, None)["body"]) == {"result": ["b", "c"]}